@@ -1,22 +1,30 @@
+import copy
 import streamlit as st
-from pathlib import Path
-from tabs import informacije, parcela, faktorji, tipologije, stavbe, stanovanja, klet, ekonomika, optimizacija, izpis
+from core import DEFAULT_INPUTS
+from geometry import apply_layout
+from pdf_resources import warm_up as warm_up_pdf_resources
+from ui_cache import asset_bytes, get_results
+from ui_dashboard import render_dashboard
+from tabs import informacije, parcela, faktorji, tipologije, stavbe, stanovanja, klet, ekonomika, optimizacija, obcutljivost, primerjava, obmocje, izpis
 
 # =================================================
 # PAGE CONFIG
 # =================================================
 st.set_page_config(page_title="URBANISTIKA", layout="wide")
 
+# fonti za PDF se naložijo v ozadju, enkrat na proces (prvi izvoz je tako takojšen)
+warm_up_pdf_resources()
+
 # =================================================
 # HEADER (LOGO + NASLOV – PORAVNANO BLIŽJE)
 # =================================================
-logo_path = Path("assets/logo.png")
+logo = asset_bytes("assets/logo.png")
 
 col_logo, col_title = st.columns([1, 20], vertical_alignment="center")
 
 with col_logo:
-    if logo_path.exists():
-        st.image(str(logo_path), width=90)
+    if logo is not None:
+        st.image(logo, width=90)
 
 with col_title:
     st.markdown(
@@ -39,47 +47,15 @@ st.markdown("---")
 # SESSION STATE
 # =================================================
 if "inputs" not in st.session_state:
-    st.session_state.inputs = {
-        "parcela_m2": 5000,
-        "fi": 1.35,
-        "fz": 0.35,
-        "fzp_min_pct": 20,
-        "stevilo_lamel": 3,
-        "dolzina_lamele_m": 40,
-        "sirina_lamele_m": 14,
-        "st_etas_nadz": 4,
-        "net_to_gross": 0.82,
-        "units_mode": "RAČUNSKO",
-        "st_stanovanj": 76,
-        "default_avg_unit_m2": 60.0,
-        "typologies": [
-            {"name": "1-sobno", "share_pct": 20.0, "avg_m2": 35.0},
-            {"name": "2-sobno", "share_pct": 45.0, "avg_m2": 55.0},
-            {"name": "3-sobno", "share_pct": 30.0, "avg_m2": 75.0},
-            {"name": "4-sobno", "share_pct": 5.0, "avg_m2": 95.0},
-        ],
-        "pm_na_stanovanje": 1.5,
-        "visitor_share": 0.33,
-        "area_per_pm_garage_m2": 25.0,
-        "area_per_pm_surface_m2": 25.0,
-        "garage_eff_k1": 0.70,
-        "garage_eff_k2": 0.85,
-        "ramp_footprint_m2": 200.0,
-        "surface_mult": 1.00,
-        "scenario": "K-2",
-        "land_price_eur_m2": 450.0,
-        "cost_above_eur_m2": 1400.0,
-        "cost_below_eur_m2": 1100.0,
-        "soft_cost_pct": 12.0,
-        "sales_price_eur_m2": 3200.0,
-        "project_name": "",
-        "project_code": "",
-        "parcel_no": "",
-        "cadastral_municipality": "",
-    }
+    st.session_state.inputs = copy.deepcopy(DEFAULT_INPUTS)
 
 inputs = st.session_state.inputs
 
+# =================================================
+# DASHBOARD (izrisan enkrat, nad zavihki)
+# =================================================
+dashboard_slot = st.container()
+
 # =================================================
 # TABS
 # =================================================
@@ -93,6 +69,9 @@ tab_objs = st.tabs([
     "Klet",
     "Ekonomika",
     "Optimizacija",
+    "Občutljivost",
+    "Primerjava",
+    "Območje",
     "Izpis",
 ])
 
@@ -106,6 +85,9 @@ with tab_objs[3]:
     inputs = tipologije.render_tab(inputs)
 with tab_objs[4]:
     inputs = stavbe.render_tab(inputs)
+inputs = apply_layout(inputs)
+with tab_objs[3]:
+    tipologije.render_layout(inputs)
 with tab_objs[5]:
     inputs = stanovanja.render_tab(inputs)
 with tab_objs[6]:
@@ -115,10 +97,21 @@ with tab_objs[7]:
 with tab_objs[8]:
     inputs = optimizacija.render_tab(inputs)
 with tab_objs[9]:
+    inputs = obcutljivost.render_tab(inputs)
+with tab_objs[10]:
+    inputs = primerjava.render_tab(inputs)
+with tab_objs[11]:
+    inputs = obmocje.render_tab(inputs)
+with tab_objs[12]:
     inputs = izpis.render_tab(inputs)
 
 st.session_state.inputs = inputs
 
+# Dashboard izrišemo po zavihkih, da odraža vse spremembe iz tega rerun-a
+with dashboard_slot:
+    render_dashboard(get_results(inputs), net_to_gross=inputs["net_to_gross"])
+    st.markdown("---")
+
 # =================================================
 # FOOTER
 # =================================================
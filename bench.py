@@ -0,0 +1,253 @@
+"""Benchmarks for the hot paths: ``python bench.py [--quick] [--save FILE] [--compare FILE]``.
+
+Every case reports throughput, p50/p99 latency per run and peak Python memory
+(tracemalloc, measured in a separate run so it does not distort timings).
+``--save`` writes the results as JSON; ``--compare`` checks a run against such a
+baseline and exits with 1 if a p50 got slower than ``--threshold``.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+import core
+import dataflow
+import optimizer
+import pdf_export
+
+
+def _inputs() -> dict:
+    return copy.deepcopy(core.DEFAULT_INPUTS)
+
+
+def _sweep_cols(n: int) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        "parcela_m2": rng.uniform(1000, 20000, n),
+        "stevilo_lamel": rng.integers(1, 8, n),
+        "dolzina_lamele_m": rng.integers(15, 80, n),
+        "st_etas_nadz": rng.integers(1, 10, n),
+        "scenario": rng.integers(0, 3, n),
+        "sales_price_eur_m2": rng.uniform(2000, 5000, n),
+    }
+
+
+# =================================================
+# PRIMERI: priprava vrne (funkcija za merjenje, št. enot na zagon)
+# =================================================
+def _case_compute_single():
+    inputs = _inputs()
+    return lambda: core.compute(inputs), 1
+
+
+def _case_evaluate_typed():
+    p = core.ProjectInputs.from_dict(_inputs())
+    return lambda: core.evaluate(p), 1
+
+
+def _case_dataflow_edit():
+    inputs = _inputs()
+    ev = dataflow.Evaluator()
+    ev.update(inputs)
+    prices = [3000.0, 3100.0]
+
+    def run():
+        inputs["sales_price_eur_m2"] = prices[0]
+        prices.reverse()
+        return ev.update(inputs)
+
+    return run, 1
+
+
+def _case_sweep_loop(n: int):
+    def setup():
+        base = _inputs()
+        cols = _sweep_cols(n)
+        rows = []
+        for i in range(n):
+            d = dict(base)
+            d.update({k: v[i].item() for k, v in cols.items()})
+            d["scenario"] = core.SCENARIOS[d["scenario"]]
+            rows.append(d)
+        return lambda: [core.compute(d) for d in rows], n
+    return setup
+
+
+def _case_sweep_batch(n: int):
+    def setup():
+        base = _inputs()
+        cols = _sweep_cols(n)
+        return lambda: core.compute_batch(cols, base), n
+    return setup
+
+
+def _case_apply_option_loop():
+    from tabs.optimizacija import _apply_option
+
+    def run():
+        inputs = _inputs()
+        inputs["st_etas_nadz"] = 12
+        steps = 0
+        while not core.compute(inputs)["fi_ok"] and steps < 50:
+            inputs = _apply_option(inputs, "FI_1_reduce_floors")
+            steps += 1
+        return steps
+
+    return run, 1
+
+
+def _case_optimizer_search():
+    inputs = _inputs()
+    grid = optimizer.default_grid(inputs)
+    return lambda: optimizer.search(inputs, grid), 1
+
+
+def _case_markdown():
+    inputs = _inputs()
+    r = core.compute(inputs)
+    return lambda: pdf_export.build_project_description_markdown(inputs, r), 1
+
+
+def _case_build_pdf():
+    inputs = _inputs()
+    r = core.compute(inputs)
+    return lambda: pdf_export.build_pdf(inputs, r), 1
+
+
+def _case_write_pdf_file():
+    import tempfile
+
+    inputs = _inputs()
+    r = core.compute(inputs)
+    path = os.path.join(tempfile.gettempdir(), "urbanistika_bench.pdf")
+    return lambda: pdf_export.write_pdf(inputs, r, path), 1
+
+
+# ime -> (setup, št. ponovitev, št. ponovitev pri --quick)
+CASES: Dict[str, tuple] = {
+    "compute_single": (_case_compute_single, 20000, 2000),
+    "evaluate_typed": (_case_evaluate_typed, 20000, 2000),
+    "dataflow_price_edit": (_case_dataflow_edit, 20000, 2000),
+    "sweep_loop_1k": (_case_sweep_loop(1_000), 10, 3),
+    "sweep_batch_1k": (_case_sweep_batch(1_000), 200, 20),
+    "sweep_batch_100k": (_case_sweep_batch(100_000), 10, 3),
+    "sweep_batch_1m": (_case_sweep_batch(1_000_000), 3, 1),
+    "apply_option_loop": (_case_apply_option_loop, 200, 20),
+    "optimizer_search": (_case_optimizer_search, 20, 3),
+    "project_markdown": (_case_markdown, 2000, 200),
+    "pdf_export_build_pdf": (_case_build_pdf, 20, 3),
+    "pdf_export_write_file": (_case_write_pdf_file, 20, 3),
+}
+
+
+def run_case(name: str, repeat: int) -> dict:
+    setup = CASES[name][0]
+    fn, items = setup()
+
+    fn()  # ogrevanje (uvozi, registracija fontov, ...)
+
+    times: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t = np.asarray(times)
+    return {
+        "repeat": repeat,
+        "items_per_run": items,
+        "p50_ms": float(np.percentile(t, 50) * 1e3),
+        "p99_ms": float(np.percentile(t, 99) * 1e3),
+        "mean_ms": float(t.mean() * 1e3),
+        "throughput_per_s": float(items * repeat / t.sum()),
+        "peak_mem_kb": peak / 1024.0,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """Names of cases whose p50 is more than `threshold` (fraction) slower than the baseline."""
+    regressions = []
+    base_res = baseline.get("results", {})
+    print(f"\n{'primer':<24} {'p50 zdaj':>12} {'p50 prej':>12} {'razmerje':>9}")
+    for name, res in results.items():
+        if name not in base_res:
+            continue
+        now, before = res["p50_ms"], base_res[name]["p50_ms"]
+        ratio = now / before if before > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+            flag = "  POČASNEJE"
+        print(f"{name:<24} {now:>10.3f}ms {before:>10.3f}ms {ratio:>8.2f}x{flag}")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Meritve zmogljivosti (compute, optimizacija, PDF).")
+    parser.add_argument("--quick", action="store_true", help="manj ponovitev (hiter pregled)")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="samo izbrani primeri")
+    parser.add_argument("--save", help="shrani rezultate v JSON (baseline)")
+    parser.add_argument("--compare", help="primerjaj z baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="dovoljeno poslabšanje p50 (privzeto 0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+    save_path = Path(args.save).resolve() if args.save else None
+    compare_path = Path(args.compare).resolve() if args.compare else None
+
+    # aplikacija bere assets/ relativno na korensko mapo projekta
+    os.chdir(Path(__file__).resolve().parent)
+
+    names = args.only or list(CASES)
+    results = {}
+    print(f"{'primer':<24} {'p50':>10} {'p99':>10} {'enot/s':>14} {'peak mem':>11}")
+    for name in names:
+        repeat = CASES[name][2] if args.quick else CASES[name][1]
+        res = run_case(name, repeat)
+        results[name] = res
+        print(
+            f"{name:<24} {res['p50_ms']:>8.3f}ms {res['p99_ms']:>8.3f}ms "
+            f"{res['throughput_per_s']:>14,.0f} {res['peak_mem_kb']:>8,.0f} kB"
+        )
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+
+    if save_path:
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if compare_path:
+        with open(compare_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nPoslabšanje nad {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,366 @@
+import dataclasses
+import hashlib
+import json
 import math
+import operator
+from dataclasses import dataclass
+
+import numpy as np
+
+import garage
+
+# Različica računskega modela: povečaj ob vsaki spremembi formul (trajni predpomnilnik
+# rezultatov, result_cache, ob tem zavrže stare vnose).
+MODEL_VERSION = 4
+
+# Privzeti vhodni podatki projekta (tudi ključi za CLI / batch vhode)
+DEFAULT_INPUTS = {
+    "parcela_m2": 5000,
+    "fi": 1.35,
+    "fz": 0.35,
+    "fzp_min_pct": 20,
+    "stevilo_lamel": 3,
+    "dolzina_lamele_m": 40,
+    "sirina_lamele_m": 14,
+    "st_etas_nadz": 4,
+    "net_to_gross": 0.82,
+    "units_mode": "RAČUNSKO",
+    "st_stanovanj": 76,
+    "default_avg_unit_m2": 60.0,
+    "typologies": [
+        {"name": "1-sobno", "share_pct": 20.0, "avg_m2": 35.0},
+        {"name": "2-sobno", "share_pct": 45.0, "avg_m2": 55.0},
+        {"name": "3-sobno", "share_pct": 30.0, "avg_m2": 75.0},
+        {"name": "4-sobno", "share_pct": 5.0, "avg_m2": 95.0},
+    ],
+    "pm_na_stanovanje": 1.5,
+    "visitor_share": 0.33,
+    "area_per_pm_garage_m2": 25.0,
+    "area_per_pm_surface_m2": 25.0,
+    "garage_eff_k1": 0.70,
+    "garage_eff_k2": 0.85,
+    "ramp_footprint_m2": 200.0,
+    "surface_mult": 1.00,
+    # Tloris garaže (garage.py) namesto izkoristka: PM, vozne poti in rampa [m]
+    "garage_layout": False,
+    "stall_w_m": 2.5,
+    "stall_d_m": 5.0,
+    "aisle_w_m": 6.0,
+    "ramp_len_m": 20.0,
+    "scenario": "K-2",
+    "land_price_eur_m2": 450.0,
+    "cost_above_eur_m2": 1400.0,
+    "cost_below_eur_m2": 1100.0,
+    "soft_cost_pct": 12.0,
+    "sales_price_eur_m2": 3200.0,
+    # Zazidava (geometry.py): način, parcela in pravila razmestitve
+    "layout_mode": "lamela",
+    "geometry_footprint": False,
+    "parcel_aspect": 1.5,
+    "parcel_polygon": [],
+    "setback_m": 4.0,
+    "spacing_m": 12.0,
+    "point_block_m": 20.0,
+    # tloris stavb iz geometrije (None = št. lamel × dolžina × širina; 0 = ni postavljenih
+    # stavb); nastavi ga geometry.apply_layout
+    "footprint_m2": None,
+    "project_name": "",
+    "project_code": "",
+    "parcel_no": "",
+    "cadastral_municipality": "",
+}
 
 def clamp01(x: float) -> float:
     return max(0.0, min(1.0, x))
 
-def compute_avg_unit_size_m2(inputs: dict) -> float:
-    t = inputs["typologies"]
-    total_share = sum(x["share_pct"] for x in t)
+def _canonical(obj):
+    """Normalize a value so that equal inputs serialize identically (4 == 4.0, tuples == lists)."""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return {"__sha1__": hashlib.sha1(bytes(obj)).hexdigest()}
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, bool) or obj is None or isinstance(obj, str):
+        return obj
+    if isinstance(obj, (int, float)):
+        return float(obj)
+    return str(obj)
+
+def inputs_hash(inputs: dict) -> str:
+    """Canonical hash of project inputs, used as a cache key for results.
+
+    In RAČUNSKO mode `st_stanovanj` is an output of the calculation, so it is not part of the key.
+    """
+    data = dict(inputs)
+    if data.get("units_mode", "RAČUNSKO") == "RAČUNSKO":
+        data.pop("st_stanovanj", None)
+    payload = json.dumps(_canonical(data), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+class _RecordMixin:
+    """Read-only dict adapter, so records can be passed where an inputs/result dict is read."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key) -> bool:
+        return key in self._FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self._FIELDS else default
+
+    def keys(self):
+        return iter(self._FIELDS)
+
+
+@dataclass(frozen=True, slots=True)
+class Typology(_RecordMixin):
+    name: str
+    share_pct: float
+    avg_m2: float
+
+    @classmethod
+    def from_dict(cls, d) -> "Typology":
+        if isinstance(d, Typology):
+            return d
+        return cls(str(d.get("name", "")), float(d["share_pct"]), float(d["avg_m2"]))
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "share_pct": self.share_pct, "avg_m2": self.avg_m2}
+
+
+@dataclass(frozen=True, slots=True)
+class ProjectInputs(_RecordMixin):
+    """Validated, immutable project inputs (same keys as `DEFAULT_INPUTS`).
+
+    Build with `ProjectInputs.from_dict(inputs)`: missing keys take the defaults, values are
+    coerced once. Instances are hashable and can be used directly as cache keys.
+    """
+    parcela_m2: float
+    fi: float
+    fz: float
+    fzp_min_pct: float
+    stevilo_lamel: int
+    dolzina_lamele_m: float
+    sirina_lamele_m: float
+    st_etas_nadz: int
+    net_to_gross: float
+    units_mode: str
+    st_stanovanj: int
+    default_avg_unit_m2: float
+    typologies: tuple
+    pm_na_stanovanje: float
+    visitor_share: float
+    area_per_pm_garage_m2: float
+    area_per_pm_surface_m2: float
+    garage_eff_k1: float
+    garage_eff_k2: float
+    ramp_footprint_m2: float
+    surface_mult: float
+    garage_layout: bool
+    stall_w_m: float
+    stall_d_m: float
+    aisle_w_m: float
+    ramp_len_m: float
+    scenario: str
+    land_price_eur_m2: float
+    cost_above_eur_m2: float
+    cost_below_eur_m2: float
+    soft_cost_pct: float
+    sales_price_eur_m2: float
+    layout_mode: str
+    geometry_footprint: bool
+    parcel_aspect: float
+    parcel_polygon: tuple
+    setback_m: float
+    spacing_m: float
+    point_block_m: float
+    footprint_m2: float | None
+    project_name: str
+    project_code: str
+    parcel_no: str
+    cadastral_municipality: str
+    map_image_bytes: bytes | None = None
+
+    @classmethod
+    def from_dict(cls, inputs) -> "ProjectInputs":
+        if isinstance(inputs, ProjectInputs):
+            return inputs
+        data = {**DEFAULT_INPUTS, **inputs}
+        values = [conv(data.get(name)) for name, conv in _CONVERTERS]
+        p = cls(*values)
+        for name in _NON_NEGATIVE:
+            value = getattr(p, name)
+            if value is not None and value < 0:
+                raise ValueError(f"{name} ne sme biti negativen ({getattr(p, name)})")
+        return p
+
+    def to_dict(self) -> dict:
+        d = dict(zip(self._FIELDS, self._GET(self)))
+        d["typologies"] = [t.to_dict() for t in self.typologies]
+        d["parcel_polygon"] = [list(pt) for pt in self.parcel_polygon]
+        if d["map_image_bytes"] is None:
+            del d["map_image_bytes"]
+        return d
+
+    def replace(self, **changes) -> "ProjectInputs":
+        return dataclasses.replace(self, **changes)
+
+
+# Rezultati niso "frozen": konstrukcija frozen dataclass (object.__setattr__ za vsako polje)
+# je v CPythonu dražja od samega izračuna. Obravnavaj jih kot read-only.
+@dataclass(slots=True)
+class Economics(_RecordMixin):
+    land_cost: float
+    hard_cost: float
+    soft_cost: float
+    total_invest: float
+    btp_below: float
+    sales_price_m2: float
+    revenue: float
+    margin_abs: float
+    margin_pct: float
+    cost_per_m2_nfa: float
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._FIELDS, self._GET(self)))
+
+
+@dataclass(slots=True)
+class ComputeResult(_RecordMixin):
+    """Result of `evaluate`; `to_dict()` gives the dict returned by `compute`."""
+    P: float
+
+    # FI
+    FI_limit: float
+    FI: float
+    fi_allowed_btp: float
+    fi_reserve_btp: float
+    fi_ok: bool
+
+    # FZ / FZP
+    FZ: float
+    FZP_min: float
+    building_footprint: float
+    fz_max_footprint: float
+    fz_ok: bool
+
+    # program
+    units: int
+    units_auto: int
+    units_mode: str
+    floors: int
+    btp_above: float
+    nfa: float
+    avg_unit_m2: float
+
+    # parking
+    pm_total: int
+    pm_residents: int
+    pm_visitors: int
+
+    scenario: str
+    basement_levels: int
+    pm_in_basement: int
+    pm_on_surface: int
+
+    basement_footprint: float
+    surface_parking_area: float
+    growing_area: float
+
+    fzp: float
+    fzp_ok: bool
+    basement_exceeds_building: bool
+    status: str
+
+    econ: Economics
+
+    def to_dict(self) -> dict:
+        d = dict(zip(self._FIELDS, self._GET(self)))
+        d["econ"] = self.econ.to_dict()
+        return d
+
+
+for _cls in (Typology, ProjectInputs, Economics, ComputeResult):
+    _cls._FIELDS = tuple(f.name for f in dataclasses.fields(_cls))
+    _cls._GET = operator.attrgetter(*_cls._FIELDS)
+
+
+def _to_int(v) -> int:
+    return int(float(v)) if isinstance(v, str) else int(v or 0)
+
+def _to_str(v) -> str:
+    return "" if v is None else str(v)
+
+def _to_opt_float(v):
+    return None if v is None or v == "" else float(v)
+
+def _to_bool(v) -> bool:
+    return v.strip().lower() in ("1", "true", "da", "yes") if isinstance(v, str) else bool(v)
+
+def _to_polygon(v) -> tuple:
+    return tuple((float(x), float(y)) for x, y in (v or ()))
+
+def _to_typologies(v) -> tuple:
+    return tuple(Typology.from_dict(t) for t in (v or ()))
+
+def _to_bytes(v):
+    return bytes(v) if v else None
+
+_CONVERTERS = tuple(
+    (f.name, {"typologies": _to_typologies, "parcel_polygon": _to_polygon, "map_image_bytes": _to_bytes,
+              "footprint_m2": _to_opt_float}.get(f.name)
+     or {int: _to_int, float: float, bool: _to_bool}.get(f.type, _to_str))
+    for f in dataclasses.fields(ProjectInputs)
+)
+_NON_NEGATIVE = (
+    "parcela_m2", "fi", "fz", "fzp_min_pct", "stevilo_lamel", "dolzina_lamele_m",
+    "sirina_lamele_m", "st_etas_nadz", "pm_na_stanovanje", "visitor_share", "footprint_m2",
+)
+
+
+def _avg_unit_size(typologies, default_avg_unit_m2: float) -> float:
+    total_share = sum(x["share_pct"] for x in typologies)
     if total_share <= 0:
-        return float(inputs["default_avg_unit_m2"])
+        return float(default_avg_unit_m2)
 
     avg = 0.0
-    for x in t:
+    for x in typologies:
         w = x["share_pct"] / total_share
         avg += w * x["avg_m2"]
     return max(10.0, avg)
 
+def compute_avg_unit_size_m2(inputs: dict) -> float:
+    return _avg_unit_size(inputs["typologies"], inputs["default_avg_unit_m2"])
+
+def building_footprint(inputs: dict) -> float:
+    """Building footprint [m²]: the geometry footprint if set (0 = nothing placed), else lamellas × length × width."""
+    fp = inputs.get("footprint_m2")
+    if fp is not None:
+        return float(fp)
+    return float(inputs["stevilo_lamel"]) * float(inputs["dolzina_lamele_m"]) * float(inputs["sirina_lamele_m"])
+
+def basement_level_area(inputs, pm_in_basement: int, levels: int) -> float:
+    """Basement footprint for `pm_in_basement` spaces on `levels` levels (before clipping to the parcel).
+
+    With `garage_layout` the garage is laid out (`garage.size`, ramp included); otherwise
+    spaces × m² per space / efficiency, spread over the levels, plus the ramp allowance.
+    """
+    if inputs["garage_layout"]:
+        return garage.footprint(pm_in_basement, levels, inputs["stall_w_m"], inputs["stall_d_m"],
+                                inputs["aisle_w_m"], inputs["ramp_len_m"])
+    eff = float(inputs["garage_eff_k1"]) if levels == 1 else float(inputs["garage_eff_k2"])
+    garage_area_total = pm_in_basement * float(inputs["area_per_pm_garage_m2"]) / max(eff, 0.01)
+    return garage_area_total / levels + float(inputs["ramp_footprint_m2"])
+
 def compute_units(inputs: dict, building_footprint: float) -> dict:
     floors = int(inputs["st_etas_nadz"])
     net_to_gross = float(inputs["net_to_gross"])
@@ -22,7 +368,7 @@ def compute_units(inputs: dict, building_footprint: float) -> dict:
 
     btp_above = building_footprint * floors
     nfa = btp_above * clamp01(net_to_gross)
-    units_auto = int(max(1, math.floor(nfa / max(10.0, avg_unit_m2))))
+    units_auto = int(max(1, math.floor(nfa / max(10.0, avg_unit_m2)))) if building_footprint > 0 else 0
 
     return {
         "floors": floors,
@@ -32,59 +378,64 @@ def compute_units(inputs: dict, building_footprint: float) -> dict:
         "units_auto": units_auto,
     }
 
-def compute_economics(inputs: dict, r: dict) -> dict:
-    land_price = float(inputs["land_price_eur_m2"])
-    cost_above = float(inputs["cost_above_eur_m2"])
-    cost_below = float(inputs["cost_below_eur_m2"])
-    soft_pct = float(inputs["soft_cost_pct"]) / 100.0
-    sales_price_m2 = float(inputs["sales_price_eur_m2"])
-
-    P = float(r["P"])
-    btp_above = float(r["btp_above"])
-    btp_below = float(r["basement_footprint"]) * int(r["basement_levels"])
-    nfa = float(r["nfa"])
-
-    land_cost = P * land_price
-    hard_cost = btp_above * cost_above + btp_below * cost_below
-    soft_cost = (land_cost + hard_cost) * soft_pct
+def _economics(p: "ProjectInputs", P: float, btp_above: float, btp_below: float, nfa: float) -> Economics:
+    land_cost = P * p.land_price_eur_m2
+    hard_cost = btp_above * p.cost_above_eur_m2 + btp_below * p.cost_below_eur_m2
+    soft_cost = (land_cost + hard_cost) * (p.soft_cost_pct / 100.0)
     total_invest = land_cost + hard_cost + soft_cost
 
     cost_per_m2_nfa = total_invest / max(1.0, nfa)
 
-    revenue = nfa * sales_price_m2
+    revenue = nfa * p.sales_price_eur_m2
     margin_abs = revenue - total_invest
     margin_pct = (margin_abs / revenue) if revenue > 0 else 0.0
 
-    return {
-        "land_cost": land_cost,
-        "hard_cost": hard_cost,
-        "soft_cost": soft_cost,
-        "total_invest": total_invest,
-        "btp_below": btp_below,
-        "sales_price_m2": sales_price_m2,
-        "revenue": revenue,
-        "margin_abs": margin_abs,
-        "margin_pct": margin_pct,
-        "cost_per_m2_nfa": cost_per_m2_nfa,
-    }
+    return Economics(
+        land_cost=land_cost,
+        hard_cost=hard_cost,
+        soft_cost=soft_cost,
+        total_invest=total_invest,
+        btp_below=btp_below,
+        sales_price_m2=p.sales_price_eur_m2,
+        revenue=revenue,
+        margin_abs=margin_abs,
+        margin_pct=margin_pct,
+        cost_per_m2_nfa=cost_per_m2_nfa,
+    )
 
-def compute(inputs: dict) -> dict:
-    P = float(inputs["parcela_m2"])
+def compute_economics(inputs: dict, r: dict) -> dict:
+    p = ProjectInputs.from_dict(inputs)
+    btp_below = float(r["basement_footprint"]) * int(r["basement_levels"])
+    return _economics(p, float(r["P"]), float(r["btp_above"]), btp_below, float(r["nfa"])).to_dict()
+
+def evaluate(p: ProjectInputs) -> ComputeResult:
+    """Typed calculation: `ProjectInputs` in, `ComputeResult` out (no coercion, no side effects)."""
+    P = p.parcela_m2
 
-    FI_limit = float(inputs["fi"])
-    FZ = float(inputs["fz"])
-    FZP_min = float(inputs["fzp_min_pct"]) / 100.0
+    FI_limit = p.fi
+    FZ = p.fz
+    FZP_min = p.fzp_min_pct / 100.0
 
-    n_lamel = int(inputs["stevilo_lamel"])
-    L = float(inputs["dolzina_lamele_m"])
-    W = float(inputs["sirina_lamele_m"])
-    building_footprint = n_lamel * L * W
+    building_footprint = p.footprint_m2
+    if building_footprint is None:
+        building_footprint = p.stevilo_lamel * p.dolzina_lamele_m * p.sirina_lamele_m
 
     # Nadzemni program (BTP, NFA, št. stanovanj)
-    u = compute_units(inputs, building_footprint)
+    floors = p.st_etas_nadz
+    total_share = sum(t.share_pct for t in p.typologies)
+    if total_share > 0:
+        avg_unit_m2 = 0.0
+        for t in p.typologies:
+            avg_unit_m2 += t.share_pct / total_share * t.avg_m2
+        avg_unit_m2 = max(10.0, avg_unit_m2)
+    else:
+        avg_unit_m2 = p.default_avg_unit_m2
+    btp_above = building_footprint * floors
+    nfa = btp_above * clamp01(p.net_to_gross)
+    # brez stavb (npr. nobena ne paše na parcelo) tudi ni stanovanj
+    units_auto = int(max(1, math.floor(nfa / max(10.0, avg_unit_m2)))) if building_footprint > 0 else 0
 
     # FI kontrola: primerjamo nadzemni BTP (klet se ne šteje) z dopustnim (FI_limit * P)
-    btp_above = float(u["btp_above"])
     fi_allowed_btp = FI_limit * P
     fi_reserve_btp = fi_allowed_btp - btp_above
     FI_achieved = (btp_above / P) if P else 0.0
@@ -95,32 +446,21 @@ def compute(inputs: dict) -> dict:
     fz_ok = building_footprint <= fz_max_footprint + 1e-9
 
     # Stanovanja: RAČUNSKO (zaklenjeno na izračun) ali AVTO (ročno prilagajanje)
-    mode = inputs.get("units_mode", "RAČUNSKO")
+    mode = p.units_mode
     if mode == "RAČUNSKO":
-        units = int(u["units_auto"])
-        inputs["st_stanovanj"] = units
+        units = units_auto
     elif mode == "AVTO":
-        units = int(inputs["st_stanovanj"] or u["units_auto"])
+        units = p.st_stanovanj or units_auto
     else:
-        units = int(inputs.get("st_stanovanj", u["units_auto"]))
+        units = p.st_stanovanj
 
     # Parkiranje
-    pm_per_unit = float(inputs["pm_na_stanovanje"])
-    pm_total = int(math.ceil(units * pm_per_unit))
+    pm_total = int(math.ceil(units * p.pm_na_stanovanje))
 
-    visitor_share = float(inputs["visitor_share"])
-    pm_visitors = int(math.ceil(pm_total * visitor_share))
+    pm_visitors = int(math.ceil(pm_total * p.visitor_share))
     pm_residents = int(pm_total - pm_visitors)
 
-    # Parkirni parametri
-    area_per_pm_garage = float(inputs["area_per_pm_garage_m2"])
-    area_per_pm_surface = float(inputs["area_per_pm_surface_m2"])
-    eff_k1 = float(inputs["garage_eff_k1"])
-    eff_k2 = float(inputs["garage_eff_k2"])
-    ramp_add = float(inputs["ramp_footprint_m2"])
-    surface_mult = float(inputs["surface_mult"])
-
-    scenario = str(inputs["scenario"])
+    scenario = p.scenario
 
     if scenario == "K-1":
         basement_levels = 1
@@ -135,13 +475,9 @@ def compute(inputs: dict) -> dict:
         pm_in_basement = pm_total
         pm_on_surface = 0
 
-    eff = eff_k1 if basement_levels == 1 else eff_k2
-    garage_area_total = (pm_in_basement * area_per_pm_garage) / max(eff, 0.01)
-
-    basement_footprint = garage_area_total / basement_levels + ramp_add
-    basement_footprint = min(basement_footprint, P)
+    basement_footprint = min(basement_level_area(p, pm_in_basement, basement_levels), P)
 
-    surface_parking_area = pm_on_surface * area_per_pm_surface * surface_mult
+    surface_parking_area = pm_on_surface * p.area_per_pm_surface_m2 * p.surface_mult
 
     growing_area = max(0.0, P - basement_footprint - surface_parking_area)
     fzp = (growing_area / P) if P else 0.0
@@ -150,7 +486,9 @@ def compute(inputs: dict) -> dict:
     basement_exceeds_building = basement_footprint > building_footprint + 1e-9
 
     # Status (prioriteta neskladnosti)
-    if not fi_ok:
+    if building_footprint <= 0:
+        status = "NESKLADNO (ni stavb)"
+    elif not fi_ok:
         status = "NESKLADNO (FI)"
     elif not fz_ok:
         status = "NESKLADNO (FZ)"
@@ -164,18 +502,473 @@ def compute(inputs: dict) -> dict:
         else:
             status = "TVEGANO (FZP postane omejitev)" if basement_exceeds_building else "POGOJNO (lahko OK)"
 
+    econ = _economics(p, P, btp_above, basement_footprint * basement_levels, nfa)
+
+    return ComputeResult(
+        P=P,
+        FI_limit=FI_limit,
+        FI=FI_achieved,
+        fi_allowed_btp=fi_allowed_btp,
+        fi_reserve_btp=fi_reserve_btp,
+        fi_ok=fi_ok,
+        FZ=FZ,
+        FZP_min=FZP_min,
+        building_footprint=building_footprint,
+        fz_max_footprint=fz_max_footprint,
+        fz_ok=fz_ok,
+        units=units,
+        units_auto=units_auto,
+        units_mode=mode,
+        floors=floors,
+        btp_above=btp_above,
+        nfa=nfa,
+        avg_unit_m2=avg_unit_m2,
+        pm_total=pm_total,
+        pm_residents=pm_residents,
+        pm_visitors=pm_visitors,
+        scenario=scenario,
+        basement_levels=basement_levels,
+        pm_in_basement=pm_in_basement,
+        pm_on_surface=pm_on_surface,
+        basement_footprint=basement_footprint,
+        surface_parking_area=surface_parking_area,
+        growing_area=growing_area,
+        fzp=fzp,
+        fzp_ok=fzp_ok,
+        basement_exceeds_building=basement_exceeds_building,
+        status=status,
+        econ=econ,
+    )
+
+def compute(inputs: dict) -> dict:
+    """Dict adapter around `evaluate`; `inputs` may be a dict or `ProjectInputs`. Does not modify `inputs`."""
+    return evaluate(ProjectInputs.from_dict(inputs)).to_dict()
+
+def flatten_result(r: dict) -> dict:
+    """Flat (one level) view of a `compute` result; economics fields get an `econ_` prefix."""
+    flat = {k: v for k, v in r.items() if k != "econ"}
+    for k, v in r.get("econ", {}).items():
+        flat[f"econ_{k}"] = v
+    return flat
+
+
+def flatten_batch(r: dict) -> dict:
+    """`flatten_result` for a `compute_batch` result: every field a 1-D array of length n."""
+    n = np.asarray(r["FI"]).shape[0]
+    return {k: np.broadcast_to(np.asarray(v), (n,)) for k, v in flatten_result(r).items()}
+
+
+# =================================================
+# INVERZNI IZRAČUN (mejne vrednosti)
+# =================================================
+# (omejitev, prosta spremenljivka) -> "max" / "min": smer, v kateri meja velja
+SOLVE_TARGETS = {
+    ("fi", "st_etas_nadz"): "max",
+    ("fi", "stevilo_lamel"): "max",
+    ("fi", "dolzina_lamele_m"): "max",
+    ("fi", "sirina_lamele_m"): "max",
+    ("fi", "parcela_m2"): "min",
+    ("fi", "fi"): "min",
+    ("fz", "stevilo_lamel"): "max",
+    ("fz", "dolzina_lamele_m"): "max",
+    ("fz", "sirina_lamele_m"): "max",
+    ("fz", "parcela_m2"): "min",
+    ("fz", "fz"): "min",
+    ("fzp", "pm_na_stanovanje"): "max",
+    ("fzp", "parcela_m2"): "min",
+    ("fzp", "ramp_footprint_m2"): "max",
+    ("fzp", "fzp_min_pct"): "max",
+    ("margin", "sales_price_eur_m2"): "min",
+    ("margin", "land_price_eur_m2"): "max",
+    ("margin", "cost_above_eur_m2"): "max",
+    ("margin", "cost_below_eur_m2"): "max",
+    ("margin", "soft_cost_pct"): "max",
+}
+
+
+def _max_int(ok, guess: float) -> int | None:
+    """Largest integer n >= 0 with ok(n), starting from a closed-form guess.
+
+    `ok` must be monotone (true up to the boundary); the guess only needs to be within a
+    step or two, the exact predicate settles rounding at the boundary.
+    """
+    n = max(0, int(math.floor(guess)))
+    while n > 0 and not ok(n):
+        n -= 1
+    if not ok(n):
+        return None
+    while ok(n + 1):
+        n += 1
+    return n
+
+
+def _bisect_int(ok, lo: int = 0) -> int | None:
+    """Largest integer n >= lo with ok(n) for a monotone predicate (bracketing + bisection)."""
+    if not ok(lo):
+        return None
+    hi = max(1, lo * 2)
+    while ok(hi):
+        lo, hi = hi, hi * 2
+        if hi > 10**9:
+            return lo
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if ok(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _fzp_ok_for_pm_total(inputs: dict, r: dict, pm_total: int) -> bool:
+    """FZP check for a given total number of parking spaces (same chain as `compute`)."""
+    P = r["P"]
+    pm_visitors = int(math.ceil(pm_total * float(inputs["visitor_share"])))
+    if r["scenario"] == "K-1 + teren":
+        pm_in_basement, pm_on_surface = pm_total - pm_visitors, pm_visitors
+    else:
+        pm_in_basement, pm_on_surface = pm_total, 0
+
+    basement = min(basement_level_area(inputs, pm_in_basement, r["basement_levels"]), P)
+    surface = pm_on_surface * float(inputs["area_per_pm_surface_m2"]) * float(inputs["surface_mult"])
+    growing = max(0.0, P - basement - surface)
+    return ((growing / P) if P else 0.0) >= r["FZP_min"] - 1e-9
+
+
+def solve(inputs: dict, constraint: str, free: str) -> float | None:
+    """Boundary value of `free` at which `constraint` is exactly met, all else unchanged.
+
+    constraint: "fi", "fz", "fzp" or "margin" (margin_abs >= 0, i.e. break-even).
+    `SOLVE_TARGETS` lists the supported pairs and whether the result is a maximum or a
+    minimum. Linear relations are inverted in closed form; where `ceil`/`floor` make the
+    model piecewise (units, parking spaces) the integer boundary is bracketed and checked
+    with the same tolerances as `compute`. Integer inputs return an int. Returns None if no
+    value satisfies the constraint and math.inf if it is never binding. For the lamella
+    dimensions the geometry footprint (`footprint_m2`) is ignored: the boundary is that of
+    lamellas × length × width.
+    """
+    if (constraint, free) not in SOLVE_TARGETS:
+        raise ValueError(f"Nepodprt inverzni izračun: {constraint} / {free}")
+
+    x = dict(inputs)
+    if free in ("stevilo_lamel", "dolzina_lamele_m", "sirina_lamele_m"):
+        x["footprint_m2"] = None
+    r = compute(x)
+    P = r["P"]
+    n_lamel = int(x["stevilo_lamel"])
+    L = float(x["dolzina_lamele_m"])
+    W = float(x["sirina_lamele_m"])
+    floors = r["floors"]
+    fp = r["building_footprint"]
+    btp = r["btp_above"]
+
+    if constraint == "fi":
+        allowed = r["fi_allowed_btp"]
+        if free == "st_etas_nadz":
+            if fp <= 0:
+                return math.inf
+            return _max_int(lambda f: fp * f <= allowed + 1e-9, allowed / fp)
+        if free == "stevilo_lamel":
+            per_lamel = L * W * floors
+            if per_lamel <= 0:
+                return math.inf
+            return _max_int(lambda n: n * L * W * floors <= allowed + 1e-9, allowed / per_lamel)
+        if free == "dolzina_lamele_m":
+            per_m = n_lamel * W * floors
+            return allowed / per_m if per_m > 0 else math.inf
+        if free == "sirina_lamele_m":
+            per_m = n_lamel * L * floors
+            return allowed / per_m if per_m > 0 else math.inf
+        if free == "parcela_m2":
+            return btp / r["FI_limit"] if r["FI_limit"] > 0 else None
+        return btp / P if P else None
+
+    if constraint == "fz":
+        allowed = r["fz_max_footprint"]
+        if free == "stevilo_lamel":
+            if L * W <= 0:
+                return math.inf
+            return _max_int(lambda n: n * L * W <= allowed + 1e-9, allowed / (L * W))
+        if free == "dolzina_lamele_m":
+            return allowed / (n_lamel * W) if n_lamel * W > 0 else math.inf
+        if free == "sirina_lamele_m":
+            return allowed / (n_lamel * L) if n_lamel * L > 0 else math.inf
+        if free == "parcela_m2":
+            return fp / r["FZ"] if r["FZ"] > 0 else None
+        return fp / P if P else None
+
+    if constraint == "fzp":
+        FZP_min = r["FZP_min"]
+        if free == "fzp_min_pct":
+            return r["fzp"] * 100.0
+
+        p = ProjectInputs.from_dict(x)
+        basement = basement_level_area(p, r["pm_in_basement"], r["basement_levels"])
+
+        if free == "ramp_footprint_m2":
+            if p.garage_layout:
+                # rampa je del tlorisa garaže, dodatek nima vpliva
+                return math.inf if r["fzp_ok"] else None
+            ramp = P * (1.0 - FZP_min) - r["surface_parking_area"] - (basement - p.ramp_footprint_m2)
+            return ramp if ramp >= 0 else None
+        if free == "parcela_m2":
+            # klet in parkiranje na terenu sta neodvisna od P (dokler klet ne zapolni parcele)
+            if FZP_min >= 1.0:
+                return None
+            return (basement + r["surface_parking_area"]) / (1.0 - FZP_min)
+
+        # PM norma: poiščemo največje skupno število PM, nato normo, ki ga ne preseže
+        units = r["units"]
+        if FZP_min <= 1e-9 or units <= 0:
+            return math.inf
+        T = _bisect_int(lambda t: _fzp_ok_for_pm_total(p, r, t))
+        if T is None:
+            return None
+        norm = T / units
+        while norm > 0 and math.ceil(units * norm) > T:
+            norm = math.nextafter(norm, 0.0)
+        return norm
+
+    # margin >= 0
+    econ = r["econ"]
+    revenue = econ["revenue"]
+    soft = float(x["soft_cost_pct"]) / 100.0
+    land = econ["land_cost"]
+    hard = econ["hard_cost"]
+    btp_below = econ["btp_below"]
+    if free == "sales_price_eur_m2":
+        return econ["total_invest"] / r["nfa"] if r["nfa"] > 0 else None
+    if free == "soft_cost_pct":
+        base = land + hard
+        return (revenue / base - 1.0) * 100.0 if base > 0 else math.inf
+    budget = revenue / (1.0 + soft)  # land + hard, ki ju prihodki še pokrijejo
+    if free == "land_price_eur_m2":
+        return (budget - hard) / P if P else None
+    if free == "cost_above_eur_m2":
+        rest = budget - land - btp_below * float(x["cost_below_eur_m2"])
+        return rest / btp if btp > 0 else math.inf
+    rest = budget - land - btp * float(x["cost_above_eur_m2"])
+    return rest / btp_below if btp_below > 0 else math.inf
+
+
+# =================================================
+# VEKTORIZIRAN IZRAČUN (batch)
+# =================================================
+SCENARIOS = ("K-1", "K-1 + teren", "K-2")
+
+# Ključi, ki jih compute_batch bere kot stolpce (ali skalarje iz base).
+BATCH_KEYS = (
+    "parcela_m2", "fi", "fz", "fzp_min_pct",
+    "stevilo_lamel", "dolzina_lamele_m", "sirina_lamele_m",
+    "st_etas_nadz", "net_to_gross",
+    "pm_na_stanovanje", "visitor_share",
+    "area_per_pm_garage_m2", "area_per_pm_surface_m2",
+    "garage_eff_k1", "garage_eff_k2", "ramp_footprint_m2", "surface_mult",
+    "land_price_eur_m2", "cost_above_eur_m2", "cost_below_eur_m2",
+    "soft_cost_pct", "sales_price_eur_m2",
+)
+
+# Mere tlorisa garaže (privzeto iz DEFAULT_INPUTS, če jih stolpci in osnova nimajo)
+GARAGE_KEYS = ("stall_w_m", "stall_d_m", "aisle_w_m", "ramp_len_m")
+
+
+def scenario_codes(values) -> np.ndarray:
+    """Map scenario labels ("K-1", "K-1 + teren", "K-2") or codes (0, 1, 2) to int codes."""
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iuf":
+        return arr.astype(np.int64)
+    flat = np.atleast_1d(arr).ravel()
+    lookup = {name: i for i, name in enumerate(SCENARIOS)}
+    # neznan scenarij se obnaša kot K-2 (enako kot v compute)
+    codes = np.fromiter((lookup.get(str(v), 2) for v in flat), dtype=np.int64, count=flat.size)
+    return codes.reshape(arr.shape)
+
+
+def _batch_columns(cols: dict, base: dict | None = None) -> dict:
+    """Collect batch inputs as equally long 1-D NumPy arrays.
+
+    Values in `cols` may be arrays or scalars; keys missing from `cols` are taken from `base`.
+    """
+    base = base or {}
+
+    def get(key, default=None):
+        if key in cols:
+            return cols[key]
+        if key in base:
+            return base[key]
+        if default is not None:
+            return default
+        raise KeyError(key)
+
+    n = 1
+    for v in cols.values():
+        if isinstance(v, (list, tuple, np.ndarray)) and not isinstance(v, str):
+            a = np.asarray(v)
+            if a.ndim:
+                n = max(n, a.shape[0])
+
+    c = {"n": n}
+    for key in BATCH_KEYS:
+        c[key] = np.broadcast_to(np.asarray(get(key), dtype=np.float64), (n,))
+
+    c["scenario_code"] = np.broadcast_to(scenario_codes(get("scenario")), (n,))
+
+    if "avg_unit_m2" in cols:
+        avg = np.asarray(cols["avg_unit_m2"], dtype=np.float64)
+    else:
+        src = cols if "typologies" in cols else base
+        avg = np.float64(compute_avg_unit_size_m2(src))
+    c["avg_unit_m2"] = np.broadcast_to(avg, (n,))
+
+    # NaN = ni geometrijskega tlorisa (None v slovarju vhodov)
+    footprint = cols["footprint_m2"] if "footprint_m2" in cols else base.get("footprint_m2")
+    c["footprint_m2"] = np.broadcast_to(np.asarray(footprint, dtype=np.float64), (n,))
+    c["garage_layout"] = np.broadcast_to(np.asarray(get("garage_layout", False), dtype=bool), (n,))
+    for key in GARAGE_KEYS:
+        c[key] = np.broadcast_to(np.asarray(get(key, DEFAULT_INPUTS[key]), dtype=np.float64), (n,))
+
+    mode = np.broadcast_to(np.asarray(get("units_mode", "RAČUNSKO")), (n,))
+    c["units_mode"] = mode
+    c["st_stanovanj"] = np.broadcast_to(np.asarray(get("st_stanovanj", 0), dtype=np.float64), (n,))
+    return c
+
+
+def compute_economics_batch(c: dict, r: dict) -> dict:
+    """Vectorized counterpart of `compute_economics` (arrays in, arrays out)."""
+    soft_pct = c["soft_cost_pct"] / 100.0
+
+    btp_below = r["basement_footprint"] * r["basement_levels"]
+
+    land_cost = r["P"] * c["land_price_eur_m2"]
+    hard_cost = r["btp_above"] * c["cost_above_eur_m2"] + btp_below * c["cost_below_eur_m2"]
+    soft_cost = (land_cost + hard_cost) * soft_pct
+    total_invest = land_cost + hard_cost + soft_cost
+
+    cost_per_m2_nfa = total_invest / np.maximum(1.0, r["nfa"])
+
+    revenue = r["nfa"] * c["sales_price_eur_m2"]
+    margin_abs = revenue - total_invest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin_pct = np.where(revenue > 0, margin_abs / revenue, 0.0)
+
+    return {
+        "land_cost": land_cost,
+        "hard_cost": hard_cost,
+        "soft_cost": soft_cost,
+        "total_invest": total_invest,
+        "btp_below": btp_below,
+        "sales_price_m2": np.array(c["sales_price_eur_m2"]),
+        "revenue": revenue,
+        "margin_abs": margin_abs,
+        "margin_pct": margin_pct,
+        "cost_per_m2_nfa": cost_per_m2_nfa,
+    }
+
+
+def compute_batch(cols: dict, base: dict | None = None) -> dict:
+    """Evaluate many scenarios at once.
+
+    `cols` maps input keys (same names as the `inputs` dict) to 1-D arrays or scalars;
+    anything not given is taken from `base` (e.g. the current project inputs). The scenario
+    may be given as labels or codes (0 = K-1, 1 = K-1 + teren, 2 = K-2). An `avg_unit_m2`
+    column overrides the typology blend.
+
+    Returns the same fields as `compute`, each as an array of length n (econ included).
+    """
+    c = _batch_columns(cols, base)
+
+    P = c["parcela_m2"]
+    FI_limit = c["fi"]
+    FZ = c["fz"]
+    FZP_min = c["fzp_min_pct"] / 100.0
+
+    n_lamel = np.trunc(c["stevilo_lamel"])
+    fp = c["footprint_m2"]
+    building_footprint = np.where(np.isnan(fp), n_lamel * c["dolzina_lamele_m"] * c["sirina_lamele_m"], fp)
+
+    # Nadzemni program
+    floors = np.trunc(c["st_etas_nadz"]).astype(np.int64)
+    avg_unit_m2 = c["avg_unit_m2"]
+    btp_above = building_footprint * floors
+    nfa = btp_above * np.clip(c["net_to_gross"], 0.0, 1.0)
+    units_auto = np.where(
+        building_footprint > 0, np.maximum(1, np.floor(nfa / np.maximum(10.0, avg_unit_m2))), 0
+    ).astype(np.int64)
+
+    # FI / FZ kontrola
+    fi_allowed_btp = FI_limit * P
+    fi_reserve_btp = fi_allowed_btp - btp_above
+    with np.errstate(divide="ignore", invalid="ignore"):
+        FI_achieved = np.where(P != 0, btp_above / P, 0.0)
+    fi_ok = btp_above <= fi_allowed_btp + 1e-9
+
+    fz_max_footprint = FZ * P
+    fz_ok = building_footprint <= fz_max_footprint + 1e-9
+
+    # Stanovanja: RAČUNSKO, AVTO (ročno, 0 = izračun) ali ročno (enako kot v compute)
+    mode = c["units_mode"]
+    st = np.trunc(c["st_stanovanj"]).astype(np.int64)
+    auto = (mode == "RAČUNSKO") | ((mode == "AVTO") & (st == 0))
+    units = np.where(auto, units_auto, st)
+
+    # Parkiranje
+    pm_total = np.ceil(units * c["pm_na_stanovanje"]).astype(np.int64)
+    pm_visitors = np.ceil(pm_total * c["visitor_share"]).astype(np.int64)
+    pm_residents = pm_total - pm_visitors
+
+    code = c["scenario_code"]
+    basement_levels = np.where(code == 2, 2, 1)
+    pm_in_basement = np.where(code == 1, pm_residents, pm_total)
+    pm_on_surface = np.where(code == 1, pm_visitors, 0)
+
+    eff = np.where(basement_levels == 1, c["garage_eff_k1"], c["garage_eff_k2"])
+    garage_area_total = (pm_in_basement * c["area_per_pm_garage_m2"]) / np.maximum(eff, 0.01)
+    basement_area = garage_area_total / basement_levels + c["ramp_footprint_m2"]
+
+    # tloris garaže (enake kombinacije PM in etaž se dimenzionirajo enkrat)
+    laid_out = c["garage_layout"]
+    if laid_out.any():
+        basement_area = basement_area.copy()
+        basement_area[laid_out] = garage.footprints(
+            pm_in_basement[laid_out], basement_levels[laid_out], c["stall_w_m"][laid_out],
+            c["stall_d_m"][laid_out], c["aisle_w_m"][laid_out], c["ramp_len_m"][laid_out],
+        )
+
+    basement_footprint = np.minimum(basement_area, P)
+
+    surface_parking_area = pm_on_surface * c["area_per_pm_surface_m2"] * c["surface_mult"]
+
+    growing_area = np.maximum(0.0, P - basement_footprint - surface_parking_area)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fzp = np.where(P != 0, growing_area / P, 0.0)
+    fzp_ok = fzp >= FZP_min - 1e-9
+
+    basement_exceeds_building = basement_footprint > building_footprint + 1e-9
+
+    # Status (enaka prioriteta kot v compute)
+    ok_status = np.select(
+        [code == 2, code == 1, basement_exceeds_building],
+        ["OPTIMALNO", "MEJNO / KOMPROMIS", "TVEGANO (FZP postane omejitev)"],
+        default="POGOJNO (lahko OK)",
+    )
+    status = np.select(
+        [building_footprint <= 0, ~fi_ok, ~fz_ok, ~fzp_ok],
+        ["NESKLADNO (ni stavb)", "NESKLADNO (FI)", "NESKLADNO (FZ)", "NESKLADNO (FZP)"],
+        default=ok_status,
+    )
+
     r = {
-        "P": P,
+        "P": np.array(P),
 
         # FI
-        "FI_limit": FI_limit,
+        "FI_limit": np.array(FI_limit),
         "FI": FI_achieved,
         "fi_allowed_btp": fi_allowed_btp,
         "fi_reserve_btp": fi_reserve_btp,
         "fi_ok": fi_ok,
 
         # FZ / FZP
-        "FZ": FZ,
+        "FZ": np.array(FZ),
         "FZP_min": FZP_min,
         "building_footprint": building_footprint,
         "fz_max_footprint": fz_max_footprint,
@@ -183,19 +976,19 @@ def compute(inputs: dict) -> dict:
 
         # program
         "units": units,
-        "units_auto": u["units_auto"],
-        "units_mode": inputs["units_mode"],
-        "floors": u["floors"],
+        "units_auto": units_auto,
+        "units_mode": np.array(c["units_mode"]),
+        "floors": floors,
         "btp_above": btp_above,
-        "nfa": u["nfa"],
-        "avg_unit_m2": u["avg_unit_m2"],
+        "nfa": nfa,
+        "avg_unit_m2": np.array(avg_unit_m2),
 
         # parking
         "pm_total": pm_total,
         "pm_residents": pm_residents,
         "pm_visitors": pm_visitors,
 
-        "scenario": scenario,
+        "scenario": np.asarray(SCENARIOS)[code],
         "basement_levels": basement_levels,
         "pm_in_basement": pm_in_basement,
         "pm_on_surface": pm_on_surface,
@@ -210,5 +1003,5 @@ def compute(inputs: dict) -> dict:
         "status": status,
     }
 
-    r["econ"] = compute_economics(inputs, r)
+    r["econ"] = compute_economics_batch(c, r)
     return r
@@ -0,0 +1,288 @@
+"""Incremental evaluation of the calculation chain as a small dataflow graph.
+
+The model of ``core.evaluate`` is split into named nodes. Each node declares the input
+keys it reads and the upstream nodes it depends on, and returns a dict of result
+fields. ``Evaluator.update(inputs)`` diffs the inputs against the previous call and
+recomputes only the nodes downstream of the changed keys; a node whose outputs did not
+change stops the propagation (e.g. a new sales price recomputes only ``econ``).
+
+The formulas must stay identical to ``core.evaluate`` (as for ``core.compute_batch``):
+``Evaluator().update(inputs)`` returns the same dict as ``core.compute(inputs)``.
+"""
+import copy
+import math
+from typing import Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+from core import _CONVERTERS, _NON_NEGATIVE, DEFAULT_INPUTS, ComputeResult, basement_level_area, clamp01
+
+
+class Node(NamedTuple):
+    name: str
+    keys: Tuple[str, ...]      # vhodni ključi (DEFAULT_INPUTS)
+    deps: Tuple[str, ...]      # predhodna vozlišča
+    fn: Callable[[dict], dict]  # v (vhodi + izhodi predhodnikov) -> izhodi
+
+
+# =================================================
+# VOZLIŠČA (isti izrazi kot core.evaluate)
+# =================================================
+def _limits(v: dict) -> dict:
+    P = v["parcela_m2"]
+    return {
+        "P": P,
+        "FI_limit": v["fi"],
+        "FZ": v["fz"],
+        "FZP_min": v["fzp_min_pct"] / 100.0,
+        "fi_allowed_btp": v["fi"] * P,
+        "fz_max_footprint": v["fz"] * P,
+    }
+
+
+def _footprint(v: dict) -> dict:
+    fp = v["footprint_m2"]
+    return {"building_footprint": v["stevilo_lamel"] * v["dolzina_lamele_m"] * v["sirina_lamele_m"] if fp is None else fp}
+
+
+def _avg_unit(v: dict) -> dict:
+    typologies = v["typologies"]
+    total_share = sum(t.share_pct for t in typologies)
+    if total_share > 0:
+        avg_unit_m2 = 0.0
+        for t in typologies:
+            avg_unit_m2 += t.share_pct / total_share * t.avg_m2
+        avg_unit_m2 = max(10.0, avg_unit_m2)
+    else:
+        avg_unit_m2 = v["default_avg_unit_m2"]
+    return {"avg_unit_m2": avg_unit_m2}
+
+
+def _program(v: dict) -> dict:
+    floors = v["st_etas_nadz"]
+    btp_above = v["building_footprint"] * floors
+    nfa = btp_above * clamp01(v["net_to_gross"])
+    return {
+        "floors": floors,
+        "btp_above": btp_above,
+        "nfa": nfa,
+        "units_auto": int(max(1, math.floor(nfa / max(10.0, v["avg_unit_m2"])))) if v["building_footprint"] > 0 else 0,
+    }
+
+
+def _indices(v: dict) -> dict:
+    P, btp_above = v["P"], v["btp_above"]
+    return {
+        "FI": (btp_above / P) if P else 0.0,
+        "fi_reserve_btp": v["fi_allowed_btp"] - btp_above,
+        "fi_ok": btp_above <= v["fi_allowed_btp"] + 1e-9,
+        "fz_ok": v["building_footprint"] <= v["fz_max_footprint"] + 1e-9,
+    }
+
+
+def _units(v: dict) -> dict:
+    mode = v["units_mode"]
+    if mode == "RAČUNSKO":
+        units = v["units_auto"]
+    elif mode == "AVTO":
+        units = v["st_stanovanj"] or v["units_auto"]
+    else:
+        units = v["st_stanovanj"]
+    return {"units": units, "units_mode": mode}
+
+
+def _parking(v: dict) -> dict:
+    pm_total = int(math.ceil(v["units"] * v["pm_na_stanovanje"]))
+    pm_visitors = int(math.ceil(pm_total * v["visitor_share"]))
+    pm_residents = int(pm_total - pm_visitors)
+
+    scenario = v["scenario"]
+    if scenario == "K-1":
+        basement_levels, pm_in_basement, pm_on_surface = 1, pm_total, 0
+    elif scenario == "K-1 + teren":
+        basement_levels, pm_in_basement, pm_on_surface = 1, pm_residents, pm_visitors
+    else:
+        basement_levels, pm_in_basement, pm_on_surface = 2, pm_total, 0
+
+    return {
+        "pm_total": pm_total,
+        "pm_residents": pm_residents,
+        "pm_visitors": pm_visitors,
+        "scenario": scenario,
+        "basement_levels": basement_levels,
+        "pm_in_basement": pm_in_basement,
+        "pm_on_surface": pm_on_surface,
+    }
+
+
+def _basement(v: dict) -> dict:
+    P = v["P"]
+    basement_footprint = min(basement_level_area(v, v["pm_in_basement"], v["basement_levels"]), P)
+
+    surface_parking_area = v["pm_on_surface"] * v["area_per_pm_surface_m2"] * v["surface_mult"]
+
+    growing_area = max(0.0, P - basement_footprint - surface_parking_area)
+    fzp = (growing_area / P) if P else 0.0
+    return {
+        "basement_footprint": basement_footprint,
+        "surface_parking_area": surface_parking_area,
+        "growing_area": growing_area,
+        "fzp": fzp,
+        "fzp_ok": fzp >= v["FZP_min"] - 1e-9,
+        "basement_exceeds_building": basement_footprint > v["building_footprint"] + 1e-9,
+    }
+
+
+def _status(v: dict) -> dict:
+    if v["building_footprint"] <= 0:
+        status = "NESKLADNO (ni stavb)"
+    elif not v["fi_ok"]:
+        status = "NESKLADNO (FI)"
+    elif not v["fz_ok"]:
+        status = "NESKLADNO (FZ)"
+    elif not v["fzp_ok"]:
+        status = "NESKLADNO (FZP)"
+    elif v["scenario"] == "K-2":
+        status = "OPTIMALNO"
+    elif v["scenario"] == "K-1 + teren":
+        status = "MEJNO / KOMPROMIS"
+    else:
+        status = "TVEGANO (FZP postane omejitev)" if v["basement_exceeds_building"] else "POGOJNO (lahko OK)"
+    return {"status": status}
+
+
+def _econ(v: dict) -> dict:
+    P, btp_above, nfa = v["P"], v["btp_above"], v["nfa"]
+    btp_below = v["basement_footprint"] * v["basement_levels"]
+
+    land_cost = P * v["land_price_eur_m2"]
+    hard_cost = btp_above * v["cost_above_eur_m2"] + btp_below * v["cost_below_eur_m2"]
+    soft_cost = (land_cost + hard_cost) * (v["soft_cost_pct"] / 100.0)
+    total_invest = land_cost + hard_cost + soft_cost
+
+    revenue = nfa * v["sales_price_eur_m2"]
+    margin_abs = revenue - total_invest
+    return {"econ": {
+        "land_cost": land_cost,
+        "hard_cost": hard_cost,
+        "soft_cost": soft_cost,
+        "total_invest": total_invest,
+        "btp_below": btp_below,
+        "sales_price_m2": v["sales_price_eur_m2"],
+        "revenue": revenue,
+        "margin_abs": margin_abs,
+        "margin_pct": (margin_abs / revenue) if revenue > 0 else 0.0,
+        "cost_per_m2_nfa": total_invest / max(1.0, nfa),
+    }}
+
+
+# Topološki vrstni red
+NODES: Tuple[Node, ...] = (
+    Node("limits", ("parcela_m2", "fi", "fz", "fzp_min_pct"), (), _limits),
+    Node("footprint", ("stevilo_lamel", "dolzina_lamele_m", "sirina_lamele_m", "footprint_m2"), (), _footprint),
+    Node("avg_unit", ("typologies", "default_avg_unit_m2"), (), _avg_unit),
+    Node("program", ("st_etas_nadz", "net_to_gross"), ("footprint", "avg_unit"), _program),
+    Node("indices", (), ("limits", "footprint", "program"), _indices),
+    Node("units", ("units_mode", "st_stanovanj"), ("program",), _units),
+    Node("parking", ("pm_na_stanovanje", "visitor_share", "scenario"), ("units",), _parking),
+    Node(
+        "basement",
+        ("garage_eff_k1", "garage_eff_k2", "area_per_pm_garage_m2", "ramp_footprint_m2",
+         "area_per_pm_surface_m2", "surface_mult", "garage_layout", "stall_w_m", "stall_d_m",
+         "aisle_w_m", "ramp_len_m"),
+        ("limits", "footprint", "parking"),
+        _basement,
+    ),
+    Node("status", (), ("footprint", "indices", "parking", "basement"), _status),
+    Node(
+        "econ",
+        ("land_price_eur_m2", "cost_above_eur_m2", "cost_below_eur_m2", "soft_cost_pct", "sales_price_eur_m2"),
+        ("limits", "program", "parking", "basement"),
+        _econ,
+    ),
+)
+
+MODEL_KEYS = tuple(dict.fromkeys(k for node in NODES for k in node.keys))
+
+_CONVERT = {name: conv for name, conv in _CONVERTERS if name in MODEL_KEYS}
+_RESULT_FIELDS = tuple(f for f in ComputeResult._FIELDS if f != "econ")
+
+
+def downstream(keys: Iterable[str]) -> List[str]:
+    """Names of the nodes affected by a change of the given input keys (topological order)."""
+    keys = set(keys)
+    hit: set = set()
+    for node in NODES:
+        if keys.intersection(node.keys) or hit.intersection(node.deps):
+            hit.add(node.name)
+    return [node.name for node in NODES if node.name in hit]
+
+
+class Evaluator:
+    """Stateful `compute`: remembers the last inputs and node outputs.
+
+    `update(inputs)` returns the same dict as `core.compute(inputs)`; when nothing
+    changed it returns the previous dict object. The returned dicts are read-only.
+    `last_recomputed` lists the nodes evaluated by the last call.
+    """
+
+    def __init__(self):
+        self._raw: Dict[str, object] = {}
+        self._values: Dict[str, object] = {}
+        self._outputs: Dict[str, dict] = {}
+        self._result: dict | None = None
+        self.last_recomputed: Tuple[str, ...] = ()
+
+    def update(self, inputs: dict) -> dict:
+        changed = {}
+        for key in MODEL_KEYS:
+            raw = inputs.get(key, DEFAULT_INPUTS[key])
+            if key not in self._raw or self._raw[key] != raw:
+                changed[key] = raw
+
+        if not changed and self._result is not None:
+            self.last_recomputed = ()
+            return self._result
+
+        # pretvorba + preverjanje pred spremembo stanja (napaka ne pokvari evaluatorja)
+        coerced = {key: _CONVERT[key](raw) for key, raw in changed.items()}
+        for key in _NON_NEGATIVE:
+            if coerced.get(key) is not None and coerced[key] < 0:
+                raise ValueError(f"{key} ne sme biti negativen ({coerced[key]})")
+
+        for key, raw in changed.items():
+            self._raw[key] = copy.deepcopy(raw) if isinstance(raw, (list, dict)) else raw
+        values = self._values
+        values.update(coerced)
+
+        dirty_nodes: set = set()
+        recomputed = []
+        for node in NODES:
+            if (
+                node.name in self._outputs
+                and not any(k in changed for k in node.keys)
+                and not dirty_nodes.intersection(node.deps)
+            ):
+                continue
+            out = node.fn(values)
+            recomputed.append(node.name)
+            if out != self._outputs.get(node.name):
+                self._outputs[node.name] = out
+                values.update(out)
+                dirty_nodes.add(node.name)
+
+        self.last_recomputed = tuple(recomputed)
+        if dirty_nodes or self._result is None:
+            result = {f: values[f] for f in _RESULT_FIELDS}
+            result["econ"] = dict(values["econ"])
+            self._result = result
+        return self._result
+
+
+def sweep(inputs: dict, key: str, values: Iterable) -> List[dict]:
+    """`compute` for each value of one input, recomputing only the nodes downstream of `key`."""
+    ev = Evaluator()
+    point = dict(inputs)
+    out = []
+    for value in values:
+        point[key] = value
+        out.append(ev.update(point))
+    return out
@@ -0,0 +1,146 @@
+"""Underground garage layout: drive aisles, 90° bays and a ramp in a rectangular basement.
+
+A basement level is a rectangle ``length`` × ``depth``. A cross aisle (``aisle_w_m``)
+runs along one short side; parallel to the long side are parking modules: a
+double-loaded module is a row of bays, a drive aisle and another row of bays
+(``2 · stall_d_m + aisle_w_m`` deep), a single-loaded module one row and an aisle.
+Bays are ``stall_w_m`` wide and perpendicular to the aisle (90°). The ramp
+(``ramp_len_m`` long, within a bay row) lies in the first row on every level (stacked
+ramps for two levels) and replaces the bays along its length.
+
+``capacity(length, depth, levels)`` lays out a given basement; ``size(pm, levels)`` is
+the smallest basement (aspect ratio at most ``MAX_ASPECT``) with at least ``pm`` bays.
+Both are memoized on their dimensions (layout tables), so sweeps that revisit the same
+number of parking spaces do not lay the garage out again; ``footprints`` does the
+same for NumPy columns.
+"""
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+STALL_W_M = 2.5     # širina parkirnega mesta
+STALL_D_M = 5.0     # globina parkirnega mesta
+AISLE_W_M = 6.0     # širina vozne poti (dvosmerno, 90°)
+RAMP_LEN_M = 20.0   # dolžina rampe v tlorisu (višina etaže / naklon + prehodi)
+MAX_ASPECT = 3.0    # največje razmerje stranic kleti pri dimenzioniranju
+_SEARCH_MODULES = 16  # preizkušeni moduli po prvi dovolj globoki kleti
+
+
+@dataclass(frozen=True)
+class GarageLayout:
+    length: float          # dolžina kleti (vzdolž voznih poti) [m]
+    depth: float           # globina kleti (čez module) [m]
+    levels: int
+    double_modules: int    # moduli z dvema vrstama PM
+    single_modules: int    # 0 ali 1 modul z eno vrsto PM
+    stalls_per_row: int
+    ramp_stalls: int       # PM, ki jih na vsaki etaži zasede rampa
+    stalls_per_level: int
+    stalls: int            # vsa PM v kleti
+
+    @property
+    def rows(self) -> int:
+        return 2 * self.double_modules + self.single_modules
+
+    @property
+    def footprint_m2(self) -> float:
+        return self.length * self.depth
+
+    @property
+    def area_per_stall_m2(self) -> float:
+        return self.footprint_m2 * self.levels / self.stalls if self.stalls else 0.0
+
+
+_EMPTY = GarageLayout(0.0, 0.0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def _ramp_stalls(ramp_len: float, stall_w: float) -> int:
+    return int(math.ceil(ramp_len / stall_w - 1e-9))
+
+
+@lru_cache(maxsize=4096)
+def capacity(length: float, depth: float, levels: int, stall_w: float = STALL_W_M, stall_d: float = STALL_D_M,
+             aisle_w: float = AISLE_W_M, ramp_len: float = RAMP_LEN_M) -> GarageLayout:
+    """Lay out a `length` × `depth` basement with `levels` levels (as many bays as fit)."""
+    levels = max(int(levels), 0)
+    double_d = 2.0 * stall_d + aisle_w
+    single_d = stall_d + aisle_w
+    k = int(math.floor(depth / double_d + 1e-9))
+    s = 1 if depth - k * double_d >= single_d - 1e-9 else 0
+    n = int(math.floor((length - aisle_w) / stall_w + 1e-9))
+    ramp = _ramp_stalls(ramp_len, stall_w)
+    rows = 2 * k + s
+    if levels == 0 or rows == 0 or n < ramp:
+        return GarageLayout(float(length), float(depth), levels, k, s, max(n, 0), ramp, 0, 0)
+    per_level = rows * n - ramp
+    return GarageLayout(float(length), float(depth), levels, k, s, n, ramp, per_level, per_level * levels)
+
+
+@lru_cache(maxsize=4096)
+def size(pm: int, levels: int, stall_w: float = STALL_W_M, stall_d: float = STALL_D_M,
+         aisle_w: float = AISLE_W_M, ramp_len: float = RAMP_LEN_M) -> GarageLayout:
+    """Smallest basement with at least `pm` bays on `levels` levels (no basement for pm <= 0)."""
+    pm, levels = int(pm), int(levels)
+    if pm <= 0 or levels <= 0:
+        return _EMPTY
+    if min(stall_w, stall_d, aisle_w) <= 0 or ramp_len < 0:
+        raise ValueError(f"Mere garaže morajo biti pozitivne ({stall_w}, {stall_d}, {aisle_w}, {ramp_len})")
+    per_level = -(-pm // levels)
+    ramp = _ramp_stalls(ramp_len, stall_w)
+    double_d = 2.0 * stall_d + aisle_w
+    single_d = stall_d + aisle_w
+
+    # Površina z globino (št. modulov) v glavnem narašča, zato iščemo le od modula, pri katerem
+    # klet prvič ni več predolga (length <= MAX_ASPECT * depth), in nekaj modulov naprej.
+    k0 = (aisle_w + math.sqrt(aisle_w ** 2 + 2 * MAX_ASPECT * double_d * stall_w * (per_level + ramp))) / (
+        2 * MAX_ASPECT * double_d)
+    k = max(0, int(k0) - 1)
+    k_first = None
+    best: Optional[tuple] = None
+    fallback: Optional[tuple] = None
+    while k_first is None or k <= k_first + _SEARCH_MODULES:
+        grew = False
+        for s in (0, 1):
+            rows = 2 * k + s
+            if rows == 0:
+                continue
+            n = max(ramp, -(-(per_level + ramp) // rows))
+            length = aisle_w + n * stall_w
+            depth = k * double_d + s * single_d
+            key = (length * depth, max(length / depth, depth / length), k, s, n)
+            if fallback is None or key < fallback:
+                fallback = key
+            if depth <= MAX_ASPECT * length and length <= MAX_ASPECT * depth:
+                if best is None or key < best:
+                    best = key
+                if k_first is None:
+                    k_first = k
+            grew = grew or depth <= MAX_ASPECT * length
+        if not grew:
+            break
+        k += 1
+
+    _, _, k, s, n = best or fallback
+    length = aisle_w + n * stall_w
+    depth = k * double_d + s * single_d
+    return capacity(length, depth, levels, stall_w, stall_d, aisle_w, ramp_len)
+
+
+def footprint(pm: int, levels: int, stall_w: float = STALL_W_M, stall_d: float = STALL_D_M,
+              aisle_w: float = AISLE_W_M, ramp_len: float = RAMP_LEN_M) -> float:
+    """Basement footprint [m²] for `pm` bays on `levels` levels (`size(...).footprint_m2`)."""
+    return size(int(pm), int(levels), float(stall_w), float(stall_d), float(aisle_w), float(ramp_len)).footprint_m2
+
+
+def footprints(pm, levels, stall_w, stall_d, aisle_w, ramp_len) -> np.ndarray:
+    """`footprint` for NumPy columns (broadcast); each distinct combination is sized once."""
+    cols = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (pm, levels, stall_w, stall_d, aisle_w, ramp_len)))
+    table = np.stack([c.ravel() for c in cols], axis=1)
+    if not table.size:
+        return np.zeros(cols[0].shape)
+    unique, inverse = np.unique(table, axis=0, return_inverse=True)
+    values = np.array([footprint(int(row[0]), int(row[1]), *row[2:]) for row in unique])
+    return values[inverse.ravel()].reshape(cols[0].shape)
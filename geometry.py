@@ -0,0 +1,324 @@
+"""Footprint engine: packs the buildings into the parcel polygon.
+
+Three layout modes (``layout_mode``):
+
+- ``lamela``: lamellas ``dolzina_lamele_m`` × ``sirina_lamele_m`` in parallel rows (both
+  orientations are tried, the one that fits more buildings wins);
+- ``kare``: courtyard blocks, a square ring with side ``dolzina_lamele_m`` and wing depth
+  ``sirina_lamele_m`` (the courtyard must be at least ``spacing_m`` wide);
+- ``tocka``: square point blocks with side ``point_block_m``.
+
+``stevilo_lamel`` is the number of buildings. The parcel is ``parcel_polygon`` (list of
+[x, y] in metres; ``parcela_m2`` is then its area) or, when empty, a rectangle of
+``parcela_m2`` with side ratio ``parcel_aspect``. Buildings keep ``setback_m`` from the
+parcel boundary and ``spacing_m`` from each other.
+
+The parcel is rasterized once (cells of at least 0.5 m) into the cells that are inside
+the polygon and at least the setback from its edges; a summed-area table of that mask
+tests whether a building fits at an anchor in O(1), for all anchors at once. Placed
+buildings go into a uniform grid index (``GridIndex``), so a spacing check only looks
+at the buildings in the neighbouring cells. Placement is greedy bottom-left, row by
+row, jumping past every building it collides with, so thousands of candidate
+placements take milliseconds.
+
+``apply_layout(inputs)`` sets ``parcela_m2`` from the polygon and ``footprint_m2`` (used
+by ``core.compute`` instead of lamellas × length × width) from the layout; layouts are
+memoized by their geometry inputs.
+"""
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+LAYOUT_MODES = {
+    "lamela": "Lamelne stavbe",
+    "kare": "Kare / obroč",
+    "tocka": "Točkovna zazidava",
+}
+
+# Vhodi, od katerih je odvisna razmestitev
+GEOMETRY_KEYS = (
+    "layout_mode", "parcela_m2", "parcel_aspect", "parcel_polygon", "setback_m", "spacing_m",
+    "point_block_m", "stevilo_lamel", "dolzina_lamele_m", "sirina_lamele_m",
+)
+
+MIN_CELL_M = 0.5       # najmanjša velikost celice rastra parcele [m]
+MAX_CELLS = 250_000    # največ celic rastra (pri večjih parcelah so celice večje)
+MAX_CAPACITY = 10_000  # zgornja meja štetja zmogljivosti parcele
+LAYOUT_CACHE = 4096    # zapomnjene razmestitve (tudi za načrte z več sto parcelami)
+
+
+@dataclass(frozen=True)
+class Building:
+    x: float            # spodnji levi vogal zunanjega pravokotnika [m]
+    y: float
+    w: float            # zunanja širina (x) in višina (y) [m]
+    h: float
+    footprint_m2: float
+    courtyard_m: float = 0.0  # stranica notranjega dvorišča (kare), sicer 0
+
+
+@dataclass(frozen=True)
+class Layout:
+    mode: str
+    polygon: Tuple[Tuple[float, float], ...]
+    parcel_m2: float
+    buildings: Tuple[Building, ...]
+    requested: int
+    capacity: Optional[int]  # največje število stavb, ki jih pravila dopuščajo (None: ni prešteto)
+    footprint_m2: float  # tloris postavljenih stavb
+    green_m2: float      # parcela brez tlorisa stavb (pred kletjo in parkiranjem na terenu)
+    candidates: int      # preizkušene postavitve
+    message: str = ""
+
+    @property
+    def placed(self) -> int:
+        return len(self.buildings)
+
+    def btp(self, floors: int) -> float:
+        return self.footprint_m2 * floors
+
+
+# =================================================
+# PARCELA
+# =================================================
+def parcel_polygon(parcela_m2: float, aspect: float = 1.5, polygon: Sequence = ()) -> Tuple[Tuple[float, float], ...]:
+    """The parcel outline: `polygon` if it has 3+ points, else a `parcela_m2` rectangle (width / depth = aspect)."""
+    if polygon and len(polygon) >= 3:
+        return tuple((float(x), float(y)) for x, y in polygon)
+    aspect = max(float(aspect), 0.05)
+    w = math.sqrt(max(float(parcela_m2), 0.0) * aspect)
+    h = w / aspect if w else 0.0
+    return ((0.0, 0.0), (w, 0.0), (w, h), (0.0, h))
+
+
+def polygon_area(polygon: Sequence) -> float:
+    """Area of a simple polygon (shoelace formula)."""
+    pts = np.asarray(polygon, dtype=np.float64)
+    if len(pts) < 3:
+        return 0.0
+    x, y = pts[:, 0], pts[:, 1]
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2.0)
+
+
+def _allowed_mask(polygon, setback: float) -> Tuple[np.ndarray, float, float, float]:
+    """Cells (rows = y) that lie entirely inside the polygon and at least `setback` from its edges.
+
+    A cell qualifies when its centre is inside and at least setback + half the cell diagonal
+    from every edge, so every point of the cell keeps the setback (conservative by up to
+    half a diagonal). Returns (mask, x0, y0, cell).
+    """
+    pts = np.asarray(polygon, dtype=np.float64)
+    x0, y0 = pts.min(axis=0)
+    x1, y1 = pts.max(axis=0)
+    cell = max(MIN_CELL_M, math.sqrt((x1 - x0) * (y1 - y0) / MAX_CELLS))
+    nx = max(1, int(math.ceil((x1 - x0) / cell)))
+    ny = max(1, int(math.ceil((y1 - y0) / cell)))
+    X = x0 + (np.arange(nx) + 0.5) * cell
+    Y = (y0 + (np.arange(ny) + 0.5) * cell)[:, None]
+
+    limit = max(float(setback), 0.0) + cell * math.sqrt(2.0) / 2.0
+
+    if len(pts) == 4 and len(set(pts[:, 0])) == 2 and len(set(pts[:, 1])) == 2:
+        # osno poravnan pravokotnik (privzeta parcela): razdalja do roba je ločljiva po oseh
+        dx = np.minimum(X - x0, x1 - X)
+        dy = np.minimum(Y - y0, y1 - Y)
+        return (dy >= limit) & (dx >= limit), float(x0), float(y0), cell
+
+    inside = np.zeros((ny, nx), dtype=bool)
+    dist2 = np.full((ny, nx), np.inf)
+    for (ax, ay), (bx, by) in zip(pts, np.roll(pts, -1, axis=0)):
+        # sodo-liho pravilo (žarek v smeri +x)
+        if ay != by:
+            crosses = (ay > Y) != (by > Y)
+            x_cross = ax + (Y - ay) * (bx - ax) / (by - ay)
+            inside ^= crosses & (X < x_cross)
+        # razdalja do daljice
+        dx, dy = bx - ax, by - ay
+        length2 = dx * dx + dy * dy
+        t = np.clip(((X - ax) * dx + (Y - ay) * dy) / length2, 0.0, 1.0) if length2 else 0.0
+        dist2 = np.minimum(dist2, (X - ax - t * dx) ** 2 + (Y - ay - t * dy) ** 2)
+
+    return inside & (dist2 >= limit * limit), float(x0), float(y0), cell
+
+
+def _fits(mask: np.ndarray, h: int, w: int) -> np.ndarray:
+    """fits[i, j]: the h × w cell window with lower-left cell (i, j) is entirely allowed."""
+    ny, nx = mask.shape
+    if h > ny or w > nx:
+        return np.zeros((0, 0), dtype=bool)
+    S = np.zeros((ny + 1, nx + 1), dtype=np.int32)
+    S[1:, 1:] = mask.cumsum(axis=0, dtype=np.int32).cumsum(axis=1, dtype=np.int32)
+    window = S[h:, w:] - S[:-h, w:] - S[h:, :-w] + S[:-h, :-w]
+    return window == h * w
+
+
+# =================================================
+# PROSTORSKI INDEKS
+# =================================================
+class GridIndex:
+    """Uniform grid of axis-aligned rectangles (x0, y0, x1, y1) for neighbourhood queries."""
+
+    def __init__(self, cell: float):
+        self.cell = max(float(cell), 1e-6)
+        self.rects: List[Tuple[float, float, float, float]] = []
+        self._cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def _span(self, x0: float, y0: float, x1: float, y1: float):
+        c = self.cell
+        for gx in range(int(math.floor(x0 / c)), int(math.floor(x1 / c)) + 1):
+            for gy in range(int(math.floor(y0 / c)), int(math.floor(y1 / c)) + 1):
+                yield gx, gy
+
+    def insert(self, rect: Tuple[float, float, float, float]) -> None:
+        self.rects.append(rect)
+        k = len(self.rects) - 1
+        for key in self._span(*rect):
+            self._cells.setdefault(key, []).append(k)
+
+    def first_conflict(self, rect: Tuple[float, float, float, float], gap: float) -> Optional[Tuple[float, float, float, float]]:
+        """A stored rectangle closer than `gap` to `rect` (overlap of the gap-expanded box), or None."""
+        x0, y0, x1, y1 = rect
+        seen = set()
+        for key in self._span(x0 - gap, y0 - gap, x1 + gap, y1 + gap):
+            for k in self._cells.get(key, ()):
+                if k in seen:
+                    continue
+                seen.add(k)
+                a0, b0, a1, b1 = self.rects[k]
+                if a0 < x1 + gap - 1e-9 and x0 < a1 + gap - 1e-9 and b0 < y1 + gap - 1e-9 and y0 < b1 + gap - 1e-9:
+                    return self.rects[k]
+        return None
+
+
+# =================================================
+# RAZMESTITEV
+# =================================================
+def _pack(mask, x0: float, y0: float, cell: float, w: float, h: float, spacing: float, limit: int):
+    """Greedy bottom-left placement of up to `limit` w × h rectangles; returns (positions, candidates)."""
+    wc = int(math.ceil(w / cell - 1e-9))
+    hc = int(math.ceil(h / cell - 1e-9))
+    fits = _fits(mask, hc, wc)
+    index = GridIndex(max(w, h) + spacing)
+    placed: List[Tuple[float, float]] = []
+    candidates = 0
+
+    for iy in range(fits.shape[0]):
+        row = np.flatnonzero(fits[iy])
+        k = 0
+        while k < row.size and len(placed) < limit:
+            ix = int(row[k])
+            x, y = x0 + ix * cell, y0 + iy * cell
+            rect = (x, y, x + w, y + h)
+            candidates += 1
+            hit = index.first_conflict(rect, spacing)
+            if hit is None:
+                index.insert(rect)
+                placed.append((x, y))
+                nxt = rect[2] + spacing
+            else:
+                nxt = hit[2] + spacing
+            # naslednje sidro desno od ovire (ali postavljene stavbe) z razmikom
+            k = int(np.searchsorted(row, int(math.ceil((nxt - x0) / cell - 1e-9)), side="left"))
+        if len(placed) >= limit:
+            break
+    return placed, candidates
+
+
+@lru_cache(maxsize=LAYOUT_CACHE)
+def _layout(mode: str, polygon: tuple, setback: float, spacing: float, point_block: float,
+            n: int, L: float, W: float, count_capacity: bool = False) -> Layout:
+    parcel_m2 = polygon_area(polygon)
+    n = max(int(n), 0)
+    message = ""
+
+    if mode == "kare":
+        inner = L - 2.0 * W
+        shapes = [(L, L, L * L - max(inner, 0.0) ** 2, max(inner, 0.0))]
+        if inner < spacing:
+            shapes = []
+            message = f"Dvorišče kareja ({inner:.1f} m) je ožje od razmika med stavbami ({spacing:.1f} m)."
+    elif mode == "tocka":
+        shapes = [(point_block, point_block, point_block * point_block, 0.0)]
+    else:
+        shapes = [(L, W, L * W, 0.0), (W, L, L * W, 0.0)]
+
+    # zahtevanih n je začetek zaporedja postavitev; do MAX_CAPACITY pakiramo le za prikaz zmogljivosti
+    limit = max(MAX_CAPACITY, n) if count_capacity else n
+    best = ([], None)
+    candidates = 0
+    if shapes and parcel_m2 > 0 and L > 0 and W > 0 and limit > 0:
+        mask, x0, y0, cell = _allowed_mask(polygon, setback)
+        for shape in shapes:
+            w, h = shape[0], shape[1]
+            placed, tested = _pack(mask, x0, y0, cell, w, h, spacing, limit=limit)
+            candidates += tested
+            if len(placed) > len(best[0]):
+                best = (placed, shape)
+            if len(best[0]) >= limit:
+                break
+
+    placed, shape = best
+    # brez štetja je zmogljivost znana le, če zahtevanih stavb ni bilo mogoče postaviti
+    capacity = len(placed) if count_capacity or len(placed) < n else None
+    buildings = tuple(
+        Building(x, y, shape[0], shape[1], shape[2], shape[3]) for x, y in placed[:n]
+    ) if shape else ()
+    if not message and len(buildings) < n:
+        message = f"Na parcelo gre le {len(buildings)} od {n} stavb (odmiki in razmiki)."
+    footprint = float(sum(b.footprint_m2 for b in buildings))
+    return Layout(
+        mode=mode,
+        polygon=polygon,
+        parcel_m2=parcel_m2,
+        buildings=buildings,
+        requested=n,
+        capacity=capacity,
+        footprint_m2=footprint,
+        green_m2=max(0.0, parcel_m2 - footprint),
+        candidates=candidates,
+        message=message,
+    )
+
+
+def layout(inputs: dict, count_capacity: bool = False) -> Layout:
+    """Pack the buildings of `inputs` into its parcel (memoized by the geometry inputs).
+
+    Packing stops once the requested buildings are placed; `count_capacity` keeps
+    packing to find how many would fit (`Layout.capacity`, shown in the app).
+    """
+    polygon = parcel_polygon(inputs["parcela_m2"], inputs.get("parcel_aspect", 1.5), inputs.get("parcel_polygon") or ())
+    return _layout(
+        str(inputs.get("layout_mode") or "lamela"),
+        polygon,
+        float(inputs.get("setback_m", 4.0)),
+        float(inputs.get("spacing_m", 12.0)),
+        float(inputs.get("point_block_m", 20.0)),
+        int(inputs["stevilo_lamel"]),
+        float(inputs["dolzina_lamele_m"]),
+        float(inputs["sirina_lamele_m"]),
+        bool(count_capacity),
+    )
+
+
+def uses_geometry(inputs: dict) -> bool:
+    """The footprint comes from the layout: always for kare / point blocks, optionally for lamellas."""
+    return (inputs.get("layout_mode") or "lamela") != "lamela" or bool(inputs.get("geometry_footprint"))
+
+
+def apply_layout(inputs: dict) -> dict:
+    """Set ``inputs["footprint_m2"]`` from the layout (None = lamellas × length × width); returns `inputs`.
+
+    With a ``parcel_polygon`` the parcel area ``parcela_m2`` is the polygon's area, so the
+    FZ / FZP checks and the layout use the same parcel.
+
+    The layout result wins even when no building fits the parcel: the footprint is then 0,
+    so `compute` reports no floor area and "NESKLADNO (ni stavb)"; `layout(inputs).message`
+    explains why.
+    """
+    if inputs.get("parcel_polygon"):
+        inputs["parcela_m2"] = polygon_area(inputs["parcel_polygon"])
+    inputs["footprint_m2"] = layout(inputs).footprint_m2 if uses_geometry(inputs) else None
+    return inputs
@@ -0,0 +1,203 @@
+"""Background jobs for long-running analyses (Monte Carlo simulations, large sweeps).
+
+A job is a list of independent tasks (a picklable top-level function and its
+arguments) that run in a process pool shared by all users of the server, plus a
+``combine`` function that turns the results of the finished tasks into the job
+result. ``combine`` runs in the calling process, outside the manager's lock (it may
+take a while), also on the tasks finished so far (``JobManager.partial``), so a UI
+can show partial results while the job runs.
+
+Jobs are registered under a key (e.g. ``core.inputs_hash`` of the inputs and the
+parameters): submitting a key that is running or done returns the existing job, so
+identical analyses are computed once and completed results are reused until the
+registry evicts them (least recently used first, ``keep`` finished jobs). Cancelling
+drops the tasks that have not started yet; running tasks finish but are ignored.
+
+The UI keeps one ``JobManager`` per server process (``ui_jobs.job_manager``) and
+polls it by job key (``ui_jobs.render_job``); nothing here depends on Streamlit.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+RUNNING = "teče"
+DONE = "končano"
+CANCELLED = "preklicano"
+FAILED = "napaka"
+
+Task = Tuple[Callable[..., Any], tuple]
+
+
+@dataclass
+class Job:
+    key: str
+    label: str
+    total: int                   # št. nalog
+    done: int = 0                # končane naloge
+    status: str = RUNNING
+    result: Any = None           # rezultat (status DONE)
+    error: str = ""
+    started: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    _combine: Callable[[List[Any]], Any] = field(default=None, repr=False)
+    _results: Dict[int, Any] = field(default_factory=dict, repr=False)
+    _futures: List[Future] = field(default_factory=list, repr=False)
+    _partial: Tuple[int, Any] = field(default=(0, None), repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status == RUNNING
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - self.started
+
+
+class JobManager:
+    """Registry of jobs running in a shared process pool (thread-safe)."""
+
+    def __init__(self, workers: Optional[int] = None, keep: int = 32):
+        self.workers = int(workers or max(1, (os.cpu_count() or 2) - 1))
+        self.keep = int(keep)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    # ---------------------------------------------------------------
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def submit(self, key: str, label: str, tasks: Sequence[Task], combine: Callable[[List[Any]], Any]) -> Job:
+        """Start a job (or return the running / finished job with the same key).
+
+        `combine(results)` gets the results of the finished tasks in task order.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status in (RUNNING, DONE):
+                self._jobs.move_to_end(key)
+                return job
+
+            job = Job(key=key, label=label, total=len(tasks), _combine=combine)
+            self._jobs[key] = job
+            self._evict()
+            futures = job._futures = self._start(tasks) if tasks else []
+        if not tasks:
+            self._finish(job, [])
+        # povratni klici šele po sprostitvi zaklepa: že končana naloga se obdela takoj,
+        # combine pa ne sme teči pod zaklepom
+        for index, future in enumerate(futures):
+            future.add_done_callback(lambda f, job=job, index=index: self._task_done(job, index, f))
+        return job
+
+    def _start(self, tasks: Sequence[Task]) -> List[Future]:
+        """Submit the tasks to the pool (called with the lock held); a broken pool is replaced once."""
+        for attempt in (0, 1):
+            try:
+                pool = self._executor()
+                return [pool.submit(fn, *args) for fn, args in tasks]
+            except BrokenProcessPool:
+                # delavec je padel (npr. zmanjkalo pomnilnika): nov bazen
+                self._pool = None
+                if attempt:
+                    raise
+        return []
+
+    def _task_done(self, job: Job, index: int, future: Future) -> None:
+        with self._lock:
+            if job.status != RUNNING:
+                return
+            try:
+                job._results[index] = future.result()
+            except CancelledError:
+                return
+            except BaseException as e:
+                job.status = FAILED
+                job.error = "".join(traceback.format_exception_only(type(e), e)).strip()
+                job.finished = time.time()
+                for f in job._futures:
+                    f.cancel()
+                return
+            job.done += 1
+            if job.done < job.total:
+                return
+            results = [job._results[i] for i in range(job.total)]
+        self._finish(job, results)
+
+    def _finish(self, job: Job, results: List[Any]) -> None:
+        """Combine all task results (without the lock) and publish them, unless the job was cancelled meanwhile."""
+        try:
+            result, status, error = job._combine(results), DONE, ""
+        except Exception as e:
+            result, status, error = None, FAILED, f"{type(e).__name__}: {e}"
+        with self._lock:
+            if job.status != RUNNING:
+                return
+            job.result, job.status, job.error = result, status, error
+            job.finished = time.time()
+            job._results = {}
+            job._futures = []
+
+    def _evict(self) -> None:
+        finished = [k for k, j in self._jobs.items() if not j.active]
+        for key in finished[: max(0, len(finished) - self.keep)]:
+            del self._jobs[key]
+
+    # ---------------------------------------------------------------
+    def get(self, key: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def partial(self, job: Job) -> Any:
+        """`combine` of the tasks finished so far (None before the first one; memoized per count)."""
+        with self._lock:
+            if job.status == DONE:
+                return job.result
+            done, cached = job._partial
+            if done == job.done:
+                return cached
+            results = [job._results[i] for i in sorted(job._results)]
+            count = job.done
+        value = job._combine(results) if results else None
+        with self._lock:
+            job._partial = (count, value)
+        return value
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or not job.active:
+                return
+            job.status = CANCELLED
+            job.finished = time.time()
+            for f in job._futures:
+                f.cancel()
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for key in list(self._jobs):
+                self.cancel(key)
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
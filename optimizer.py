@@ -0,0 +1,224 @@
+import math
+
+import numpy as np
+
+from core import SCENARIOS, compute_batch, inputs_hash
+
+# Spremenljivke zasnove, ki jih preiskuje optimizator
+DESIGN_KEYS = (
+    "stevilo_lamel",
+    "dolzina_lamele_m",
+    "sirina_lamele_m",
+    "st_etas_nadz",
+    "scenario",
+    "pm_na_stanovanje",
+)
+
+
+def default_grid(inputs: dict, pm_min: float | None = None) -> dict:
+    """Discrete design space around the current project.
+
+    The parking norm is a regulatory minimum, so by default only the current norm is searched;
+    pass `pm_min` to also try lower norms (in 0.1 steps) down to that value.
+    """
+    n_lamel = int(inputs["stevilo_lamel"])
+    L = int(round(float(inputs["dolzina_lamele_m"])))
+    W = int(round(float(inputs["sirina_lamele_m"])))
+    floors = int(inputs["st_etas_nadz"])
+    pm = float(inputs["pm_na_stanovanje"])
+
+    if pm_min is None or pm_min >= pm:
+        pm_values = [pm]
+    else:
+        pm_values = [round(x, 2) for x in np.arange(pm, pm_min - 1e-9, -0.1)]
+
+    return {
+        "stevilo_lamel": list(range(1, max(n_lamel + 2, 6) + 1)),
+        "dolzina_lamele_m": list(range(max(10, L - 20), L + 21, 5)),
+        "sirina_lamele_m": list(range(max(8, W - 4), W + 5)),
+        "st_etas_nadz": list(range(1, max(floors + 3, 8) + 1)),
+        "scenario": list(SCENARIOS),
+        "pm_na_stanovanje": pm_values,
+    }
+
+
+def _expand(grid: dict, P: float, FI: float, FZ: float) -> dict:
+    """Cartesian product of the grid, pruned with monotone constraints.
+
+    - odtis (n * L * W) mora ustrezati FZ – neodvisno od etaž, scenarija in PM,
+    - BTP narašča z etažami, zato je za vsak odtis dovolj preveriti etaže do floor(FI * P / odtis).
+    """
+    n, L, W = np.meshgrid(
+        np.asarray(grid["stevilo_lamel"], dtype=np.float64),
+        np.asarray(grid["dolzina_lamele_m"], dtype=np.float64),
+        np.asarray(grid["sirina_lamele_m"], dtype=np.float64),
+        indexing="ij",
+    )
+    n, L, W = n.ravel(), L.ravel(), W.ravel()
+    fp = n * L * W
+
+    keep = fp <= FZ * P + 1e-9
+    n, L, W, fp = n[keep], L[keep], W[keep], fp[keep]
+
+    floors = np.asarray(grid["st_etas_nadz"], dtype=np.float64)
+    max_floors = np.floor(FI * P / np.maximum(fp, 1e-9) + 1e-9)
+    ok = floors[None, :] <= max_floors[:, None]
+    g_idx, f_idx = np.nonzero(ok)
+
+    n, L, W, floors = n[g_idx], L[g_idx], W[g_idx], floors[f_idx]
+
+    # scenarij × PM norma: vsi ostanejo (vplivajo le na FZP in ekonomiko)
+    scen = np.arange(len(SCENARIOS))
+    scen = scen[np.isin(np.asarray(SCENARIOS), list(grid["scenario"]))]
+    pm = np.asarray(grid["pm_na_stanovanje"], dtype=np.float64)
+    k = scen.size * pm.size
+
+    s_rep, pm_rep = np.meshgrid(scen, pm, indexing="ij")
+    return {
+        "stevilo_lamel": np.repeat(n, k),
+        "dolzina_lamele_m": np.repeat(L, k),
+        "sirina_lamele_m": np.repeat(W, k),
+        "st_etas_nadz": np.repeat(floors, k),
+        "scenario": np.tile(s_rep.ravel(), n.size),
+        "pm_na_stanovanje": np.tile(pm_rep.ravel(), n.size),
+    }
+
+
+def evaluate_grid(inputs: dict, grid: dict | None = None) -> tuple:
+    """Evaluate the pruned grid in one batch; returns (cols, r, n_total).
+
+    All other inputs are taken from `inputs`; the number of units is always computed
+    (RAČUNSKO), since it changes with the massing, and the footprint is that of the lamellas
+    (no geometry footprint). `r` is None if nothing survives pruning.
+    """
+    grid = grid or default_grid(inputs)
+    P = float(inputs["parcela_m2"])
+    FI = float(inputs["fi"])
+    FZ = float(inputs["fz"])
+
+    n_total = math.prod(len(grid[k]) for k in DESIGN_KEYS)
+
+    cols = _expand(grid, P, FI, FZ)
+    cols["units_mode"] = "RAČUNSKO"
+    cols["footprint_m2"] = None
+    r = compute_batch(cols, inputs) if cols["stevilo_lamel"].size else None
+    return cols, r, n_total
+
+
+def search(inputs: dict, grid: dict | None = None, top_n: int = 10, cache=None) -> dict:
+    """Find the compliant designs (FI, FZ and FZP OK) with the highest margin.
+
+    Returns a dict with the top-N candidates (best first) and counts of the searched,
+    evaluated and compliant configurations. With a `result_cache.ResultCache` the result
+    is looked up / stored under the inputs, the grid and `top_n`.
+    """
+    if cache is not None:
+        key = inputs_hash({"inputs": inputs, "grid": grid, "top_n": top_n})
+        return cache.cached("search", key, lambda: search(inputs, grid, top_n))
+
+    cols, r, n_total = evaluate_grid(inputs, grid)
+    n_evaluated = int(cols["stevilo_lamel"].size)
+
+    candidates = []
+    n_feasible = 0
+    if r is not None:
+        feasible = np.nonzero(r["fi_ok"] & r["fz_ok"] & r["fzp_ok"])[0]
+        n_feasible = int(feasible.size)
+
+        margin = r["econ"]["margin_abs"][feasible]
+        best = feasible[np.argsort(-margin, kind="stable")[:top_n]]
+
+        for i in best:
+            candidates.append({
+                "stevilo_lamel": int(cols["stevilo_lamel"][i]),
+                "dolzina_lamele_m": int(cols["dolzina_lamele_m"][i]),
+                "sirina_lamele_m": int(cols["sirina_lamele_m"][i]),
+                "st_etas_nadz": int(cols["st_etas_nadz"][i]),
+                "scenario": str(r["scenario"][i]),
+                "pm_na_stanovanje": float(cols["pm_na_stanovanje"][i]),
+                "units": int(r["units"][i]),
+                "FI": float(r["FI"][i]),
+                "fzp": float(r["fzp"][i]),
+                "margin_abs": float(r["econ"]["margin_abs"][i]),
+                "margin_pct": float(r["econ"]["margin_pct"][i]),
+                "status": str(r["status"][i]),
+            })
+
+    return {
+        "candidates": candidates,
+        "n_total": n_total,
+        "n_evaluated": n_evaluated,
+        "n_feasible": n_feasible,
+    }
+
+
+def apply_candidate(inputs: dict, candidate: dict) -> dict:
+    """Copy the design variables of a search candidate into `inputs`."""
+    for key in DESIGN_KEYS:
+        inputs[key] = candidate[key]
+    inputs["units_mode"] = "RAČUNSKO"
+    return inputs
+
+
+# =================================================
+# PARETO FRONTA (margin × FZP × št. stanovanj)
+# =================================================
+PARETO_OBJECTIVES = ("margin_abs", "fzp", "units")
+
+
+def pareto_front(objectives: np.ndarray) -> np.ndarray:
+    """Indices of the non-dominated rows of `objectives` (n × k, all maximized).
+
+    Points are visited best-first (by normalized sum); each visited front point removes
+    everything it dominates in one vectorized step, so the cost is O(n · |front|) NumPy work
+    instead of O(n²) Python comparisons. Of identical points only one is kept.
+    """
+    F = np.asarray(objectives, dtype=np.float64)
+    if F.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    span = F.max(axis=0) - F.min(axis=0)
+    score = ((F - F.min(axis=0)) / np.where(span > 0, span, 1.0)).sum(axis=1)
+    order = np.argsort(-score, kind="stable")
+
+    F = F[order]
+    idx = order
+    i = 0
+    while i < F.shape[0]:
+        # ostanejo točke, ki so vsaj v enem cilju boljše od trenutne (in trenutna sama)
+        keep = np.any(F > F[i], axis=1)
+        keep[i] = True
+        F = F[keep]
+        idx = idx[keep]
+        i = int(keep[:i].sum()) + 1
+    return np.sort(idx)
+
+
+def pareto_search(inputs: dict, grid: dict | None = None, cache=None) -> dict:
+    """Evaluate the design grid and find the margin / FZP / units trade-off front.
+
+    Candidates are limited to FI- and FZ-compliant designs; FZP is an objective, so
+    `fzp_ok` is reported per point instead of being used as a filter. Returns column
+    arrays for all candidates and the indices of the Pareto-optimal ones. `cache` as
+    in `search`.
+    """
+    if cache is not None:
+        key = inputs_hash({"inputs": inputs, "grid": grid})
+        return cache.cached("pareto", key, lambda: pareto_search(inputs, grid))
+
+    cols, r, n_total = evaluate_grid(inputs, grid)
+    if r is None:
+        empty = np.zeros(0)
+        return {"points": {k: empty for k in DESIGN_KEYS + PARETO_OBJECTIVES + ("fzp_ok",)},
+                "front": np.zeros(0, dtype=np.int64), "n_total": n_total}
+
+    ok = np.nonzero(r["fi_ok"] & r["fz_ok"])[0]
+    points = {k: np.asarray(cols[k])[ok] for k in DESIGN_KEYS if k != "scenario"}
+    points["scenario"] = r["scenario"][ok]
+    points["margin_abs"] = r["econ"]["margin_abs"][ok]
+    points["fzp"] = r["fzp"][ok]
+    points["units"] = r["units"][ok]
+    points["fzp_ok"] = r["fzp_ok"][ok]
+
+    F = np.column_stack([points[k] for k in PARETO_OBJECTIVES])
+    return {"points": points, "front": pareto_front(F), "n_total": n_total}
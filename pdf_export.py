@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from io import BytesIO
-from typing import Dict, Any, List
-import os
-import re
-from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Tuple, Union
+
+from pdf_resources import get_styles, image_size, prepare_image
+from unitmix import allocate
 
 
 def _safe(v: Any) -> str:
@@ -15,10 +16,34 @@ def _yesno(ok: bool) -> str:
     return "SKLADNO" if ok else "NESKLADNO"
 
 
-def _build_project_description_html(inputs: Dict[str, Any], r: Dict[str, Any]) -> List[str]:
-    """Return the project description as a list of HTML-ish paragraphs.
+# ============================================================
+# MODEL POROČILA: poglavja iz blokov (odstavki, alineje)
+# ============================================================
+@dataclass
+class Section:
+    """One chapter of the report.
 
-    ReportLab's Paragraph supports a small subset of HTML tags (e.g. <b>, <br/>).
+    `heading` is empty for the intro line (project name/code). `blocks` are
+    ("p", html) paragraphs or ("bullets", [html, ...]) lists; the html uses the
+    subset ReportLab's Paragraph understands (<b>, <br/>).
+    """
+
+    heading: str
+    blocks: List[Tuple[str, Any]] = field(default_factory=list)
+
+    def p(self, html: str) -> "Section":
+        self.blocks.append(("p", html))
+        return self
+
+    def bullets(self, items: List[str]) -> "Section":
+        self.blocks.append(("bullets", list(items)))
+        return self
+
+
+def build_project_sections(inputs: Dict[str, Any], r: Dict[str, Any]) -> List[Section]:
+    """The project description (Opis projekta) as a list of sections.
+
+    All views (PDF, markdown, HTML paragraphs) are rendered from this model.
     """
     proj = inputs.get("project_name", "")
     code = inputs.get("project_code", "")
@@ -83,34 +108,45 @@ def _build_project_description_html(inputs: Dict[str, Any], r: Dict[str, Any]) -
             return "z eno kletno etažo (K-1) in delnim parkiranjem na terenu"
         return "(kletni scenarij po izbiri)"
 
-    def typology_block_html() -> str:
-        if not typ:
-            return "—"
+    def typology_paragraphs() -> List[str]:
+        try:
+            counts = allocate(units, float(r.get("nfa", 0) or 0), typ).counts
+        except Exception:
+            counts = (0,) * len(typ)
         lines = []
-        for t in typ:
+        for t, n in zip(typ, counts):
             try:
                 name = _safe(t.get("name", ""))
                 share = float(t.get("share_pct", 0) or 0)
                 avg = float(t.get("avg_m2", 0) or 0)
-                approx_n = int(round(units * share / 100.0)) if units else 0
                 lines.append(
                     f"{name}:<br/>"
-                    f"{share:.0f} % (≈ {approx_n} enot), povp. velikost ≈ {avg:.0f} m²"
+                    f"{share:.0f} % ({n} enot), povp. velikost ≈ {avg:.0f} m²"
                 )
             except Exception:
                 continue
-        return "<br/><br/>".join(lines) if lines else "—"
-
-    # --- Section 1 --------------------------------------------------------
-    p1 = (
-        "<b>1. Osnovna zasnova in tipologija objektov</b><br/><br/>"
-        f"Projekt obravnava izgradnjo stanovanjske soseske s skupno <b>{units}</b> stanovanji, "
-        f"umeščene v večstanovanjske objekte etažnosti <b>{etaznost()}</b> {klet_levels_text()}. "
-        f"Objekti so zasnovani kot kompaktna urbana struktura (lamelna zasnova: <b>{n_lamel}</b> lamel), "
-        "z racionalnim tlorisnim razporedom, ki omogoča optimalno izrabo prostora ob hkratnem zagotavljanju "
-        "visokega deleža zelenih površin.<br/><br/>"
-        "Nadzemni del objektov je namenjen izključno bivanju, podzemni del pa parkiranju, tehničnim prostorom "
-        "in prometnim povezavam."
+        return lines or ["—"]
+
+    sections: List[Section] = []
+
+    if proj or code:
+        prefix = f"<b>{_safe(proj)}</b> {('(' + _safe(code) + ')') if code else ''}".strip()
+        sections.append(Section("").p(prefix.replace("  ", " ")))
+
+    # --- 1 ----------------------------------------------------------------
+    sections.append(
+        Section("1. Osnovna zasnova in tipologija objektov")
+        .p(
+            f"Projekt obravnava izgradnjo stanovanjske soseske s skupno <b>{units}</b> stanovanji, "
+            f"umeščene v večstanovanjske objekte etažnosti <b>{etaznost()}</b> {klet_levels_text()}. "
+            f"Objekti so zasnovani kot kompaktna urbana struktura (lamelna zasnova: <b>{n_lamel}</b> lamel), "
+            "z racionalnim tlorisnim razporedom, ki omogoča optimalno izrabo prostora ob hkratnem zagotavljanju "
+            "visokega deleža zelenih površin."
+        )
+        .p(
+            "Nadzemni del objektov je namenjen izključno bivanju, podzemni del pa parkiranju, tehničnim prostorom "
+            "in prometnim povezavam."
+        )
     )
 
     fi_val = float(r.get("FI", 0) or 0)
@@ -120,101 +156,152 @@ def _build_project_description_html(inputs: Dict[str, Any], r: Dict[str, Any]) -
     fzp_val_pct = float(r.get("fzp", 0) or 0) * 100.0
     fzp_min_pct = float(inputs.get("fzp_min_pct", 0) or 0)
 
-    p2 = (
-        "<b>2. Urbanistični kazalniki in skladnost</b><br/><br/>"
-        "Projekt izpolnjuje vse ključne urbanistične pogoje in omejitve:<br/><br/>"
-        "<b>Faktor izrabe (FI):</b><br/>"
-        f"Dosežen {fi_val:.2f} / dovoljen {fi_lim:.2f} → <b>{'skladno' if bool(r.get('fi_ok')) else 'neskladno'}</b><br/><br/>"
-        "<b>Faktor zazidanosti (FZ):</b><br/>"
-        f"Odtis stavb {area_fmt(fz_val)} / dovoljeno {area_fmt(fz_lim)} → <b>{'skladno' if bool(r.get('fz_ok')) else 'neskladno'}</b><br/><br/>"
-        "<b>Faktor zelenih površin (FZP):</b><br/>"
-        f"Dosežen {pct_fmt(fzp_val_pct)} / minimalno zahtevano {pct_fmt(fzp_min_pct)} → <b>{'skladno' if bool(r.get('fzp_ok')) else 'neskladno'}</b><br/><br/>"
-        "Zasnova tako omogoča visoko stopnjo zazelenitve in ugodno bivalno mikroklimo ob skoraj maksimalni "
-        "dovoljeni izrabi zemljišča."
+    # --- 2 ----------------------------------------------------------------
+    sections.append(
+        Section("2. Urbanistični kazalniki in skladnost")
+        .p("Projekt izpolnjuje vse ključne urbanistične pogoje in omejitve:")
+        .p(
+            "<b>Faktor izrabe (FI):</b><br/>"
+            f"Dosežen {fi_val:.2f} / dovoljen {fi_lim:.2f} → <b>{'skladno' if bool(r.get('fi_ok')) else 'neskladno'}</b>"
+        )
+        .p(
+            "<b>Faktor zazidanosti (FZ):</b><br/>"
+            f"Odtis stavb {area_fmt(fz_val)} / dovoljeno {area_fmt(fz_lim)} → <b>{'skladno' if bool(r.get('fz_ok')) else 'neskladno'}</b>"
+        )
+        .p(
+            "<b>Faktor zelenih površin (FZP):</b><br/>"
+            f"Dosežen {pct_fmt(fzp_val_pct)} / minimalno zahtevano {pct_fmt(fzp_min_pct)} → <b>{'skladno' if bool(r.get('fzp_ok')) else 'neskladno'}</b>"
+        )
+        .p(
+            "Zasnova tako omogoča visoko stopnjo zazelenitve in ugodno bivalno mikroklimo ob skoraj maksimalni "
+            "dovoljeni izrabi zemljišča."
+        )
     )
 
-    p3 = (
-        "<b>3. Program in struktura stanovanj</b><br/><br/>"
-        f"<b>Skupno število stanovanj:</b> {units}<br/><br/>"
-        f"<b>Neto/bruto faktor:</b> {net_to_gross:.2f}<br/><br/>"
-        "<b>Struktura stanovanj (ocena):</b><br/><br/>"
-        f"{typology_block_html()}<br/><br/>"
+    # --- 3 ----------------------------------------------------------------
+    s3 = (
+        Section("3. Program in struktura stanovanj")
+        .p(f"<b>Skupno število stanovanj:</b> {units}")
+        .p(f"<b>Neto/bruto faktor:</b> {net_to_gross:.2f}")
+        .p("<b>Struktura stanovanj (ocena):</b>")
+    )
+    for line in typology_paragraphs():
+        s3.p(line)
+    s3.p(
         "Struktura stanovanj je uravnotežena in prilagojena trgu, s poudarkom na manjših in srednje velikih "
-        "stanovanjih, ki praviloma predstavljajo večinski delež povpraševanja.<br/><br/>"
-        "<b>Skupna bruto tlorisna površina (BTP):</b><br/><br/>"
-        f"nadzemno: {area_fmt(btp_above)}<br/>"
-        "podzemno: 0 m² (stanovanjski program)"
+        "stanovanjih, ki praviloma predstavljajo večinski delež povpraševanja."
     )
-
-    p4 = (
-        "<b>4. Klet, parkiranje in prometna ureditev</b><br/><br/>"
-        "<b>Tip kleti:</b><br/><br/>"
-        f"{klet_fmt(_safe(scenario))}<br/><br/>"
-        "<b>Izkoristek garaže:</b><br/><br/>"
-        f"K-1: {float(inputs.get('garage_eff_k1', 0) or 0):.2f}<br/>"
-        f"K-2: {float(inputs.get('garage_eff_k2', 0) or 0):.2f}<br/><br/>"
-        f"Površina za rampe, tehnične prostore in komunikacije: ≈ {area_fmt(float(inputs.get('ramp_footprint_m2', 0) or 0))}<br/><br/>"
-        "<b>Parkiranje:</b><br/><br/>"
-        f"Skupno parkirnih mest (PM): {pm_total}<br/>"
-        f"v kleti: {pm_basement} PM<br/>"
-        f"na terenu: {pm_surface} PM<br/><br/>"
-        f"Parkirna norma: {pm_per_unit:.2f} PM / stanovanje<br/>"
-        f"vključuje cca {visitor_share:.0%} PM za obiskovalce<br/><br/>"
-        "Prometne in manipulacijske površine so dimenzionirane skladno s predpisi ter omogočajo nemoten dostop "
-        "intervencijskim, dostavnim in servisnim vozilom."
+    s3.p("<b>Skupna bruto tlorisna površina (BTP):</b>")
+    s3.p(f"nadzemno: {area_fmt(btp_above)}<br/>podzemno: 0 m² (stanovanjski program)")
+    sections.append(s3)
+
+    # --- 4 ----------------------------------------------------------------
+    sections.append(
+        Section("4. Klet, parkiranje in prometna ureditev")
+        .p("<b>Tip kleti:</b>")
+        .p(klet_fmt(_safe(scenario)))
+        .p("<b>Izkoristek garaže:</b>")
+        .p(
+            f"K-1: {float(inputs.get('garage_eff_k1', 0) or 0):.2f}<br/>"
+            f"K-2: {float(inputs.get('garage_eff_k2', 0) or 0):.2f}"
+        )
+        .p(f"Površina za rampe, tehnične prostore in komunikacije: ≈ {area_fmt(float(inputs.get('ramp_footprint_m2', 0) or 0))}")
+        .p("<b>Parkiranje:</b>")
+        .p(
+            f"Skupno parkirnih mest (PM): {pm_total}<br/>"
+            f"v kleti: {pm_basement} PM<br/>"
+            f"na terenu: {pm_surface} PM"
+        )
+        .p(
+            f"Parkirna norma: {pm_per_unit:.2f} PM / stanovanje<br/>"
+            f"vključuje cca {visitor_share:.0%} PM za obiskovalce"
+        )
+        .p(
+            "Prometne in manipulacijske površine so dimenzionirane skladno s predpisi ter omogočajo nemoten dostop "
+            "intervencijskim, dostavnim in servisnim vozilom."
+        )
     )
 
+    # --- 5 ----------------------------------------------------------------
     growing_area = float(r.get("growing_area", 0) or 0)
-    p5 = (
-        "<b>5. Zunanja ureditev in raščen teren</b><br/><br/>"
-        f"Raščen teren: cca {area_fmt(growing_area)}, kar predstavlja {pct_fmt(fzp_val_pct)} celotne površine območja.<br/><br/>"
-        "Zunanje površine vključujejo zelene površine, pešpoti in skupne odprte prostore. "
-        "Prednost je minimalno površinsko parkiranje, kar izboljšuje kakovost bivanja in vizualno podobo soseske."
+    sections.append(
+        Section("5. Zunanja ureditev in raščen teren")
+        .p(f"Raščen teren: cca {area_fmt(growing_area)}, kar predstavlja {pct_fmt(fzp_val_pct)} celotne površine območja.")
+        .p(
+            "Zunanje površine vključujejo zelene površine, pešpoti in skupne odprte prostore. "
+            "Prednost je minimalno površinsko parkiranje, kar izboljšuje kakovost bivanja in vizualno podobo soseske."
+        )
     )
 
-    p6 = (
-        "<b>6. Komunalna opremljenost in ITS</b><br/><br/>"
-        "Objekti bodo priključeni na obstoječo oziroma predvideno komunalno infrastrukturo:<br/><br/>"
-        "• vodovod<br/>"
-        "• fekalna in meteorna kanalizacija<br/>"
-        "• elektroenergetsko omrežje<br/>"
-        "• telekomunikacijsko omrežje<br/><br/>"
-        "ITS (infrastrukturno-tehnične storitve) vključujejo tudi organizacijo intervencijskih poti, dostopov ter "
-        "logično razporeditev funkcionalnih površin v sklopu parcelacije in zunanje ureditve."
+    # --- 6 ----------------------------------------------------------------
+    sections.append(
+        Section("6. Komunalna opremljenost in ITS")
+        .p("Objekti bodo priključeni na obstoječo oziroma predvideno komunalno infrastrukturo:")
+        .bullets([
+            "vodovod",
+            "fekalna in meteorna kanalizacija",
+            "elektroenergetsko omrežje",
+            "telekomunikacijsko omrežje",
+        ])
+        .p(
+            "ITS (infrastrukturno-tehnične storitve) vključujejo tudi organizacijo intervencijskih poti, dostopov ter "
+            "logično razporeditev funkcionalnih površin v sklopu parcelacije in zunanje ureditve."
+        )
     )
 
-    p7 = (
-        "<b>7. Ekonomski povzetek (ocena)</b><br/><br/>"
-        f"Skupna investicijska vrednost: {eur_fmt(invest)}<br/><br/>"
-        f"Ocenjeni prihodki od prodaje: {eur_fmt(revenue)}<br/><br/>"
-        f"Razlika (rezultat projekta): {eur_fmt(margin)}"
+    # --- 7 ----------------------------------------------------------------
+    sections.append(
+        Section("7. Ekonomski povzetek (ocena)")
+        .p(f"Skupna investicijska vrednost: {eur_fmt(invest)}")
+        .p(f"Ocenjeni prihodki od prodaje: {eur_fmt(revenue)}")
+        .p(f"Razlika (rezultat projekta): {eur_fmt(margin)}")
     )
 
-    p8 = (
-        "<b>8. Zaključna ocena</b><br/><br/>"
-        f"Projekt je z vidika urbanističnih kazalnikov, prostorske izrabe in bivalne kakovosti ocenjen kot <b>{_safe(r.get('status'))}</b>. "
-        "V primeru negativnega rezultata je smiselno razmisliti o:<br/><br/>"
-        "• optimizaciji investicijskih stroškov,<br/>"
-        "• prilagoditvi strukture stanovanj,<br/>"
-        "• izboljšanju prodajnih cen oziroma faznosti izvedbe."
+    # --- 8 ----------------------------------------------------------------
+    sections.append(
+        Section("8. Zaključna ocena")
+        .p(
+            f"Projekt je z vidika urbanističnih kazalnikov, prostorske izrabe in bivalne kakovosti ocenjen kot <b>{_safe(r.get('status'))}</b>. "
+            "V primeru negativnega rezultata je smiselno razmisliti o:"
+        )
+        .bullets([
+            "optimizaciji investicijskih stroškov,",
+            "prilagoditvi strukture stanovanj,",
+            "izboljšanju prodajnih cen oziroma faznosti izvedbe.",
+        ])
     )
 
-    prefix = ""
-    if proj or code:
-        prefix = f"<b>{_safe(proj)}</b> {('(' + _safe(code) + ')') if code else ''}".strip()
-        prefix = prefix.replace("  ", " ")
+    return sections
+
+
+# ============================================================
+# POGLEDI: HTML odstavki, markdown
+# ============================================================
+def _section_html(section: Section) -> str:
+    parts = []
+    for kind, content in section.blocks:
+        if kind == "bullets":
+            parts.append("<br/>".join(f"• {item}" for item in content))
+        else:
+            parts.append(content)
+    body = "<br/><br/>".join(parts)
+    if not section.heading:
+        return body
+    return f"<b>{section.heading}</b><br/><br/>{body}"
 
-    paragraphs = [p1, p2, p3, p4, p5, p6, p7, p8]
-    if prefix:
-        paragraphs.insert(0, prefix)
-    return paragraphs
+
+def _build_project_description_html(inputs: Dict[str, Any], r: Dict[str, Any]) -> List[str]:
+    """Return the project description as a list of HTML-ish paragraphs (one per section).
+
+    ReportLab's Paragraph supports a small subset of HTML tags (e.g. <b>, <br/>).
+    """
+    return [_section_html(s) for s in build_project_sections(inputs, r)]
 
 
 def build_project_description_markdown(inputs: Dict[str, Any], results: Dict[str, Any]) -> str:
     """A readable (Streamlit-friendly) markdown version of the project description."""
-    html_paras = _build_project_description_html(inputs, results)
     md_parts: List[str] = []
-    for para in html_paras:
+    for para in _build_project_description_html(inputs, results):
         md = para.replace("<b>", "**").replace("</b>", "**")
         md = md.replace("<br/>", "\n")
         md_parts.append(md)
@@ -224,152 +311,113 @@ def build_project_description_markdown(inputs: Dict[str, Any], results: Dict[str
 # ============================================================
 # PDF (šumniki + bold + večji font za poglavja 1.,2.,3.,...)
 # ============================================================
-def build_pdf(inputs: Dict[str, Any], results: Dict[str, Any]) -> bytes:
-    """Build a short PDF (A4) that includes ONLY the project description (Opis projekta).
+PAGE_MARGIN = 36  # pt
 
-    Uses DejaVuSans font family to support Slovene characters (šumniki) and true bold.
-    Section headings (1., 2., 3., ...) are rendered in a larger font.
-    """
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-    from reportlab.lib.utils import ImageReader
-    from reportlab.pdfbase import pdfmetrics
-    from reportlab.pdfbase.ttfonts import TTFont
-
-    # --- font paths (robust) ---
-    here = Path(__file__).resolve().parent
-
-    # poskusi tipične lokacije v projektu
-    candidate_regular = [
-        here / "assets" / "fonts" / "DejaVuSans.ttf",
-        here / "assets" / "DejaVuSans.ttf",
-        Path("assets/fonts/DejaVuSans.ttf"),
-        Path("assets/DejaVuSans.ttf"),
-    ]
-    candidate_bold = [
-        here / "assets" / "fonts" / "DejaVuSans-Bold.ttf",
-        here / "assets" / "DejaVuSans-Bold.ttf",
-        Path("assets/fonts/DejaVuSans-Bold.ttf"),
-        Path("assets/DejaVuSans-Bold.ttf"),
-    ]
-
-    regular_path = next((p for p in candidate_regular if p.exists()), None)
-    bold_path = next((p for p in candidate_bold if p.exists()), None)
-
-    if not regular_path:
-        raise FileNotFoundError(
-            "Ne najdem DejaVuSans.ttf. Dodaj ga npr. v assets/fonts/DejaVuSans.ttf."
-        )
 
-    # --- register fonts + family mapping (da <b> deluje) ---
-    registered = set(pdfmetrics.getRegisteredFontNames())
-    if "DejaVuSans" not in registered:
-        pdfmetrics.registerFont(TTFont("DejaVuSans", str(regular_path)))
-
-    if bold_path and "DejaVuSans-Bold" not in registered:
-        pdfmetrics.registerFont(TTFont("DejaVuSans-Bold", str(bold_path)))
-
-    registered = set(pdfmetrics.getRegisteredFontNames())
-    if "DejaVuSans-Bold" in registered:
-        pdfmetrics.registerFontFamily(
-            "DejaVuSans",
-            normal="DejaVuSans",
-            bold="DejaVuSans-Bold",
-            italic="DejaVuSans",
-            boldItalic="DejaVuSans-Bold",
-        )
+def _map_flowables(map_bytes: bytes, max_w: float, max_h: float) -> List[Any]:
+    """Project map image scaled to the frame width (and at most `max_h` tall).
 
-    buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, leftMargin=36, rightMargin=36, topMargin=36, bottomMargin=36)
-    styles = getSampleStyleSheet()
-
-    title_style = ParagraphStyle(
-        "title_dv",
-        parent=styles["Title"],
-        fontName="DejaVuSans",
-        fontSize=18,
-        leading=22,
-        spaceAfter=10,
-    )
+    The image is resampled for its placed size first (see ``pdf_resources.prepare_image``),
+    so large aerial photos do not end up in the PDF at full resolution.
+    """
+    from reportlab.platypus import Spacer, Image
+
+    try:
+        iw, ih = image_size(map_bytes)
+        scale = max_w / float(iw) if iw else 1.0
+        w = iw * scale
+        h = ih * scale
+        if h > max_h and ih:
+            scale = max_h / float(ih)
+            w = iw * scale
+            h = ih * scale
+        img_buf = BytesIO(prepare_image(map_bytes, w, h))
+        return [Image(img_buf, width=w, height=h), Spacer(1, 12)]
+    except Exception:
+        return []
 
-    # Večji font za poglavja (1.,2.,3.,...)
-    section_style = ParagraphStyle(
-        "section_dv",
-        parent=styles["Heading2"],
-        fontName="DejaVuSans-Bold" if "DejaVuSans-Bold" in registered else "DejaVuSans",
-        fontSize=13.5,
-        leading=17,
-        spaceBefore=8,
-        spaceAfter=6,
-    )
 
-    body_style = ParagraphStyle(
-        "body_dv",
-        parent=styles["BodyText"],
-        fontName="DejaVuSans",
-        fontSize=10.5,
-        leading=14,
-    )
+def section_flowables(sections: List[Section]) -> List[Any]:
+    """Platypus flowables for the given sections (built directly, no markup round trip)."""
+    from reportlab.platypus import Paragraph, Spacer, ListFlowable, ListItem
+
+    styles = get_styles()
+    section_style = styles["section"]
+    body_style = styles["body"]
 
     story: List[Any] = []
+    for section in sections:
+        # uvodna vrstica (ime/šifra projekta) – kompaktno
+        if not section.heading:
+            for _, content in section.blocks:
+                story.append(Paragraph(content, body_style))
+            story.append(Spacer(1, 8))
+            continue
+
+        story.append(Paragraph(section.heading, section_style))
+        for i, (kind, content) in enumerate(section.blocks):
+            if i:
+                story.append(Spacer(1, 6))
+            if kind == "bullets":
+                story.append(
+                    ListFlowable(
+                        [ListItem(Paragraph(item, body_style)) for item in content],
+                        bulletType="bullet",
+                        leftIndent=18,
+                    )
+                )
+            else:
+                story.append(Paragraph(content, body_style))
+        story.append(Spacer(1, 10))
+    return story
 
+
+def project_story(inputs: Dict[str, Any], results: Dict[str, Any], frame_w: float, frame_h: float) -> List[Any]:
+    """Flowables of one project's report: title, optional map image, sections."""
+    from reportlab.platypus import Paragraph
+
+    styles = get_styles()
     title = inputs.get("project_name") or "Opis projekta"
-    story.append(Paragraph(f"<b>{_safe(title)}</b>", title_style))
+    story: List[Any] = [Paragraph(f"<b>{_safe(title)}</b>", styles["title"])]
 
     # Optional: project map image (uploaded in the first tab)
     map_bytes = inputs.get("map_image_bytes")
     if map_bytes:
-        try:
-            img_buf = BytesIO(map_bytes)
-            ir = ImageReader(img_buf)
-            iw, ih = ir.getSize()
-            max_w = doc.width
-            max_h = doc.height * 0.35
-            scale = max_w / float(iw) if iw else 1.0
-            w = iw * scale
-            h = ih * scale
-            if h > max_h and ih:
-                scale = max_h / float(ih)
-                w = iw * scale
-                h = ih * scale
-            img_buf.seek(0)
-            story.append(Image(img_buf, width=w, height=h))
-            story.append(Spacer(1, 12))
-        except Exception:
-            pass
+        story.extend(_map_flowables(map_bytes, frame_w, frame_h * 0.35))
 
-    # --- helper: split "<b>1. ...</b><br/><br/>BODY" into heading + body ---
-    section_re = re.compile(r"^\s*<b>\s*(\d+\.\s*[^<]+)\s*</b><br\s*/><br\s*/>(.*)$", re.DOTALL)
+    story.extend(section_flowables(build_project_sections(inputs, results)))
+    return story
 
-    html_paras = _build_project_description_html(inputs, results)
 
-    for i, para in enumerate(html_paras):
-        # 1) prefix (project name/code) – keep compact
-        if i == 0 and para.strip().startswith("<b>") and ("1." not in para[:20]):
-            story.append(Paragraph(para, body_style))
-            story.append(Spacer(1, 8))
-            continue
-
-        m = section_re.match(para.strip())
-        if m:
-            heading_text = m.group(1).strip()
-            body_html = (m.group(2) or "").strip()
+def write_pdf(inputs: Dict[str, Any], results: Dict[str, Any], out: Union[str, BinaryIO]) -> int:
+    """Render the project report (A4) into `out`: a file path or a binary stream.
 
-            # heading larger
-            story.append(Paragraph(heading_text, section_style))
+    ReportLab writes the document straight to the target, so writing to a file keeps
+    only one copy of the PDF around (no extra BytesIO.getvalue()). Returns the number
+    of pages.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    doc = SimpleDocTemplate(
+        out,
+        pagesize=A4,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+        title=(inputs.get("project_code") or "URBCalc"),
+    )
+    doc.build(project_story(inputs, results, doc.width, doc.height))
+    return doc.page
 
-            # body normal
-            if body_html:
-                story.append(Paragraph(body_html, body_style))
-                story.append(Spacer(1, 10))
-            else:
-                story.append(Spacer(1, 8))
-            continue
 
-        # fallback
-        story.append(Paragraph(para, body_style))
-        story.append(Spacer(1, 10))
+def build_pdf(inputs: Dict[str, Any], results: Dict[str, Any]) -> bytes:
+    """Build a short PDF (A4) that includes ONLY the project description (Opis projekta).
 
-    doc.build(story)
+    Uses DejaVuSans font family to support Slovene characters (šumniki) and true bold.
+    Section headings (1., 2., 3., ...) are rendered in a larger font.
+    """
+    buf = BytesIO()
+    write_pdf(inputs, results, buf)
     return buf.getvalue()
@@ -0,0 +1,230 @@
+"""Process-wide PDF resources: DejaVu fonts, paragraph styles and prepared images.
+
+The report renderer (``pdf_export``) takes its fonts and styles from here, so the
+TTF files are parsed and the style sheet is built only on the first export in a
+process (or earlier, via ``warm_up``). Embedded images are resampled to the print
+resolution of their placed size and cached by content hash.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+FONT_REGULAR = "DejaVuSans"
+FONT_BOLD = "DejaVuSans-Bold"
+
+_HERE = Path(__file__).resolve().parent
+
+# poskusi tipične lokacije v projektu
+_CANDIDATE_REGULAR = [
+    _HERE / "assets" / "fonts" / "DejaVuSans.ttf",
+    _HERE / "assets" / "DejaVuSans.ttf",
+    Path("assets/fonts/DejaVuSans.ttf"),
+    Path("assets/DejaVuSans.ttf"),
+]
+_CANDIDATE_BOLD = [
+    _HERE / "assets" / "fonts" / "DejaVuSans-Bold.ttf",
+    _HERE / "assets" / "DejaVuSans-Bold.ttf",
+    Path("assets/fonts/DejaVuSans-Bold.ttf"),
+    Path("assets/DejaVuSans-Bold.ttf"),
+]
+
+_lock = threading.RLock()
+_fonts: Optional[Dict[str, str]] = None
+_styles: Optional[Dict[str, Any]] = None
+_warm_thread: Optional[threading.Thread] = None
+
+IMAGE_DPI = 150
+JPEG_QUALITY = 82
+_IMAGE_CACHE_SIZE = 32
+_images: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+
+def register_fonts() -> Dict[str, str]:
+    """Register DejaVuSans (+ bold family mapping, so <b> works) once per process.
+
+    Returns the font names to use: {"regular": ..., "bold": ...}; "bold" falls back to the
+    regular face when DejaVuSans-Bold.ttf is not available.
+    """
+    global _fonts
+    if _fonts is not None:
+        return _fonts
+
+    with _lock:
+        if _fonts is not None:
+            return _fonts
+
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        regular_path = next((p for p in _CANDIDATE_REGULAR if p.exists()), None)
+        bold_path = next((p for p in _CANDIDATE_BOLD if p.exists()), None)
+
+        if not regular_path:
+            raise FileNotFoundError(
+                "Ne najdem DejaVuSans.ttf. Dodaj ga npr. v assets/fonts/DejaVuSans.ttf."
+            )
+
+        registered = set(pdfmetrics.getRegisteredFontNames())
+        if FONT_REGULAR not in registered:
+            pdfmetrics.registerFont(TTFont(FONT_REGULAR, str(regular_path)))
+
+        if bold_path and FONT_BOLD not in registered:
+            pdfmetrics.registerFont(TTFont(FONT_BOLD, str(bold_path)))
+
+        bold = FONT_REGULAR
+        if FONT_BOLD in set(pdfmetrics.getRegisteredFontNames()):
+            bold = FONT_BOLD
+            pdfmetrics.registerFontFamily(
+                FONT_REGULAR,
+                normal=FONT_REGULAR,
+                bold=FONT_BOLD,
+                italic=FONT_REGULAR,
+                boldItalic=FONT_BOLD,
+            )
+
+        _fonts = {"regular": FONT_REGULAR, "bold": bold}
+        return _fonts
+
+
+def get_styles() -> Dict[str, Any]:
+    """Paragraph styles shared by all PDF exports (built once, treat as read-only)."""
+    global _styles
+    if _styles is not None:
+        return _styles
+
+    with _lock:
+        if _styles is not None:
+            return _styles
+
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+        fonts = register_fonts()
+        base = getSampleStyleSheet()
+
+        _styles = {
+            "title": ParagraphStyle(
+                "title_dv",
+                parent=base["Title"],
+                fontName=fonts["regular"],
+                fontSize=18,
+                leading=22,
+                spaceAfter=10,
+            ),
+            # Večji font za poglavja (1.,2.,3.,...)
+            "section": ParagraphStyle(
+                "section_dv",
+                parent=base["Heading2"],
+                fontName=fonts["bold"],
+                fontSize=13.5,
+                leading=17,
+                spaceBefore=8,
+                spaceAfter=6,
+            ),
+            "body": ParagraphStyle(
+                "body_dv",
+                parent=base["BodyText"],
+                fontName=fonts["regular"],
+                fontSize=10.5,
+                leading=14,
+            ),
+        }
+        return _styles
+
+
+# =================================================
+# SLIKE (karta projekta): pomanjšanje + ponovno stiskanje
+# =================================================
+def image_size(data: bytes) -> Tuple[int, int]:
+    """Pixel size of an image as displayed (EXIF rotation applied); reads only the header."""
+    from PIL import Image
+
+    with Image.open(BytesIO(data)) as im:
+        w, h = im.size
+        if im.getexif().get(0x0112) in (5, 6, 7, 8):
+            w, h = h, w
+    return w, h
+
+
+def _recompress(data: bytes, target: Tuple[int, int]) -> bytes:
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(data)) as src:
+        im = ImageOps.exif_transpose(src)
+        resized = im.width > target[0] or im.height > target[1]
+        if resized:
+            im.thumbnail(target, Image.LANCZOS)
+
+        buf = BytesIO()
+        has_alpha = im.mode in ("RGBA", "LA", "PA") or "transparency" in im.info
+        if has_alpha:
+            im.save(buf, "PNG", optimize=True)
+        elif im.mode in ("P", "1") or im.convert("RGB").getcolors(256) is not None:
+            # karte/izrisi z malo barvami: PNG s paleto (brez JPEG artefaktov na črtah)
+            im.convert("RGB").quantize(256).save(buf, "PNG", optimize=True)
+        else:
+            im.convert("RGB").save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True)
+
+    out = buf.getvalue()
+    if not resized and len(out) >= len(data):
+        return data
+    return out
+
+
+def prepare_image(data: bytes, width_pt: float, height_pt: float, dpi: int = IMAGE_DPI) -> bytes:
+    """Image bytes for embedding at `width_pt` × `height_pt` (PDF points).
+
+    Downscales to `dpi` for the placed size (never upscales) and recompresses: JPEG for
+    photos, palette PNG for flat-colour images (maps, plans), PNG when there is
+    transparency. Results are cached per process by content hash and target size, so
+    repeated exports of the same project reuse them. Unreadable images are returned
+    unchanged.
+    """
+    target = (max(1, round(width_pt / 72.0 * dpi)), max(1, round(height_pt / 72.0 * dpi)))
+    key = (hashlib.sha1(data).digest(), target)
+
+    with _lock:
+        out = _images.get(key)
+        if out is not None:
+            _images.move_to_end(key)
+            return out
+
+    try:
+        out = _recompress(data, target)
+    except Exception:
+        return data
+
+    with _lock:
+        _images[key] = out
+        while len(_images) > _IMAGE_CACHE_SIZE:
+            _images.popitem(last=False)
+    return out
+
+
+def warm_up(background: bool = True) -> Optional[threading.Thread]:
+    """Register fonts and build styles ahead of the first export.
+
+    With `background=True` the work runs in a daemon thread (started at most once per
+    process); errors are ignored here and surface again on the actual export.
+    """
+    global _warm_thread
+
+    def _run():
+        try:
+            get_styles()
+        except Exception:
+            pass
+
+    if not background:
+        _run()
+        return None
+
+    with _lock:
+        if _warm_thread is None and _styles is None:
+            _warm_thread = threading.Thread(target=_run, name="pdf-warm-up", daemon=True)
+            _warm_thread.start()
+        return _warm_thread
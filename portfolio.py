@@ -0,0 +1,367 @@
+"""Portfolio report: ``python -m portfolio INPUT -o report.pdf [--workers N]``.
+
+Binds many project studies (rows of a CSV / JSON Lines / Parquet file, same format as
+``python -m urbanistika``) into one PDF: a summary table that doubles as the table of
+contents, followed by one chapter per project built with ``pdf_export``.
+
+The projects go through a process pool twice (at most ``2 * workers`` in flight): first
+for the summary rows, then for the chapter flowables, which the main process streams
+into a single ReportLab document as they arrive, with a bookmark per project. Every
+chapter is laid out exactly once: the page numbers in the table of contents are PDF
+forms that each chapter fills in when its first page is drawn, so the front matter does
+not need the chapter lengths in advance. Only the summary rows are kept for the whole
+portfolio, so memory does not grow with the number of projects (merging chapter PDFs
+with ``pypdf`` would hold every page until the final write). With ``--cache PATH`` the
+summary of every project is kept in a persistent ``result_cache.ResultCache``;
+unchanged projects are not computed again in the first pass.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core import compute, inputs_hash
+from pdf_export import PAGE_MARGIN, project_story
+from pdf_resources import get_styles, register_fonts
+from result_cache import ResultCache
+from urbanistika import INPUT_FORMATS, _detect, read_rows, row_to_inputs
+
+DEFAULT_TITLE = "Portfelj projektov"
+
+TOC_FONT_SIZE = 8   # pisava tabele povzetka
+TOC_LEADING = 12
+
+
+class _NullSink:
+    """Binary stream that discards everything (a document that is never written)."""
+
+    def write(self, data) -> int:
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+def _label(inputs: Dict[str, Any], index: int) -> str:
+    name = str(inputs.get("project_name") or "").strip()
+    code = str(inputs.get("project_code") or "").strip()
+    if name and code:
+        return f"{name} ({code})"
+    return name or code or f"Projekt {index + 1}"
+
+
+def _page_form(index: int) -> str:
+    """Name of the PDF form that holds the start page of project `index`."""
+    return f"start{index}"
+
+
+# =================================================
+# POVZETEK IN POGLAVJE POSAMEZNEGA PROJEKTA (v procesu iz bazena)
+# =================================================
+# odprti predpomnilniki v tem procesu (pot -> ResultCache)
+_caches: Dict[str, ResultCache] = {}
+
+# polja povzetka, ki se shranijo v predpomnilnik (oznaka je odvisna tudi od zaporedne številke)
+_CACHED_FIELDS = ("P", "units", "FI", "fzp", "compliant", "margin_abs")
+
+
+def _summary_fields(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    r = compute(inputs)
+    return {
+        "P": float(r["P"]),
+        "units": int(r["units"]),
+        "FI": float(r["FI"]),
+        "fzp": float(r["fzp"]),
+        "compliant": bool(r["fi_ok"] and r["fz_ok"] and r["fzp_ok"]),
+        "margin_abs": float(r["econ"]["margin_abs"]),
+    }
+
+
+def _summary_cached(inputs: Dict[str, Any], cache_path: str) -> Dict[str, Any]:
+    cache = _caches.get(cache_path)
+    if cache is None:
+        cache = _caches[cache_path] = ResultCache(cache_path)
+    return cache.cached("summary", inputs_hash(inputs), lambda: _summary_fields(inputs))
+
+
+def summarize_project(job: Tuple[int, Dict[str, Any], Optional[str]]) -> Dict[str, Any]:
+    """Compute one project's summary row (label, key figures, error).
+
+    `job` is (index, raw row, cache path). With a cache path the key figures are taken
+    from / stored in the cache.
+    """
+    index, row, cache_path = job
+    out: Dict[str, Any] = {"index": index, "label": f"Projekt {index + 1}", "pages": 0, "error": ""}
+    try:
+        inputs = row_to_inputs(row)
+        out.update(_summary_cached(inputs, cache_path) if cache_path else _summary_fields(inputs))
+        out["label"] = _label(inputs, index)
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    return out
+
+
+def _frame() -> Tuple[float, float]:
+    doc = _doc(_NullSink(), "")
+    return doc.width, doc.height
+
+
+def chapter_story(job: Tuple[int, Dict[str, Any]]) -> List[Any]:
+    """Flowables of one project's chapter (picklable, so they come back from the pool)."""
+    _, row = job
+    inputs = row_to_inputs(row)
+    return project_story(inputs, compute(inputs), *_frame())
+
+
+def _map_ordered(fn: Callable[[Any], Any], jobs: Iterator[Any], workers: int) -> Iterator[Any]:
+    """``fn`` over the jobs, results in order; at most ``2 * workers`` are in flight."""
+    if workers <= 1:
+        for job in jobs:
+            yield fn(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for job in jobs:
+            pending.append(pool.submit(fn, job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# =================================================
+# UVOD: POVZETEK IN KAZALO
+# =================================================
+def _fmt_int(v: float) -> str:
+    return f"{v:,.0f}".replace(",", " ")
+
+
+def _front_story(title: str, summary: List[Dict[str, Any]]) -> List[Any]:
+    from reportlab.lib import colors
+    from reportlab.platypus import Flowable, Paragraph, Spacer, Table, TableStyle
+
+    styles = get_styles()
+    fonts = register_fonts()
+
+    class _StartPage(Flowable):
+        """Start page of a chapter: a form drawn now, filled in when the chapter starts."""
+
+        def __init__(self, index: int):
+            super().__init__()
+            self.index = index
+
+        def wrap(self, aw, ah):
+            # poravnan desno kot ostale celice; osnovnica kot pri besedilu v celici
+            return 0, TOC_LEADING
+
+        def draw(self):
+            self.canv.translate(0, TOC_LEADING - TOC_FONT_SIZE)
+            self.canv.doForm(_page_form(self.index))
+
+    n_err = sum(1 for s in summary if s["error"])
+    story: List[Any] = [
+        Paragraph(f"<b>{title}</b>", styles["title"]),
+        Paragraph(
+            f"Število projektov: {len(summary)} (napak pri izračunu: {n_err}) · {date.today():%d. %m. %Y}",
+            styles["body"],
+        ),
+        Spacer(1, 10),
+        Paragraph("Povzetek in kazalo", styles["section"]),
+    ]
+
+    header = ["#", "Projekt", "P [m²]", "Stan.", "FI", "FZP", "Skladnost", "Rezultat [€]", "Stran"]
+    data = [header]
+    for s in summary:
+        label = s["label"] if len(s["label"]) <= 34 else s["label"][:33] + "…"
+        if s["error"]:
+            data.append([str(s["index"] + 1), label, "", "", "", "", "napaka", "", "—"])
+            continue
+        data.append([
+            str(s["index"] + 1),
+            label,
+            _fmt_int(s["P"]),
+            str(s["units"]),
+            f"{s['FI']:.2f}",
+            f"{s['fzp'] * 100:.1f} %",
+            "skladno" if s["compliant"] else "neskladno",
+            _fmt_int(s["margin_abs"]),
+            _StartPage(s["index"]),
+        ])
+
+    table = Table(data, colWidths=[24, 150, 52, 34, 34, 44, 58, 80, 34], repeatRows=1)
+    table.setStyle(TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), fonts["regular"]),
+        ("FONTNAME", (0, 0), (-1, 0), fonts["bold"]),
+        ("FONTSIZE", (0, 0), (-1, -1), TOC_FONT_SIZE),
+        ("LEADING", (0, 0), (-1, -1), TOC_LEADING),
+        ("ALIGN", (2, 0), (-1, -1), "RIGHT"),
+        ("LINEBELOW", (0, 0), (-1, 0), 0.6, colors.black),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f2f2f2")]),
+        ("TOPPADDING", (0, 0), (-1, -1), 2),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+    ]))
+    story.append(table)
+
+    errors = [s for s in summary if s["error"]]
+    if errors:
+        story.append(Spacer(1, 10))
+        story.append(Paragraph("Napake pri izračunu", styles["section"]))
+        for s in errors:
+            story.append(Paragraph(f"{s['index'] + 1}. {s['label']}: {s['error']}", styles["body"]))
+    return story
+
+
+def _doc(out, title: str, doc_cls=None):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    return (doc_cls or SimpleDocTemplate)(
+        out,
+        pagesize=A4,
+        leftMargin=PAGE_MARGIN,
+        rightMargin=PAGE_MARGIN,
+        topMargin=PAGE_MARGIN,
+        bottomMargin=PAGE_MARGIN,
+        title=title,
+    )
+
+
+# =================================================
+# ZDRUŽEVANJE
+# =================================================
+def _stream_single_document(
+    out: Path,
+    title: str,
+    front: List[Any],
+    chapters: Iterable[Tuple[int, List[Any]]],
+    summary: List[Dict[str, Any]],
+) -> Tuple[Dict[int, int], int]:
+    """Build one ReportLab document, pulling in the next chapter only when the
+    previous one has been laid out. `chapters` yields (index, flowables) in order.
+
+    Returns the start page of every chapter and the total page count.
+    """
+    from reportlab.platypus import Flowable, PageBreak, SimpleDocTemplate
+
+    fonts = register_fonts()
+    starts: Dict[int, int] = {}
+
+    class _ChapterStart(Flowable):
+        """Bookmark of a chapter; also fills in its page number in the table of contents."""
+
+        def __init__(self, index: int, text: str):
+            super().__init__()
+            self.index, self.text = index, text
+
+        def wrap(self, aw, ah):
+            return 0, 0
+
+        def draw(self):
+            canv = self.canv
+            key = f"p{self.index}"
+            canv.bookmarkPage(key)
+            canv.addOutlineEntry(self.text, key, level=0)
+            page = starts[self.index] = canv.getPageNumber()
+            # območje obrazca: desno poravnana številka levo od izhodišča
+            canv.beginForm(_page_form(self.index), -100, -TOC_FONT_SIZE, 0, 2 * TOC_FONT_SIZE)
+            canv.setFont(fonts["regular"], TOC_FONT_SIZE)
+            canv.drawRightString(0, 0, str(page))
+            canv.endForm()
+
+    labels = {s["index"]: s["label"] for s in summary if not s["error"]}
+
+    def stories() -> Iterator[List[Any]]:
+        for index, story in chapters:
+            story.insert(1, _ChapterStart(index, labels[index]))
+            yield [PageBreak()] + story
+
+    class _PortfolioDoc(SimpleDocTemplate):
+        def handle_flowable(self, flowables):
+            # dopolni glavno vrsto z naslednjim poglavjem, preden se izprazni
+            if flowables is front and len(flowables) < 2:
+                for story in pending:
+                    flowables.extend(story)
+                    break
+            super().handle_flowable(flowables)
+
+    doc = _doc(str(out), title, _PortfolioDoc)
+    pending = stories()
+    doc.build(front)
+    return starts, doc.page
+
+
+def build_portfolio(
+    rows: Callable[[], Iterable[Dict[str, Any]]],
+    out: Path,
+    workers: int = 1,
+    title: str = DEFAULT_TITLE,
+    progress: Optional[Callable[[int], None]] = None,
+    cache_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Write the portfolio PDF for the projects in `rows()` to `out`.
+
+    `rows` is called to get a fresh iterable of raw input rows (dicts in the app's input
+    format); it is iterated twice (summaries, then the chapters). `cache_path` is an
+    optional persistent result cache (SQLite file). Returns the summary rows.
+    """
+    out = Path(out)
+    jobs = ((i, row, cache_path) for i, row in enumerate(rows()))
+    summary: List[Dict[str, Any]] = []
+    for s in _map_ordered(summarize_project, jobs, workers):
+        summary.append(s)
+        if progress:
+            progress(len(summary))
+
+    ok = {s["index"] for s in summary if not s["error"]}
+    chapter_jobs = ((i, row) for i, row in enumerate(rows()) if i in ok)
+    chapters = zip(sorted(ok), _map_ordered(chapter_story, chapter_jobs, workers))
+    starts, total = _stream_single_document(out, title, _front_story(title, summary), chapters, summary)
+
+    ends = sorted(starts.values())[1:] + [total + 1]
+    for s in summary:
+        s["start_page"] = starts.get(s["index"])
+    for index, end in zip(sorted(starts), ends):
+        summary[index]["pages"] = end - starts[index]
+    return summary
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m portfolio",
+        description="Urbanistično-ekonomski kalkulator – PDF poročilo za več projektov (portfelj).",
+    )
+    parser.add_argument("input", type=Path, help="vhodna datoteka (.csv, .jsonl, .parquet)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="izhodni PDF")
+    parser.add_argument("--workers", type=int, default=1, help="število procesov (privzeto 1)")
+    parser.add_argument("--title", default=DEFAULT_TITLE, help="naslov poročila")
+    parser.add_argument("--cache", metavar="PATH", help="trajni predpomnilnik rezultatov (SQLite datoteka)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="brez izpisa napredka")
+    args = parser.parse_args(argv)
+
+    in_fmt = _detect(args.input, INPUT_FORMATS, "vhodni")
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        for chunk in read_rows(args.input, in_fmt):
+            yield from chunk
+
+    def progress(n: int) -> None:
+        print(f"\r{n} projektov", end="", file=sys.stderr, flush=True)
+
+    summary = build_portfolio(
+        rows, args.output, args.workers, args.title, None if args.quiet else progress, args.cache
+    )
+
+    errors = sum(1 for s in summary if s["error"])
+    if not args.quiet:
+        print(f"\r{len(summary)} projektov, napak: {errors}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
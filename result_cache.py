@@ -0,0 +1,189 @@
+"""Persistent result cache (SQLite), shared by the CLI, the optimizer and the app.
+
+Entries are stored under ``namespace`` + a canonical key (``core.inputs_hash`` of the
+inputs and any parameters) and tagged with ``core.MODEL_VERSION``; opening a cache
+drops entries of other model versions, so results are recomputed after the formulas
+change. The cache is bounded by entry count and total size and evicts the least
+recently used entries.
+
+Values are pickled: point the cache only at a location you trust (like the code).
+The app and the optimizer use the cache given by the ``URBANISTIKA_CACHE`` environment
+variable (see ``default_cache``); the CLI tools take ``--cache PATH``.
+"""
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from core import MODEL_VERSION, compute, inputs_hash
+
+ENV_VAR = "URBANISTIKA_CACHE"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key       TEXT PRIMARY KEY,
+    version   INTEGER NOT NULL,
+    value     BLOB NOT NULL,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+_MISSING = object()
+
+
+class ResultCache:
+    """Key-value store of computed results with LRU limits.
+
+    Safe to share between threads (one connection behind a lock) and between
+    processes (each opens its own ``ResultCache`` on the same file; SQLite WAL). A pickled
+    cache reopens the same file in the receiving process.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200_000, max_bytes: int = 512 * 1024 * 1024):
+        self.path = str(path)
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self._since_trim = [0, 0]  # vpisi, bajti od zadnjega preverjanja omejitev
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("DELETE FROM results WHERE version != ?", (MODEL_VERSION,))
+
+    def __getstate__(self) -> dict:
+        # v drug proces (npr. jobs.JobManager) se prenese le pot; tam odpre svojo povezavo
+        return {"path": self.path, "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["path"], state["max_entries"], state["max_bytes"])
+
+    # ---------------------------------------------------------------
+    def get_many(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        """Cached values for the given keys (missing keys are left out)."""
+        found: Dict[str, Any] = {}
+        if not keys:
+            return found
+        full = [f"{namespace}:{k}" for k in keys]
+        with self._lock:
+            for start in range(0, len(full), 500):
+                part = full[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM results WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                for key, blob in rows:
+                    found[key.split(":", 1)[1]] = pickle.loads(blob)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE results SET last_used = ? WHERE key = ?",
+                    [(now, f"{namespace}:{k}") for k in found],
+                )
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        return self.get_many(namespace, [key]).get(key, default)
+
+    def put_many(self, namespace: str, items: Dict[str, Any]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            rows.append((f"{namespace}:{key}", MODEL_VERSION, blob, len(blob), now))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results (key, version, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                # omejitve preverjamo po vsakih ~5 % novih vnosov/bajtov (COUNT/SUM je sken tabele)
+                self._since_trim[0] += len(rows)
+                self._since_trim[1] += sum(r[3] for r in rows)
+                if self._since_trim[0] >= self.max_entries // 20 or self._since_trim[1] >= self.max_bytes // 20:
+                    self._trim()
+                    self._since_trim = [0, 0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        self.put_many(namespace, {key: value})
+
+    def _trim(self) -> None:
+        n, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if n <= self.max_entries and size <= self.max_bytes:
+            return
+        # obdrži najnovejše do 90 % omejitev (da ne čistimo ob vsakem vpisu)
+        keep_n = int(self.max_entries * 0.9)
+        keep_bytes = int(self.max_bytes * 0.9)
+        kept, total, stale = 0, 0, []
+        for key, sz in self._conn.execute("SELECT key, size FROM results ORDER BY last_used DESC").fetchall():
+            if kept < keep_n and total + sz <= keep_bytes:
+                kept += 1
+                total += sz
+            else:
+                stale.append((key,))
+        self._conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    # ---------------------------------------------------------------
+    def cached(self, namespace: str, key: str, fn: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, or compute it with `fn()` and store it."""
+        value = self.get(namespace, key, _MISSING)
+        if value is _MISSING:
+            value = fn()
+            self.put(namespace, key, value)
+        return value
+
+    def compute_many(self, inputs_list: Iterable[dict]) -> List[dict]:
+        """`core.compute` for each inputs dict; only inputs not in the cache are evaluated."""
+        inputs_list = list(inputs_list)
+        keys = [inputs_hash(inputs) for inputs in inputs_list]
+        found = self.get_many("compute", list(dict.fromkeys(keys)))
+        new: Dict[str, dict] = {}
+        out = []
+        for key, inputs in zip(keys, inputs_list):
+            r = found.get(key) or new.get(key)
+            if r is None:
+                r = new[key] = compute(inputs)
+            out.append(r)
+        self.put_many("compute", new)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[ResultCache]:
+    """Process-wide cache at ``$URBANISTIKA_CACHE`` (None when the variable is not set)."""
+    global _default
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return None
+    with _default_lock:
+        if _default is None or _default.path != path:
+            _default = ResultCache(path)
+        return _default
@@ -0,0 +1,200 @@
+from typing import List
+
+import numpy as np
+
+from core import compute, compute_batch, compute_economics_batch
+
+# Negotovi vhodi ekonomike (ključ -> oznaka)
+RISK_INPUTS = {
+    "land_price_eur_m2": "Cena zemljišča",
+    "cost_above_eur_m2": "Gradnja nad terenom",
+    "cost_below_eur_m2": "Gradnja pod terenom",
+    "soft_cost_pct": "Soft costs",
+    "sales_price_eur_m2": "Prodajna cena",
+    "net_to_gross": "Neto/bruto",
+}
+
+
+def default_distributions(inputs: dict, spread_pct: dict | float = 10.0) -> dict:
+    """Symmetric triangular distributions around the current inputs.
+
+    `spread_pct` is ± % of the current value, either one number or a dict per key.
+    Each distribution is a tuple: ("triangular", low, mode, high), ("uniform", low, high)
+    or ("normal", mean, sd).
+    """
+    dists = {}
+    for key in RISK_INPUTS:
+        mode = float(inputs[key])
+        s = spread_pct.get(key, 0.0) if isinstance(spread_pct, dict) else float(spread_pct)
+        d = abs(mode) * s / 100.0
+        dists[key] = ("triangular", mode - d, mode, mode + d)
+    # neto/bruto je delež
+    kind, lo, mode, hi = dists["net_to_gross"]
+    dists["net_to_gross"] = (kind, max(0.0, lo), mode, min(1.0, hi))
+    return dists
+
+
+def _draw(dist: tuple, n: int, rng: np.random.Generator) -> np.ndarray:
+    kind = dist[0]
+    if kind == "triangular":
+        lo, mode, hi = dist[1:]
+        if hi <= lo:
+            return np.full(n, float(mode))
+        return rng.triangular(lo, mode, hi, n)
+    if kind == "uniform":
+        lo, hi = dist[1:]
+        return rng.uniform(lo, hi, n)
+    if kind == "normal":
+        mean, sd = dist[1:]
+        return rng.normal(mean, sd, n)
+    raise ValueError(f"Neznana porazdelitev: {kind}")
+
+
+def _quantiles(dist: tuple, q: tuple) -> list:
+    """Quantiles of a distribution (closed form for triangular/uniform, sampled for normal)."""
+    kind = dist[0]
+    if kind == "triangular":
+        lo, mode, hi = dist[1:]
+        if hi <= lo:
+            return [float(mode)] * len(q)
+        fc = (mode - lo) / (hi - lo)
+        out = []
+        for p in q:
+            if p < fc:
+                out.append(lo + np.sqrt(p * (hi - lo) * (mode - lo)))
+            else:
+                out.append(hi - np.sqrt((1 - p) * (hi - lo) * (hi - mode)))
+        return out
+    if kind == "uniform":
+        lo, hi = dist[1:]
+        return [lo + p * (hi - lo) for p in q]
+    samples = _draw(dist, 100_000, np.random.default_rng(0))
+    return list(np.quantile(samples, q))
+
+
+class _MarginModel:
+    """Margin as a function of the risk inputs, everything else fixed.
+
+    Geometry is fixed, so only neto/bruto moves the program: it changes NFA and (in
+    RAČUNSKO mode) the number of units, hence parking and the basement. The basement is
+    evaluated once per distinct unit count, the rest of the economics per draw.
+    """
+
+    def __init__(self, inputs: dict):
+        self.inputs = dict(inputs)
+        self.r = compute(self.inputs)
+        self.recompute_units = self.inputs.get("units_mode", "RAČUNSKO") == "RAČUNSKO"
+
+    def __call__(self, cols: dict) -> dict:
+        r0 = self.r
+        n = len(next(iter(cols.values())))
+        ntg = cols["net_to_gross"]
+        nfa = r0["btp_above"] * np.clip(ntg, 0.0, 1.0)
+
+        if self.recompute_units:
+            units = np.maximum(1, np.floor(nfa / max(10.0, r0["avg_unit_m2"]))).astype(np.int64)
+            if r0["building_footprint"] <= 0:
+                units[:] = 0
+            uniq, inv = np.unique(units, return_inverse=True)
+            rb = compute_batch({"units_mode": "AVTO", "st_stanovanj": uniq}, self.inputs)
+            basement_footprint = rb["basement_footprint"][inv]
+        else:
+            basement_footprint = np.full(n, r0["basement_footprint"])
+
+        r = {
+            "P": r0["P"],
+            "btp_above": r0["btp_above"],
+            "basement_footprint": basement_footprint,
+            "basement_levels": r0["basement_levels"],
+            "nfa": nfa,
+        }
+        return compute_economics_batch(cols, r)
+
+
+# Vzorci se rišejo v blokih z neodvisnimi podzaporedji semena, zato je rezultat enak
+# ne glede na to, ali bloke računa en proces ali več (simulate / simulate_tasks).
+CHUNK = 100_000
+
+
+def _chunks(n: int) -> List[int]:
+    return [min(CHUNK, n - start) for start in range(0, n, CHUNK)]
+
+
+def margin_chunk(inputs: dict, dists: dict, size: int, seed: int | None, index: int, count: int) -> np.ndarray:
+    """Margins of block `index` (of `count`) of a simulation: `size` draws from its own seed stream."""
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(count)[index])
+    model = _MarginModel(inputs)
+    cols = {}
+    for key in RISK_INPUTS:
+        if key in dists:
+            cols[key] = _draw(dists[key], size, rng)
+        else:
+            cols[key] = np.full(size, float(inputs[key]))
+    return model(cols)["margin_abs"]
+
+
+def simulate_tasks(inputs: dict, dists: dict, n: int = 100_000, seed: int | None = 0) -> list:
+    """The simulation as independent (function, args) blocks, e.g. for `jobs.JobManager.submit`."""
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+    sizes = _chunks(int(n))
+    return [(margin_chunk, (dict(inputs), dists, size, seed, i, len(sizes))) for i, size in enumerate(sizes)]
+
+
+def summarize(inputs: dict, dists: dict, margin: np.ndarray, seed: int | None = 0) -> dict:
+    """Statistics of simulated margins (see `simulate`); `margin` may be a part of the blocks."""
+    model = _MarginModel(inputs)
+    p5, p50, p95 = np.percentile(margin, [5, 50, 95])
+    counts, edges = np.histogram(margin, bins=80)
+
+    # Tornado: vsak vhod posebej na P5 / P95, ostali na trenutni vrednosti
+    keys = [k for k in RISK_INPUTS if k in dists]
+    t_cols = {k: np.full(2 * len(keys), float(inputs[k])) for k in RISK_INPUTS}
+    lows, highs = [], []
+    for i, key in enumerate(keys):
+        lo, hi = _quantiles(dists[key], (0.05, 0.95))
+        t_cols[key][2 * i] = lo
+        t_cols[key][2 * i + 1] = hi
+        lows.append(lo)
+        highs.append(hi)
+    t_margin = model(t_cols)["margin_abs"] if keys else np.zeros(0)
+
+    base_margin = float(model.r["econ"]["margin_abs"])
+    tornado = []
+    for i, key in enumerate(keys):
+        m_lo, m_hi = float(t_margin[2 * i]), float(t_margin[2 * i + 1])
+        tornado.append({
+            "key": key,
+            "label": RISK_INPUTS[key],
+            "low_value": float(lows[i]),
+            "high_value": float(highs[i]),
+            "margin_low": m_lo,
+            "margin_high": m_hi,
+            "swing": abs(m_hi - m_lo),
+        })
+    tornado.sort(key=lambda t: t["swing"], reverse=True)
+
+    return {
+        "n": int(margin.size),
+        "seed": seed,
+        "base_margin": base_margin,
+        "mean": float(margin.mean()),
+        "p5": float(p5),
+        "p50": float(p50),
+        "p95": float(p95),
+        "prob_loss": float((margin < 0).mean()),
+        "hist_counts": counts,
+        "hist_edges": edges,
+        "tornado": tornado,
+    }
+
+
+def simulate(inputs: dict, dists: dict, n: int = 100_000, seed: int | None = 0) -> dict:
+    """Monte Carlo simulation of the project economics.
+
+    Draws `n` samples of the inputs in `dists` (see `default_distributions`); inputs not
+    listed stay at their current value. Returns margin percentiles, probability of loss,
+    a histogram and one-at-a-time (tornado) swings between each input's P5 and P95.
+    """
+    margin = np.concatenate([fn(*args) for fn, args in simulate_tasks(inputs, dists, n, seed)])
+    return summarize(inputs, dists, margin, seed)
@@ -0,0 +1,71 @@
+from typing import Dict, List
+
+from core import SCENARIOS
+from dataflow import Evaluator
+from geometry import GEOMETRY_KEYS, apply_layout
+
+# Vhodi, ki jih lahko varianta spremeni glede na osnovni projekt (ključ -> oznaka)
+SLOT_INPUTS = {
+    "scenario": "Klet",
+    "parcela_m2": "Parcela [m²]",
+    "stevilo_lamel": "Št. lamel",
+    "dolzina_lamele_m": "Dolžina lamele [m]",
+    "sirina_lamele_m": "Širina lamele [m]",
+    "st_etas_nadz": "Etaže nad terenom",
+    "net_to_gross": "Neto/bruto",
+    "cost_above_eur_m2": "Gradnja nad terenom [€/m²]",
+    "sales_price_eur_m2": "Prodajna cena [€/m²]",
+}
+
+INT_SLOT_INPUTS = ("stevilo_lamel", "st_etas_nadz")
+
+BASE_NAME = "Osnova"
+
+
+def slot_inputs(base: dict, overrides: dict) -> dict:
+    """Inputs of a slot: the base project with the slot's overrides applied (base is not modified).
+
+    Overrides of the building or parcel geometry re-pack the layout (``geometry.apply_layout``).
+    A parcel area override replaces the base polygon with a rectangle of that area.
+    """
+    inputs = dict(base)
+    inputs.update(overrides)
+    if "parcela_m2" in overrides and "parcel_polygon" not in overrides:
+        inputs["parcel_polygon"] = []
+    if any(key in GEOMETRY_KEYS for key in overrides):
+        apply_layout(inputs)
+    return inputs
+
+
+def basement_slots() -> List[dict]:
+    """One slot per basement scenario (K-1, K-1 + teren, K-2)."""
+    return [{"name": s, "overrides": {"scenario": s}} for s in SCENARIOS]
+
+
+class SlotResults:
+    """Per-slot memo of `compute` results.
+
+    Every slot keeps its own `dataflow.Evaluator`, so a change of the base or of the
+    slot's overrides recomputes only the nodes downstream of the keys that actually
+    changed for that slot; slots that override a changed base key are not touched.
+    """
+
+    def __init__(self):
+        self._evaluators: Dict[str, Evaluator] = {}
+        self.last_computed = 0
+
+    def results(self, base: dict, slots: List[dict]) -> Dict[str, dict]:
+        evaluators: Dict[str, Evaluator] = {}
+        out: Dict[str, dict] = {}
+        computed = 0
+        for slot in slots:
+            name = slot["name"]
+            ev = self._evaluators.get(name) or Evaluator()
+            out[name] = ev.update(slot_inputs(base, slot["overrides"]))
+            if ev.last_recomputed:
+                computed += 1
+            evaluators[name] = ev
+
+        self._evaluators = evaluators
+        self.last_computed = computed
+        return out
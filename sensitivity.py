@@ -0,0 +1,73 @@
+import numpy as np
+
+from core import compute_batch
+
+# Spremenljivke za osi (ključ -> (oznaka, celoštevilska))
+AXES = {
+    "st_etas_nadz": ("Etaže nad terenom", True),
+    "stevilo_lamel": ("Št. lamel", True),
+    "dolzina_lamele_m": ("Dolžina lamele [m]", False),
+    "sirina_lamele_m": ("Širina lamele [m]", False),
+    "parcela_m2": ("Parcela [m²]", False),
+    "net_to_gross": ("Neto/bruto", False),
+    "pm_na_stanovanje": ("PM / stanovanje", False),
+    "sales_price_eur_m2": ("Prodajna cena [€/m²]", False),
+    "cost_above_eur_m2": ("Gradnja nad terenom [€/m²]", False),
+    "cost_below_eur_m2": ("Gradnja pod terenom [€/m²]", False),
+    "land_price_eur_m2": ("Cena zemljišča [€/m²]", False),
+    "soft_cost_pct": ("Soft costs [%]", False),
+}
+
+# Osi, pri katerih tloris sledi lamelam (tloris iz geometrije se ne upošteva)
+_LAMELLA_AXES = ("stevilo_lamel", "dolzina_lamele_m", "sirina_lamele_m")
+
+# Prikazane količine (ključ -> (oznaka, funkcija rezultata batch -> polje))
+METRICS = {
+    "margin_abs": ("Margin [€]", lambda r: r["econ"]["margin_abs"]),
+    "margin_pct": ("Margin [%]", lambda r: r["econ"]["margin_pct"] * 100.0),
+    "fi_reserve_btp": ("Rezerva FI [m² BTP]", lambda r: r["fi_reserve_btp"]),
+    "fzp": ("FZP [%]", lambda r: r["fzp"] * 100.0),
+    "units": ("Št. stanovanj", lambda r: r["units"]),
+}
+
+CONSTRAINTS = ("fi_ok", "fz_ok", "fzp_ok")
+
+
+def default_range(inputs: dict, key: str, n: int = 200) -> np.ndarray:
+    """Axis values around the current value: ±50 % (integers: every value in that span)."""
+    v = float(inputs[key])
+    _, is_int = AXES[key]
+    if is_int:
+        lo = max(1, int(np.floor(v * 0.5)))
+        hi = max(lo + 1, int(np.ceil(v * 1.5)))
+        return np.arange(lo, hi + 1, dtype=np.float64)
+    if key == "net_to_gross":
+        return np.linspace(max(0.5, v - 0.15), min(0.95, v + 0.15), n)
+    return np.linspace(v * 0.5, v * 1.5, n)
+
+
+def grid(inputs: dict, x_key: str, x_values, y_key: str, y_values) -> dict:
+    """Evaluate every (x, y) pair of two inputs in one `compute_batch` call.
+
+    All other inputs stay at their current values. Returns the axes, one (ny, nx) array
+    per metric in `METRICS` and per constraint in `CONSTRAINTS`.
+    """
+    if x_key == y_key:
+        raise ValueError("Osi morata biti različni spremenljivki.")
+
+    x = np.asarray(x_values, dtype=np.float64)
+    y = np.asarray(y_values, dtype=np.float64)
+    X, Y = np.meshgrid(x, y)
+
+    cols = {x_key: X.ravel(), y_key: Y.ravel()}
+    if x_key in _LAMELLA_AXES or y_key in _LAMELLA_AXES:
+        cols["footprint_m2"] = None
+    r = compute_batch(cols, inputs)
+
+    shape = (len(y), len(x))
+    out = {"x": x, "y": y}
+    for key, (_, get) in METRICS.items():
+        out[key] = np.broadcast_to(np.asarray(get(r), dtype=np.float64), (x.size * y.size,)).reshape(shape)
+    for key in CONSTRAINTS:
+        out[key] = np.broadcast_to(np.asarray(r[key], dtype=bool), (x.size * y.size,)).reshape(shape)
+    return out
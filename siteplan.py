@@ -0,0 +1,266 @@
+"""Multi-parcel site model: N cadastral parcels with their own limits and a shared basement.
+
+Every parcel has its own area, OPN zone and limits (FI, FZ, FZP minimum) and the
+buildings assigned to it (lamellas × length × width, floors). The footprint of each
+parcel is ``core.building_footprint`` after ``geometry.apply_layout`` with the layout
+rules of the project (the project parcel polygon applies to a parcel of the project
+area, other parcels are rectangles of the project aspect). The residential program
+is evaluated per parcel as in ``core.compute`` (RAČUNSKO mode: units from the NFA and
+the average unit size of the project typologies). Parking is planned for the whole
+site and sits in one shared basement (scenario, garage and parking norms from the
+project inputs); its footprint and the surface parking are split between the parcels
+by the ``klet_delez`` weight of each parcel (empty: in proportion to the building
+footprint).
+
+``evaluate_site`` checks FI, FZ and FZP per parcel and in aggregate (area-weighted
+limits) and returns the economics per parcel and for the site. All per-parcel
+quantities are NumPy arrays; the layouts are memoized by ``geometry``. With a single
+parcel the site equals ``core.compute`` of the project.
+"""
+from typing import Dict, List, Mapping
+
+import numpy as np
+
+from core import basement_level_area, building_footprint, compute_avg_unit_size_m2, compute_economics_batch
+from geometry import apply_layout, uses_geometry
+
+# Stolpci tabele parcel (ključ -> oznaka); vhodi projekta dajo privzete vrednosti
+PARCEL_COLUMNS = {
+    "name": "Parcela",
+    "zone": "Namenska raba (OPN)",
+    "parcela_m2": "Površina [m²]",
+    "fi": "FI",
+    "fz": "FZ",
+    "fzp_min_pct": "FZP min [%]",
+    "stevilo_lamel": "Št. lamel",
+    "dolzina_lamele_m": "Dolžina lamele [m]",
+    "sirina_lamele_m": "Širina lamele [m]",
+    "st_etas_nadz": "Etaže nad terenom",
+    "klet_delez": "Delež kleti (utež)",
+}
+
+TEXT_COLUMNS = ("name", "zone")
+INT_COLUMNS = ("stevilo_lamel", "st_etas_nadz")
+NUMBER_COLUMNS = tuple(k for k in PARCEL_COLUMNS if k not in TEXT_COLUMNS and k != "klet_delez")
+
+
+def default_parcels(inputs: dict) -> List[dict]:
+    """One parcel with the limits and buildings of the current project."""
+    parcel = {key: inputs[key] for key in NUMBER_COLUMNS}
+    parcel.update({"name": "Parcela 1", "zone": "", "klet_delez": None})
+    return [parcel]
+
+
+def _as_columns(parcels):
+    """Columns of a parcel table given as a list of dicts or a mapping of columns (DataFrame)."""
+    if isinstance(parcels, Mapping) or hasattr(parcels, "columns"):
+        return parcels
+    return {key: [p.get(key) for p in parcels] for key in PARCEL_COLUMNS}
+
+
+def _column(table, key: str, n: int, default: float = np.nan) -> np.ndarray:
+    if key not in table:
+        return np.full(n, default)
+    col = np.array([np.nan if v is None or v == "" else v for v in table[key]], dtype=np.float64)
+    return np.where(np.isnan(col), default, col)
+
+
+def parcel_columns(parcels, inputs: dict) -> Dict[str, np.ndarray]:
+    """Numeric parcel columns as float arrays; missing / empty cells take the project value.
+
+    `parcels` is a list of dicts or a mapping of columns (e.g. a DataFrame).
+    """
+    table = _as_columns(parcels)
+    n = len(table["parcela_m2"])
+    cols = {key: _column(table, key, n, float(inputs[key])) for key in NUMBER_COLUMNS}
+    for key in INT_COLUMNS:
+        cols[key] = np.trunc(cols[key])
+    cols["klet_delez"] = _column(table, "klet_delez", n)
+    return cols
+
+
+def parcel_footprints(c: Dict[str, np.ndarray], inputs: dict) -> np.ndarray:
+    """Building footprint of every parcel (`core.building_footprint` after `geometry.apply_layout`).
+
+    Parcels with the same layout arguments are laid out once.
+    """
+    area = c["parcela_m2"]
+    if not uses_geometry(inputs):
+        return c["stevilo_lamel"] * c["dolzina_lamele_m"] * c["sirina_lamele_m"]
+
+    project_m2 = float(inputs["parcela_m2"])
+    footprints: Dict[tuple, float] = {}
+    out = np.empty(area.size)
+    for i in range(area.size):
+        # poligon projekta velja le za parcelo s površino projekta
+        own_polygon = abs(area[i] - project_m2) <= 1e-6
+        args = (float(area[i]), int(c["stevilo_lamel"][i]), float(c["dolzina_lamele_m"][i]),
+                float(c["sirina_lamele_m"][i]), own_polygon)
+        fp = footprints.get(args)
+        if fp is None:
+            x = dict(inputs, parcela_m2=args[0], stevilo_lamel=args[1], dolzina_lamele_m=args[2],
+                     sirina_lamele_m=args[3])
+            if not own_polygon:
+                x["parcel_polygon"] = []
+            fp = footprints[args] = building_footprint(apply_layout(x))
+        out[i] = fp
+    return out
+
+
+def _status(fi_ok, fz_ok, fzp_ok, ok_text):
+    return np.select([~fi_ok, ~fz_ok, ~fzp_ok], ["NESKLADNO (FI)", "NESKLADNO (FZ)", "NESKLADNO (FZP)"],
+                     default=ok_text)
+
+
+def evaluate_site(parcels, inputs: dict) -> dict:
+    """Evaluate the site: ``{"parcel": arrays per parcel, "site": aggregate values}``.
+
+    Both levels have the FI / FZ / FZP checks (``*_ok``) and an ``econ`` dict (same fields
+    as ``core.compute``). ``site["parcels_ok"]`` is True when every parcel complies.
+    """
+    table = _as_columns(parcels)
+    c = parcel_columns(table, inputs)
+    area = c["parcela_m2"]
+    n = area.size
+
+    # Program po parcelah (kot core.compute v načinu RAČUNSKO)
+    footprint = parcel_footprints(c, inputs)
+    floors = c["st_etas_nadz"].astype(np.int64)
+    btp_above = footprint * floors
+    nfa = btp_above * min(max(float(inputs["net_to_gross"]), 0.0), 1.0)
+    avg_unit_m2 = compute_avg_unit_size_m2(inputs)
+    units = np.where(
+        footprint > 0, np.maximum(1, np.floor(nfa / max(10.0, avg_unit_m2))), 0
+    ).astype(np.int64)
+
+    fi_allowed = c["fi"] * area
+    fz_max = c["fz"] * area
+    fi_ok = btp_above <= fi_allowed + 1e-9
+    fz_ok = footprint <= fz_max + 1e-9
+    with np.errstate(divide="ignore", invalid="ignore"):
+        FI = np.where(area != 0, btp_above / area, 0.0)
+
+    # Skupna klet za celotno območje
+    P = float(area.sum())
+    units_total = int(units.sum())
+    pm_total = int(np.ceil(units_total * float(inputs["pm_na_stanovanje"])))
+    pm_visitors = int(np.ceil(pm_total * float(inputs["visitor_share"])))
+    pm_residents = pm_total - pm_visitors
+
+    scenario = str(inputs["scenario"])
+    if scenario == "K-1":
+        basement_levels, pm_in_basement, pm_on_surface = 1, pm_total, 0
+    elif scenario == "K-1 + teren":
+        basement_levels, pm_in_basement, pm_on_surface = 1, pm_residents, pm_visitors
+    else:
+        basement_levels, pm_in_basement, pm_on_surface = 2, pm_total, 0
+
+    basement_total = min(basement_level_area(inputs, pm_in_basement, basement_levels), P)
+    surface_total = pm_on_surface * float(inputs["area_per_pm_surface_m2"]) * float(inputs["surface_mult"])
+
+    # razdelitev kleti in parkiranja na terenu po utežeh parcel
+    weight = np.where(np.isnan(c["klet_delez"]), footprint, np.maximum(c["klet_delez"], 0.0))
+    if weight.sum() <= 0:
+        weight = area.copy()
+    share = weight / weight.sum() if weight.sum() > 0 else np.full(n, 1.0 / max(n, 1))
+    basement = basement_total * share
+    surface = surface_total * share
+
+    growing = np.maximum(0.0, area - basement - surface)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fzp = np.where(area != 0, growing / area, 0.0)
+    fzp_min = c["fzp_min_pct"] / 100.0
+    fzp_ok = fzp >= fzp_min - 1e-9
+
+    econ_cols = {k: float(inputs[k]) for k in (
+        "soft_cost_pct", "land_price_eur_m2", "cost_above_eur_m2", "cost_below_eur_m2", "sales_price_eur_m2")}
+    parcel_econ = compute_economics_batch(econ_cols, {
+        "P": area, "btp_above": btp_above, "nfa": nfa,
+        "basement_footprint": basement, "basement_levels": basement_levels,
+    })
+
+    parcel = {
+        "name": [str(v or "") for v in table["name"]] if "name" in table else [""] * n,
+        "zone": [str(v or "") for v in table["zone"]] if "zone" in table else [""] * n,
+        "P": area,
+        "building_footprint": footprint,
+        "btp_above": btp_above,
+        "nfa": nfa,
+        "units": units,
+        "FI": FI,
+        "FI_limit": c["fi"],
+        "fi_allowed_btp": fi_allowed,
+        "fi_reserve_btp": fi_allowed - btp_above,
+        "fi_ok": fi_ok,
+        "fz_max_footprint": fz_max,
+        "fz_ok": fz_ok,
+        "basement_footprint": basement,
+        "surface_parking_area": surface,
+        "growing_area": growing,
+        "fzp": fzp,
+        "FZP_min": fzp_min,
+        "fzp_ok": fzp_ok,
+        "status": _status(fi_ok, fz_ok, fzp_ok, "SKLADNO"),
+        "econ": parcel_econ,
+    }
+
+    # Seštevki (meje utežene s površino parcel)
+    btp_total = float(btp_above.sum())
+    footprint_total = float(footprint.sum())
+    growing_total = float(growing.sum())
+    fi_allowed_total = float(fi_allowed.sum())
+    fz_max_total = float(fz_max.sum())
+    FZP_min_site = float((fzp_min * area).sum() / P) if P else 0.0
+    fzp_site = growing_total / P if P else 0.0
+
+    site_fi_ok = btp_total <= fi_allowed_total + 1e-9
+    site_fz_ok = footprint_total <= fz_max_total + 1e-9
+    site_fzp_ok = fzp_site >= FZP_min_site - 1e-9
+    exceeds = basement_total > footprint_total + 1e-9
+
+    # status kot v core.compute (kletni scenarij, ko so omejitve izpolnjene)
+    if scenario == "K-2":
+        ok_text = "OPTIMALNO"
+    elif scenario == "K-1 + teren":
+        ok_text = "MEJNO / KOMPROMIS"
+    else:
+        ok_text = "TVEGANO (FZP postane omejitev)" if exceeds else "POGOJNO (lahko OK)"
+
+    site_econ = compute_economics_batch(econ_cols, {
+        "P": np.array([P]), "btp_above": np.array([btp_total]), "nfa": np.array([float(nfa.sum())]),
+        "basement_footprint": np.array([basement_total]), "basement_levels": np.array([basement_levels]),
+    })
+
+    site = {
+        "n_parcels": n,
+        "P": P,
+        "building_footprint": footprint_total,
+        "btp_above": btp_total,
+        "nfa": float(nfa.sum()),
+        "units": units_total,
+        "FI": btp_total / P if P else 0.0,
+        "fi_allowed_btp": fi_allowed_total,
+        "fi_reserve_btp": fi_allowed_total - btp_total,
+        "fi_ok": site_fi_ok,
+        "fz_max_footprint": fz_max_total,
+        "fz_ok": site_fz_ok,
+        "pm_total": pm_total,
+        "pm_residents": pm_residents,
+        "pm_visitors": pm_visitors,
+        "scenario": scenario,
+        "basement_levels": basement_levels,
+        "pm_in_basement": pm_in_basement,
+        "pm_on_surface": pm_on_surface,
+        "basement_footprint": basement_total,
+        "surface_parking_area": surface_total,
+        "growing_area": growing_total,
+        "fzp": fzp_site,
+        "FZP_min": FZP_min_site,
+        "fzp_ok": site_fzp_ok,
+        "basement_exceeds_building": exceeds,
+        "parcels_ok": bool((fi_ok & fz_ok & fzp_ok).all()),
+        "status": "NESKLADNO (ni stavb)" if footprint_total <= 0 else
+                  str(_status(np.array(site_fi_ok), np.array(site_fz_ok), np.array(site_fzp_ok), ok_text)),
+        "econ": {k: float(np.asarray(v).ravel()[0]) for k, v in site_econ.items()},
+    }
+    return {"parcel": parcel, "site": site}
@@ -1,6 +1,119 @@
+import numpy as np
 import streamlit as st
-from core import compute
-from ui_dashboard import render_dashboard, eur_fmt, eur_m2_fmt, area_fmt
+from core import inputs_hash
+from risk import RISK_INPUTS, default_distributions, simulate_tasks, summarize
+from ui_cache import get_results, inputs_key
+from ui_jobs import render_job, submit
+from ui_dashboard import eur_fmt, eur_m2_fmt, area_fmt, pct_fmt
+
+# privzeti razpon negotovosti (± % trenutne vrednosti)
+_DEFAULT_SPREAD = {
+    "land_price_eur_m2": 10.0,
+    "cost_above_eur_m2": 10.0,
+    "cost_below_eur_m2": 15.0,
+    "soft_cost_pct": 20.0,
+    "sales_price_eur_m2": 10.0,
+    "net_to_gross": 3.0,
+}
+
+
+def _render_risk(inputs: dict):
+    with st.expander("Analiza tveganja (Monte Carlo)", expanded=False):
+        st.caption(
+            "Vhodi se vzorčijo iz trikotnih porazdelitev okoli trenutnih vrednosti (± razpon). "
+            "Ostali podatki projekta ostanejo nespremenjeni. Simulacija teče v ozadju; med izračunom "
+            "lahko aplikacijo uporabljaš naprej."
+        )
+        spread = {}
+        cols = st.columns(3)
+        for i, (key, label) in enumerate(RISK_INPUTS.items()):
+            with cols[i % 3]:
+                spread[key] = st.number_input(
+                    f"{label} (± %)", 0.0, 100.0, _DEFAULT_SPREAD[key], 1.0, key=f"mc_spread_{key}"
+                )
+
+        c1, c2 = st.columns(2)
+        with c1:
+            n = st.selectbox("Število simulacij", [10_000, 100_000, 1_000_000], index=1,
+                             format_func=lambda v: f"{v:,}".replace(",", " "))
+        with c2:
+            seed = st.number_input("Seme (seed)", min_value=0, step=1, value=42)
+
+        key = inputs_hash({"inputs": inputs_key(inputs), "spread": spread, "n": n, "seed": seed})
+        if st.button("Zaženi simulacijo"):
+            dists = default_distributions(inputs, spread)
+            base = dict(inputs)
+            submit(
+                key,
+                "Monte Carlo",
+                simulate_tasks(base, dists, int(n), int(seed)),
+                lambda blocks: summarize(base, dists, np.concatenate(blocks), int(seed)),
+            )
+        render_job(key, _render_mc_result)
+
+
+def _render_mc_result(res: dict, final: bool):
+    import plotly.graph_objects as go
+
+    a, b, c, d = st.columns(4)
+    a.metric("Margin P5", eur_fmt(res["p5"]))
+    b.metric("Margin P50", eur_fmt(res["p50"]))
+    c.metric("Margin P95", eur_fmt(res["p95"]))
+    d.metric("Verjetnost izgube", pct_fmt(res["prob_loss"] * 100))
+
+    edges = res["hist_edges"]
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(
+        x=centers,
+        y=res["hist_counts"],
+        width=edges[1] - edges[0],
+        marker_color=["#d62728" if x < 0 else "#2ca02c" for x in centers],
+    ))
+    for q, name in (("p5", "P5"), ("p50", "P50"), ("p95", "P95")):
+        fig.add_vline(x=res[q], line_dash="dot", annotation_text=name)
+    fig.update_layout(
+        title="Porazdelitev rezultata (margin)",
+        xaxis_title="Margin (€)",
+        yaxis_title="Št. simulacij",
+        height=360,
+        margin=dict(l=10, r=10, t=40, b=10),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Tornado: največji vpliv na vrhu
+    tornado = list(reversed(res["tornado"]))
+    base = res["base_margin"]
+    labels = [t["label"] for t in tornado]
+    fig_t = go.Figure()
+    fig_t.add_trace(go.Bar(
+        y=labels,
+        x=[t["margin_low"] - base for t in tornado],
+        base=base,
+        orientation="h",
+        name="P5 vhoda",
+        marker_color="#1f77b4",
+    ))
+    fig_t.add_trace(go.Bar(
+        y=labels,
+        x=[t["margin_high"] - base for t in tornado],
+        base=base,
+        orientation="h",
+        name="P95 vhoda",
+        marker_color="#ff7f0e",
+    ))
+    fig_t.update_layout(
+        title="Občutljivost rezultata (tornado)",
+        barmode="overlay",
+        xaxis_title="Margin (€)",
+        height=320,
+        margin=dict(l=10, r=10, t=40, b=10),
+    )
+    st.plotly_chart(fig_t, use_container_width=True)
+    st.caption(
+        f"Simulacij: {res['n']:,}".replace(",", " ") + f", seme: {res['seed']}."
+        + ("" if final else " Delni rezultat, izračun še teče.")
+    )
+
 
 def render_tab(inputs: dict):
     st.subheader("Ekonomika")
@@ -17,8 +130,7 @@ def render_tab(inputs: dict):
 
     inputs["sales_price_eur_m2"] = st.number_input("Prodajna cena (€/m² NFA)", 0.0, step=50.0, value=float(inputs["sales_price_eur_m2"]))
 
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
+    r = get_results(inputs)
 
     econ = r["econ"]
     st.markdown("#### Razčlenitev investicije")
@@ -41,4 +153,6 @@ def render_tab(inputs: dict):
     j.metric("Margin", eur_fmt(econ["margin_abs"]))
     k.metric("Margin %", f"{econ['margin_pct']*100:.1f} %")
 
+    _render_risk(inputs)
+
     return inputs
@@ -1,6 +1,4 @@
 import streamlit as st
-from core import compute
-from ui_dashboard import render_dashboard
 
 def render_tab(inputs: dict):
     st.subheader("Faktorji")
@@ -13,6 +11,4 @@ def render_tab(inputs: dict):
         inputs["fzp_min_pct"] = st.number_input("Minimalni FZP (%)", min_value=0, max_value=100, step=1, value=int(inputs["fzp_min_pct"]))
 
     st.caption("FZ omeji projekcijo stavb. FZP postane omejitev, ko se klet razširi izven tlorisa stavb.")
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
     return inputs
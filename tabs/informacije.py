@@ -1,6 +1,4 @@
 import streamlit as st
-from core import compute
-from ui_dashboard import render_dashboard
 
 def render_tab(inputs: dict):
     st.subheader("Informacije o projektu")
@@ -14,6 +12,4 @@ def render_tab(inputs: dict):
         inputs["parcel_no"] = st.text_input("Parcelna številka", value=str(inputs.get("parcel_no", "")))
 
     st.caption("Ti podatki se uporabijo v PDF izpisu.")
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
     return inputs
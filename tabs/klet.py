@@ -1,6 +1,8 @@
 import streamlit as st
-from core import compute
-from ui_dashboard import render_dashboard
+
+import garage
+from ui_cache import get_results
+from ui_dashboard import area_fmt
 
 def render_tab(inputs: dict):
     st.subheader("Klet / parkiranje")
@@ -20,27 +22,59 @@ def render_tab(inputs: dict):
         else:
             st.caption(f"Računski izračun predlaga {inputs['st_stanovanj']} stanovanj.")
     with c2:
-        inputs["pm_na_stanovanje"] = st.number_input("PM na stanovanje", min_value=0.5, step=0.1, value=float(inputs["pm_na_stanovanje"]))
+        pm = float(inputs["pm_na_stanovanje"])
+        inputs["pm_na_stanovanje"] = st.number_input("PM na stanovanje", min_value=min(0.5, pm), step=0.1, value=pm)
     with c3:
         inputs["visitor_share"] = st.slider("Delež obiskovalcev v skupnih PM", 0.0, 0.6, float(inputs["visitor_share"]), 0.01)
 
     st.markdown("#### Realistične nastavitve garaže")
+    inputs["garage_layout"] = st.checkbox(
+        "Tloris garaže (vozne poti, PM pod 90°, rampa) namesto izkoristka",
+        value=bool(inputs["garage_layout"]),
+        help="Klet se dimenzionira kot najmanjši pravokotnik, v katerega gredo vsa PM v kleti.",
+    )
+    laid_out = inputs["garage_layout"]
+
+    if laid_out:
+        g1, g2, g3, g4 = st.columns(4)
+        with g1:
+            inputs["stall_w_m"] = st.number_input("Širina PM (m)", 2.2, 3.5, float(inputs["stall_w_m"]), 0.05)
+        with g2:
+            inputs["stall_d_m"] = st.number_input("Globina PM (m)", 4.5, 6.0, float(inputs["stall_d_m"]), 0.1)
+        with g3:
+            inputs["aisle_w_m"] = st.number_input("Širina vozne poti (m)", 5.0, 8.0, float(inputs["aisle_w_m"]), 0.1)
+        with g4:
+            inputs["ramp_len_m"] = st.number_input("Dolžina rampe (m)", 5.0, 60.0, float(inputs["ramp_len_m"]), 1.0)
+
     c4, c5, c6 = st.columns(3)
     with c4:
-        inputs["garage_eff_k1"] = st.number_input("Izkoristek garaže K-1 (0–1)", 0.40, 0.95, float(inputs["garage_eff_k1"]), 0.01)
+        inputs["garage_eff_k1"] = st.number_input("Izkoristek garaže K-1 (0–1)", 0.40, 0.95, float(inputs["garage_eff_k1"]), 0.01, disabled=laid_out)
     with c5:
-        inputs["garage_eff_k2"] = st.number_input("Izkoristek garaže K-2 (0–1)", 0.40, 0.95, float(inputs["garage_eff_k2"]), 0.01)
+        inputs["garage_eff_k2"] = st.number_input("Izkoristek garaže K-2 (0–1)", 0.40, 0.95, float(inputs["garage_eff_k2"]), 0.01, disabled=laid_out)
     with c6:
-        inputs["ramp_footprint_m2"] = st.number_input("Dodatek (rampa/tehnika) odtis (m²)", 0.0, 800.0, float(inputs["ramp_footprint_m2"]), 10.0)
+        inputs["ramp_footprint_m2"] = st.number_input("Dodatek (rampa/tehnika) odtis (m²)", 0.0, 800.0, float(inputs["ramp_footprint_m2"]), 10.0, disabled=laid_out)
 
     c7, c8, c9 = st.columns(3)
     with c7:
-        inputs["area_per_pm_garage_m2"] = st.number_input("m² na PM v kleti (bruto)", 18.0, 40.0, float(inputs["area_per_pm_garage_m2"]), 1.0)
+        inputs["area_per_pm_garage_m2"] = st.number_input("m² na PM v kleti (bruto)", 18.0, 40.0, float(inputs["area_per_pm_garage_m2"]), 1.0, disabled=laid_out)
     with c8:
         inputs["area_per_pm_surface_m2"] = st.number_input("m² na PM na terenu", 15.0, 40.0, float(inputs["area_per_pm_surface_m2"]), 1.0)
     with c9:
         inputs["surface_mult"] = st.number_input("Faktor manipulacije terena (1.0–1.5)", 1.0, 1.5, float(inputs["surface_mult"]), 0.05)
 
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
+    if laid_out:
+        r = get_results(inputs)
+        g = garage.size(r["pm_in_basement"], r["basement_levels"], float(inputs["stall_w_m"]),
+                        float(inputs["stall_d_m"]), float(inputs["aisle_w_m"]), float(inputs["ramp_len_m"]))
+        if g.stalls:
+            st.caption(
+                f"Garaža {g.length:.1f} × {g.depth:.1f} m ({area_fmt(g.footprint_m2)} na etažo, {g.levels} et.): "
+                f"{g.double_modules} dvostranskih in {g.single_modules} enostranskih modulov, "
+                f"{g.stalls_per_row} PM v vrsti, rampa zasede {g.ramp_stalls} PM na etažo. "
+                f"Skupaj {g.stalls} PM za {r['pm_in_basement']} potrebnih "
+                f"({g.area_per_stall_m2:.1f} m² na PM)."
+            )
+        else:
+            st.caption("V kleti ni parkirnih mest.")
+
     return inputs
@@ -0,0 +1,119 @@
+import numpy as np
+import streamlit as st
+
+from core import inputs_hash
+from sensitivity import AXES, CONSTRAINTS, METRICS, default_range
+from ui_cache import inputs_key, sensitivity_grid
+
+# Obrisi skladnosti (omejitev -> (oznaka, barva))
+_CONTOURS = {
+    "fi_ok": ("meja FI", "#1f77b4"),
+    "fz_ok": ("meja FZ", "#9467bd"),
+    "fzp_ok": ("meja FZP", "#111111"),
+}
+
+
+def _axis_inputs(inputs: dict, label: str, key: str, n: int):
+    """Range inputs for one axis; returns the axis values."""
+    default = default_range(inputs, key, n)
+    _, is_int = AXES[key]
+    c1, c2 = st.columns(2)
+    if is_int:
+        lo = c1.number_input(f"{label}: od", min_value=1, step=1, value=int(default[0]), key=f"sens_{key}_lo")
+        hi = c2.number_input(f"{label}: do", min_value=1, step=1, value=int(default[-1]), key=f"sens_{key}_hi")
+        lo, hi = min(lo, hi), max(lo, hi)
+        return np.arange(lo, hi + 1, dtype=np.float64)
+    lo = c1.number_input(f"{label}: od", value=float(default[0]), key=f"sens_{key}_lo")
+    hi = c2.number_input(f"{label}: do", value=float(default[-1]), key=f"sens_{key}_hi")
+    return np.linspace(min(lo, hi), max(lo, hi), n)
+
+
+def render_tab(inputs: dict):
+    import plotly.graph_objects as go
+
+    st.subheader("Občutljivost")
+    st.caption(
+        "Dva vhoda se spreminjata po mreži, vsi ostali ostanejo na trenutnih vrednostih. "
+        "Vse točke mreže se izračunajo v enem vektoriziranem prehodu."
+    )
+
+    keys = list(AXES)
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        x_key = st.selectbox("Os X", keys, index=keys.index("st_etas_nadz"),
+                             format_func=lambda k: AXES[k][0], key="sens_x")
+    with c2:
+        y_choices = [k for k in keys if k != x_key]
+        y_default = "stevilo_lamel" if "stevilo_lamel" in y_choices else y_choices[0]
+        y_key = st.selectbox("Os Y", y_choices, index=y_choices.index(y_default),
+                             format_func=lambda k: AXES[k][0], key="sens_y")
+    with c3:
+        metric = st.selectbox("Prikaz", list(METRICS), format_func=lambda k: METRICS[k][0], key="sens_metric")
+
+    n = st.slider("Ločljivost mreže (točk na os)", 20, 300, 200, 10, key="sens_n")
+
+    x_vals = _axis_inputs(inputs, AXES[x_key][0], x_key, n)
+    y_vals = _axis_inputs(inputs, AXES[y_key][0], y_key, n)
+
+    key = inputs_hash({"inputs": inputs_key(inputs), "x": [x_key, x_vals.tolist()], "y": [y_key, y_vals.tolist()]})
+    cached = st.session_state.get("_sens_grid")
+    if not cached or cached[0] != key:
+        cached = (key, sensitivity_grid(key, inputs, x_key, x_vals, y_key, y_vals))
+        st.session_state["_sens_grid"] = cached
+    g = cached[1]
+
+    z = g[metric]
+    diverging = metric in ("margin_abs", "margin_pct", "fi_reserve_btp")
+    fig = go.Figure(go.Heatmap(
+        x=g["x"],
+        y=g["y"],
+        z=z,
+        colorscale="RdYlGn" if diverging else "Viridis",
+        zmid=0.0 if diverging else None,
+        colorbar=dict(title=METRICS[metric][0]),
+        hovertemplate=f"{AXES[x_key][0]}: %{{x}}<br>{AXES[y_key][0]}: %{{y}}<br>"
+                      f"{METRICS[metric][0]}: %{{z:,.1f}}<extra></extra>",
+    ))
+
+    # meje skladnosti: obris pri 0.5 na polju 0/1
+    for c in CONSTRAINTS:
+        ok = g[c]
+        if ok.all() or not ok.any():
+            continue
+        label, color = _CONTOURS[c]
+        fig.add_trace(go.Contour(
+            x=g["x"],
+            y=g["y"],
+            z=ok.astype(np.float64),
+            contours=dict(start=0.5, end=0.5, size=1.0, coloring="none"),
+            line=dict(color=color, width=2.5, dash="dash"),
+            showscale=False,
+            name=label,
+            showlegend=True,
+            hoverinfo="skip",
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=[float(inputs[x_key])],
+        y=[float(inputs[y_key])],
+        mode="markers",
+        marker=dict(symbol="x", size=12, color="black"),
+        name="trenutni projekt",
+    ))
+    fig.update_layout(
+        xaxis_title=AXES[x_key][0],
+        yaxis_title=AXES[y_key][0],
+        height=560,
+        margin=dict(l=10, r=10, t=30, b=10),
+        legend=dict(orientation="h", y=1.08),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    all_ok = g["fi_ok"] & g["fz_ok"] & g["fzp_ok"]
+    st.caption(
+        f"Točk v mreži: {z.size:,}".replace(",", " ")
+        + f" · skladnih (FI, FZ, FZP): {all_ok.mean() * 100:.1f} %. "
+        "Črtkane črte so meje skladnosti; na eni strani meje je pogoj izpolnjen, na drugi ne."
+    )
+
+    return inputs
@@ -0,0 +1,108 @@
+import pandas as pd
+import streamlit as st
+
+from siteplan import INT_COLUMNS, PARCEL_COLUMNS, TEXT_COLUMNS, default_parcels, evaluate_site
+from ui_dashboard import area_fmt, eur_fmt, pct_fmt
+
+
+def _ok(flag) -> str:
+    return "✅" if flag else "❌"
+
+
+def _set_parcels(parcels: list):
+    """Replace the parcel table (and reset the editor, which otherwise keeps its own edit state)."""
+    st.session_state["site_parcels"] = parcels
+    st.session_state["_site_ver"] = st.session_state.get("_site_ver", 0) + 1
+
+
+def _parcels_df(parcels: list) -> pd.DataFrame:
+    df = pd.DataFrame(parcels, columns=list(PARCEL_COLUMNS))
+    for key in PARCEL_COLUMNS:
+        if key not in TEXT_COLUMNS:
+            df[key] = pd.to_numeric(df[key], errors="coerce")
+    return df
+
+
+def render_tab(inputs: dict):
+    st.subheader("Območje (več parcel)")
+    st.caption(
+        "Vsaka parcela ima svojo namensko rabo, omejitve (FI, FZ, FZP) in stavbe; prazna celica pomeni "
+        "vrednost iz projekta. Parkiranje je skupno (klet po scenariju projekta) in se razdeli na parcele "
+        "po utežeh »Delež kleti« (prazno: sorazmerno z odtisom stavb)."
+    )
+
+    if "site_parcels" not in st.session_state:
+        st.session_state["site_parcels"] = default_parcels(inputs)
+
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("Začni s parcelo trenutnega projekta"):
+            _set_parcels(default_parcels(inputs))
+    with c2:
+        if st.button("Počisti parcele"):
+            _set_parcels([])
+
+    ver = st.session_state.get("_site_ver", 0)
+    column_config = {}
+    for key, label in PARCEL_COLUMNS.items():
+        if key in TEXT_COLUMNS:
+            column_config[key] = st.column_config.TextColumn(label)
+        elif key in INT_COLUMNS:
+            column_config[key] = st.column_config.NumberColumn(label, min_value=0, step=1)
+        else:
+            column_config[key] = st.column_config.NumberColumn(label, min_value=0.0)
+
+    edited = st.data_editor(
+        _parcels_df(st.session_state["site_parcels"]),
+        key=f"site_editor_{ver}",
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config=column_config,
+    )
+    edited = edited.dropna(how="all")
+    for key in TEXT_COLUMNS:
+        edited[key] = edited[key].fillna("")
+    st.session_state["site_parcels"] = edited.to_dict("records")
+
+    if edited.empty:
+        st.info("Dodaj parcele (vrstice v tabeli zgoraj).")
+        return inputs
+
+    res = evaluate_site(edited, inputs)
+    p, s = res["parcel"], res["site"]
+
+    st.markdown("#### Območje skupaj")
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Površina", area_fmt(s["P"]), f"{s['n_parcels']} parcel", delta_color="off")
+    c2.metric("FI", f"{s['FI']:.2f} {_ok(s['fi_ok'])}")
+    c3.metric("Odtis (FZ)", f"{area_fmt(s['building_footprint'])} {_ok(s['fz_ok'])}")
+    c4.metric("FZP", f"{pct_fmt(s['fzp'] * 100)} {_ok(s['fzp_ok'])}", f"min {pct_fmt(s['FZP_min'] * 100)}",
+              delta_color="off")
+    c5.metric("Margin", eur_fmt(s["econ"]["margin_abs"]), pct_fmt(s["econ"]["margin_pct"] * 100))
+    st.caption(
+        f"Status: **{s['status']}** · {s['units']} stanovanj · {s['pm_total']} PM "
+        f"({s['pm_in_basement']} v kleti, {s['pm_on_surface']} na terenu) · skupna klet "
+        f"{area_fmt(s['basement_footprint'])} ({s['basement_levels']} et.)"
+    )
+    if not s["parcels_ok"]:
+        st.warning("Vse parcele ne izpolnjujejo svojih omejitev (glej tabelo spodaj).")
+
+    st.markdown("#### Po parcelah")
+    table = pd.DataFrame({
+        "Parcela": p["name"],
+        "Raba": p["zone"],
+        "Površina": [area_fmt(v) for v in p["P"]],
+        "Odtis": [area_fmt(v) for v in p["building_footprint"]],
+        "BTP": [area_fmt(v) for v in p["btp_above"]],
+        "Stanovanja": p["units"],
+        "FI": [f"{v:.2f} / {lim:.2f} {_ok(ok)}" for v, lim, ok in zip(p["FI"], p["FI_limit"], p["fi_ok"])],
+        "FZ": [_ok(ok) for ok in p["fz_ok"]],
+        "Klet": [area_fmt(v) for v in p["basement_footprint"]],
+        "FZP": [f"{pct_fmt(v * 100)} {_ok(ok)}" for v, ok in zip(p["fzp"], p["fzp_ok"])],
+        "Margin": [eur_fmt(v) for v in p["econ"]["margin_abs"]],
+        "Status": p["status"],
+    })
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+    return inputs
@@ -1,5 +1,5 @@
 import streamlit as st
-from core import compute
+from ui_cache import get_results
 from ui_dashboard import render_dashboard, area_fmt, pct_fmt, eur_fmt
 
 def _yesno(ok: bool) -> str:
@@ -13,7 +13,7 @@ def render_tab(inputs: dict, embedded: bool = False):
     if not embedded:
         st.subheader("Opis projekta")
 
-    r = compute(inputs)
+    r = get_results(inputs)
     # Opis je zdaj del zavihka "Izpis". V ločenem zavihku ga pustimo brez TXT izvoza.
     render_dashboard(r, net_to_gross=inputs["net_to_gross"])
 
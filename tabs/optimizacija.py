@@ -1,16 +1,17 @@
 import math
+import numpy as np
 import streamlit as st
-from core import compute
-from ui_dashboard import render_dashboard, area_fmt, pct_fmt
+from core import compute, inputs_hash, solve
+from optimizer import search, default_grid, apply_candidate
+from result_cache import default_cache
+from ui_cache import get_results, inputs_key, pareto
+from ui_dashboard import area_fmt, pct_fmt, eur_fmt, eur_m2_fmt
 
 def _apply_option(inputs: dict, option_key: str) -> dict:
     r = compute(inputs)
 
     P = float(inputs["parcela_m2"])
-    FZ = float(inputs["fz"])
     building_fp = float(r["building_footprint"])
-    btp_above = float(r["btp_above"])
-    FI_limit = float(inputs["fi"])
 
     if option_key == "FI_1_reduce_floors":
         if int(inputs["st_etas_nadz"]) > 1:
@@ -25,7 +26,7 @@ def _apply_option(inputs: dict, option_key: str) -> dict:
         inputs["fi"] = round(float(inputs["fi"]) + 0.05, 2)
 
     elif option_key == "FZ_1_increase_parcel":
-        needed_P = math.ceil(building_fp / max(FZ, 1e-6))
+        needed_P = math.ceil(solve(inputs, "fz", "parcela_m2") or P)
         inputs["parcela_m2"] = int(max(P, needed_P))
 
     elif option_key == "FZ_2_reduce_lamels":
@@ -53,11 +54,188 @@ def _apply_option(inputs: dict, option_key: str) -> dict:
 
     return inputs
 
+def _render_pareto(inputs: dict, pm_min: float):
+    import plotly.graph_objects as go
+
+    with st.expander("Pareto fronta: margin × FZP × št. stanovanj", expanded=False):
+        key = inputs_hash({"inputs": inputs_key(inputs), "pm_min": pm_min})
+        # fronta se računa le na zahtevo; seja si zapomni zadnjo za trenutne vhode
+        if st.button("Izračunaj Pareto fronto"):
+            st.session_state["_opt_pareto"] = (key, pareto(key, inputs, default_grid(inputs, pm_min)))
+        cached = st.session_state.get("_opt_pareto")
+        if not cached or cached[0] != key:
+            return
+        res = cached[1]
+
+        pts = res["points"]
+        front = res["front"]
+        n = len(pts["units"])
+        if not n:
+            st.warning("Nobena zasnova v preiskanem območju ne izpolnjuje FI in FZ.")
+            return
+
+        st.caption(
+            f"Zasnov, skladnih s FI in FZ: {n}; Pareto optimalnih: {len(front)} "
+            "(nobena druga zasnova ni boljša v vseh treh ciljih hkrati)."
+        )
+
+        # za prikaz omejimo število nedominiranih točk (fronta je vedno prikazana v celoti)
+        rest = np.setdiff1d(np.arange(n), front)
+        if rest.size > 20000:
+            rest = np.sort(np.random.default_rng(0).choice(rest, 20000, replace=False))
+
+        def hover(idx):
+            return [
+                f"{int(pts['stevilo_lamel'][i])} × {int(pts['dolzina_lamele_m'][i])} × {int(pts['sirina_lamele_m'][i])} m, "
+                f"etaže: {int(pts['st_etas_nadz'][i])}, {pts['scenario'][i]}, PM {pts['pm_na_stanovanje'][i]:.1f}<br>"
+                f"stanovanj: {int(pts['units'][i])}"
+                for i in idx
+            ]
+
+        fig = go.Figure()
+        fig.add_trace(go.Scattergl(
+            x=pts["fzp"][rest] * 100,
+            y=pts["margin_abs"][rest],
+            mode="markers",
+            name="ostale zasnove",
+            marker=dict(size=4, color="#c8c8c8"),
+            hoverinfo="skip",
+        ))
+        fig.add_trace(go.Scattergl(
+            x=pts["fzp"][front] * 100,
+            y=pts["margin_abs"][front],
+            mode="markers",
+            name="Pareto fronta",
+            marker=dict(
+                size=9,
+                color=pts["units"][front],
+                colorscale="Viridis",
+                colorbar=dict(title="Stanovanja"),
+                symbol=np.where(pts["fzp_ok"][front], "circle", "x"),
+            ),
+            text=hover(front),
+            hovertemplate="%{text}<br>FZP: %{x:.1f} %<br>Margin: %{y:,.0f} €<extra></extra>",
+        ))
+        fig.add_vline(x=float(inputs["fzp_min_pct"]), line_dash="dash", line_color="#d62728",
+                      annotation_text="min FZP")
+        fig.update_layout(
+            xaxis_title="FZP (%)",
+            yaxis_title="Margin (€)",
+            height=480,
+            margin=dict(l=10, r=10, t=30, b=10),
+            legend=dict(orientation="h", y=1.08),
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption("Točke z znakom × na fronti ne dosegajo minimalnega FZP.")
+
+
+# (oznaka, omejitev, prosta spremenljivka, format)
+_BOUNDARIES = [
+    ("Največ nadzemnih etaž (FI)", "fi", "st_etas_nadz", lambda v: f"{v}"),
+    ("Najmanjša parcela (FI)", "fi", "parcela_m2", area_fmt),
+    ("Najmanjša parcela (FZ)", "fz", "parcela_m2", area_fmt),
+    ("Najmanjša parcela (FZP)", "fzp", "parcela_m2", area_fmt),
+    ("Največja norma PM/stanovanje (FZP)", "fzp", "pm_na_stanovanje", lambda v: f"{v:.3f}"),
+    ("Prodajna cena za ničelni rezultat", "margin", "sales_price_eur_m2", eur_m2_fmt),
+    ("Največja cena zemljišča (ničelni rezultat)", "margin", "land_price_eur_m2", eur_m2_fmt),
+    ("Največji strošek gradnje nad terenom (ničelni rezultat)", "margin", "cost_above_eur_m2", eur_m2_fmt),
+]
+
+
+def _render_boundaries(inputs: dict):
+    with st.expander("Mejne vrednosti (inverzni izračun)", expanded=False):
+        st.caption("Vrednost posamezne spremenljivke, pri kateri je omejitev ravno še izpolnjena (ostalo nespremenjeno).")
+        rows = []
+        for label, constraint, free, fmt in _BOUNDARIES:
+            v = solve(inputs, constraint, free)
+            if v is None:
+                text = "ni rešitve"
+            elif v == math.inf:
+                text = "ni omejitev"
+            else:
+                text = fmt(v)
+            rows.append({"Mejna vrednost": label, "Vrednost": text})
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+
+
+def _render_search(inputs: dict) -> dict:
+    st.markdown("#### Iskanje najboljše skladne zasnove")
+    st.caption(
+        "Preišče kombinacije števila, dolžine in širine lamel, etaž, scenarija kleti in parkirne norme "
+        "ter vrne skladne zasnove (FI, FZ, FZP) z največjo razliko (margin)."
+    )
+
+    c1, c2 = st.columns(2)
+    with c1:
+        pm = float(inputs["pm_na_stanovanje"])
+        # spodnja meja sledi normi, kadar je ta nižja od 0,5 (npr. projekt brez parkiranja)
+        pm_min = st.number_input(
+            "Najnižja dopustna norma PM/stanovanje",
+            min_value=min(0.5, pm),
+            max_value=pm,
+            step=0.1,
+            value=pm,
+        )
+    with c2:
+        top_n = st.number_input("Št. predlogov", min_value=1, max_value=50, step=1, value=10)
+
+    _render_pareto(inputs, pm_min)
+
+    search_key = inputs_hash({"inputs": inputs_key(inputs), "pm_min": pm_min, "top_n": top_n})
+    # iskanje traja nekaj ms, zato teče sinhrono (ozadna opravila so za Monte Carlo)
+    if st.button("Poišči optimalne zasnove"):
+        st.session_state["_opt_search"] = (search_key, search(inputs, default_grid(inputs, pm_min), int(top_n), cache=default_cache()))
+
+    cached = st.session_state.get("_opt_search")
+    if not cached or cached[0] != search_key:
+        return inputs
+
+    res = cached[1]
+    st.caption(
+        f"Preiskanih kombinacij: {res['n_total']}, izračunanih po obrezovanju: {res['n_evaluated']}, "
+        f"skladnih: {res['n_feasible']}."
+    )
+    candidates = res["candidates"]
+    if not candidates:
+        st.warning("Nobena zasnova v preiskanem območju ni skladna.")
+        return inputs
+
+    rows = [
+        {
+            "#": i + 1,
+            "Lamele": c["stevilo_lamel"],
+            "L (m)": c["dolzina_lamele_m"],
+            "Š (m)": c["sirina_lamele_m"],
+            "Etaže": c["st_etas_nadz"],
+            "Scenarij": c["scenario"],
+            "PM/st.": f"{c['pm_na_stanovanje']:.1f}",
+            "Stanovanja": c["units"],
+            "FI": f"{c['FI']:.2f}",
+            "FZP": pct_fmt(c["fzp"] * 100),
+            "Margin": eur_fmt(c["margin_abs"]),
+            "Margin %": pct_fmt(c["margin_pct"] * 100),
+        }
+        for i, c in enumerate(candidates)
+    ]
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+
+    pick = st.selectbox("Predlog za uporabo", [row["#"] for row in rows], index=0)
+    if st.button("Uporabi izbrani predlog"):
+        inputs = apply_candidate(inputs, candidates[pick - 1])
+        st.session_state.pop("_opt_search", None)
+        st.rerun()
+
+    return inputs
+
+
 def render_tab(inputs: dict):
     st.subheader("Optimizacija")
 
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
+    inputs = _render_search(inputs)
+    _render_boundaries(inputs)
+    st.markdown("---")
+
+    r = get_results(inputs)
 
     status = r.get("status", "")
     is_noncompliant = status.startswith("NESKLADNO")
@@ -66,6 +244,16 @@ def render_tab(inputs: dict):
         st.success("Status je skladen. Optimizacija trenutno ni potrebna.")
         return inputs
 
+    if status == "NESKLADNO (ni stavb)":
+        # Brez stavb FI/FZ/FZP ukrepi nimajo smisla – težava je v razmestitvi.
+        st.info("Projekt je neskladen, ker na parcelo **ne gre nobena stavba**.")
+        st.error(
+            "Z izbranimi gabariti stavbe ni mogoče umestiti na parcelo. V zavihku **Tipologije** "
+            "zmanjšaj odmik od meje parcele ali razmik med stavbami, preizkusi drug način razmestitve "
+            "(lamele / kare / točkovne stavbe) ali v zavihku **Parcela** povečaj parcelo."
+        )
+        return inputs
+
     proposals = []
     option_details = {}
     if status.startswith("NESKLADNO (FI)"):
@@ -1,16 +1,27 @@
 import streamlit as st
-from core import compute
-from ui_dashboard import render_dashboard
+
+from geometry import polygon_area
+
 
 def render_tab(inputs: dict):
     st.subheader("Parcela")
-    inputs["parcela_m2"] = st.number_input(
-        "Velikost parcele (m²)",
-        min_value=100,
-        step=100,
-        value=int(inputs["parcela_m2"])
-    )
+    if inputs.get("parcel_polygon"):
+        # površino določa poligon parcele (zavihek Tipologije)
+        inputs["parcela_m2"] = polygon_area(inputs["parcel_polygon"])
+        st.number_input(
+            "Velikost parcele (m²)",
+            min_value=0,
+            step=100,
+            value=int(round(inputs["parcela_m2"])),
+            disabled=True,
+            help="Površina poligona parcele; spremeniš jo v zavihku Tipologije (Oblika parcele)."
+        )
+    else:
+        inputs["parcela_m2"] = st.number_input(
+            "Velikost parcele (m²)",
+            min_value=100,
+            step=100,
+            value=int(inputs["parcela_m2"])
+        )
     st.caption("Sprememba parcele vpliva na dopustni odtis (FZ) in na delež raščenega terena (FZP).")
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
     return inputs
@@ -0,0 +1,143 @@
+import pandas as pd
+import streamlit as st
+
+from core import SCENARIOS
+from scenarios import BASE_NAME, INT_SLOT_INPUTS, SLOT_INPUTS, SlotResults, basement_slots
+from ui_dashboard import area_fmt, eur_fmt, pct_fmt
+
+
+def _ok(flag) -> str:
+    return "✅" if flag else "❌"
+
+
+# Vrstice primerjalne tabele (oznaka, r -> prikaz)
+_ROWS = [
+    ("Klet", lambda r: r["scenario"]),
+    ("Parcela", lambda r: area_fmt(r["P"])),
+    ("Odtis stavb (FZ)", lambda r: f"{area_fmt(r['building_footprint'])} {_ok(r['fz_ok'])}"),
+    ("FI", lambda r: f"{r['FI']:.2f} {_ok(r['fi_ok'])}"),
+    ("FZP", lambda r: f"{pct_fmt(r['fzp'] * 100)} {_ok(r['fzp_ok'])}"),
+    ("BTP nad terenom", lambda r: area_fmt(r["btp_above"])),
+    ("Št. stanovanj", lambda r: str(r["units"])),
+    ("PM (klet / teren)", lambda r: f"{r['pm_total']} ({r['pm_in_basement']} / {r['pm_on_surface']})"),
+    ("Kletne etaže", lambda r: str(r["basement_levels"])),
+    ("Skupna investicija", lambda r: eur_fmt(r["econ"]["total_invest"])),
+    ("Prihodki", lambda r: eur_fmt(r["econ"]["revenue"])),
+    ("Margin", lambda r: eur_fmt(r["econ"]["margin_abs"])),
+    ("Margin %", lambda r: pct_fmt(r["econ"]["margin_pct"] * 100)),
+    ("Status", lambda r: r["status"]),
+]
+
+
+def _slots_to_df(slots: list) -> pd.DataFrame:
+    rows = []
+    for slot in slots:
+        row = {"name": slot["name"]}
+        for key in SLOT_INPUTS:
+            row[key] = slot["overrides"].get(key)
+        rows.append(row)
+    df = pd.DataFrame(rows, columns=["name", *SLOT_INPUTS])
+    for key in SLOT_INPUTS:
+        if key != "scenario":
+            df[key] = pd.to_numeric(df[key], errors="coerce")
+    return df
+
+
+def _df_to_slots(df: pd.DataFrame) -> list:
+    slots, seen = [], set()
+    for i, row in enumerate(df.to_dict("records")):
+        name = str(row.get("name") or "").strip() or f"Varianta {i + 1}"
+        while name in seen or name == BASE_NAME:
+            name += "*"
+        seen.add(name)
+
+        overrides = {}
+        for key in SLOT_INPUTS:
+            v = row.get(key)
+            if v is None or (isinstance(v, float) and pd.isna(v)) or v == "":
+                continue
+            if key == "scenario":
+                overrides[key] = str(v)
+            elif key in INT_SLOT_INPUTS:
+                overrides[key] = int(v)
+            else:
+                overrides[key] = float(v)
+        slots.append({"name": name, "overrides": overrides})
+    return slots
+
+
+def _set_slots(slots: list):
+    """Replace the slots (and reset the editor, which otherwise keeps its own edit state)."""
+    st.session_state["scenarios"] = slots
+    st.session_state["_scenarios_ver"] = st.session_state.get("_scenarios_ver", 0) + 1
+
+
+def render_tab(inputs: dict):
+    st.subheader("Primerjava variant")
+    st.caption(
+        "Vsaka varianta hrani samo razlike glede na trenutni projekt (osnovo); prazna celica pomeni "
+        "vrednost iz osnove. Ob spremembi se preračunajo samo variante, na katere sprememba vpliva."
+    )
+
+    slots = st.session_state.setdefault("scenarios", [])
+
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("Dodaj variante kleti (K-1, K-1 + teren, K-2)"):
+            names = {s["name"] for s in slots}
+            _set_slots(slots + [s for s in basement_slots() if s["name"] not in names])
+    with c2:
+        if st.button("Počisti variante", disabled=not slots):
+            _set_slots([])
+
+    slots = st.session_state["scenarios"]
+    ver = st.session_state.get("_scenarios_ver", 0)
+
+    column_config = {"name": st.column_config.TextColumn("Ime variante", required=True)}
+    for key, label in SLOT_INPUTS.items():
+        if key == "scenario":
+            column_config[key] = st.column_config.SelectboxColumn(label, options=list(SCENARIOS))
+        elif key in INT_SLOT_INPUTS:
+            column_config[key] = st.column_config.NumberColumn(label, min_value=1, step=1)
+        else:
+            column_config[key] = st.column_config.NumberColumn(label, min_value=0.0)
+
+    edited = st.data_editor(
+        _slots_to_df(slots),
+        key=f"scenario_editor_{ver}",
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config=column_config,
+    )
+    slots = _df_to_slots(edited)
+    st.session_state["scenarios"] = slots
+
+    if not slots:
+        st.info("Dodaj variante (vrstice v tabeli zgoraj) za primerjavo s trenutnim projektom.")
+        return inputs
+
+    cache = st.session_state.get("_scenario_results")
+    if cache is None:
+        cache = st.session_state["_scenario_results"] = SlotResults()
+    results = cache.results(inputs, [{"name": BASE_NAME, "overrides": {}}] + slots)
+
+    st.markdown("#### Primerjava")
+    table = {name: [fmt(r) for _, fmt in _ROWS] for name, r in results.items()}
+    st.dataframe(
+        pd.DataFrame(table, index=[label for label, _ in _ROWS]),
+        use_container_width=True,
+    )
+    st.caption(f"Preračunanih variant v tem koraku: {cache.last_computed} / {len(results)}")
+
+    st.markdown("#### Prevzem variante")
+    c1, c2 = st.columns([3, 1], vertical_alignment="bottom")
+    with c1:
+        pick = st.selectbox("Varianta", [s["name"] for s in slots], key="scenario_pick")
+    with c2:
+        if st.button("Prevzemi v projekt"):
+            chosen = next(s for s in slots if s["name"] == pick)
+            inputs.update(chosen["overrides"])
+            st.rerun()
+
+    return inputs
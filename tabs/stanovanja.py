@@ -1,15 +1,44 @@
 import streamlit as st
-from core import compute, compute_units
-from ui_dashboard import render_dashboard
+from core import building_footprint, compute_units
+from ui_dashboard import area_fmt
+from unitmix import DEFAULT_TOL_PCT, allocate
+
+
+def _mix_table(inputs: dict, units: int, nfa: float):
+    """Integer units per typology (sum = units, shares within ± DEFAULT_TOL_PCT, area <= NFA)."""
+    typologies = inputs["typologies"]
+    mix = allocate(units, nfa, typologies)
+    summary = []
+    for t, n in zip(typologies, mix.counts):
+        summary.append({
+            "Tipologija": t["name"],
+            "Delež %": f"{float(t['share_pct']):.0f}",
+            "Povp. m²": f"{float(t['avg_m2']):.0f}",
+            "Št. enot": n,
+            "Dejanski delež %": f"{n / units * 100:.1f}" if units else "0.0",
+            "Površina": area_fmt(n * float(t["avg_m2"])),
+        })
+    st.dataframe(summary, use_container_width=True, hide_index=True)
+
+    if mix.method == "ostanki":
+        st.caption(
+            f"Razporeditev z deleži ± {DEFAULT_TOL_PCT:.0f} o.t. ne gre v NFA ({area_fmt(nfa)}); "
+            "prikazana je zaokrožitev deležev po metodi največjih ostankov."
+        )
+    else:
+        st.caption(
+            f"Skupaj {sum(mix.counts)} enot, {area_fmt(mix.area_m2)} od {area_fmt(nfa)} NFA "
+            f"({mix.area_m2 / nfa * 100 if nfa else 0.0:.1f} %). Deleži lahko od vnesenih odstopajo za največ "
+            f"± {DEFAULT_TOL_PCT:.0f} o.t."
+            + ("" if mix.exact else " Iskanje je doseglo omejitev; razporeditev je najboljša najdena.")
+        )
 
 
 def render_tab(inputs: dict):
     st.subheader("Stanovanja")
 
-    building_footprint = (
-        float(inputs["stevilo_lamel"]) * float(inputs["dolzina_lamele_m"]) * float(inputs["sirina_lamele_m"])
-    )
-    units_auto = compute_units(inputs, building_footprint)["units_auto"]
+    program = compute_units(inputs, building_footprint(inputs))
+    units_auto = program["units_auto"]
 
     st.markdown("#### Način določanja št. stanovanj")
     inputs["units_mode"] = st.radio(
@@ -25,31 +54,21 @@ def render_tab(inputs: dict):
         inputs["st_stanovanj"] = units_auto
         st.number_input(
             "Število stanovanj (računsko)",
-            min_value=1,
+            min_value=0,
             step=1,
             value=units_auto,
             disabled=True,
             help="Računski izračun zaklene število stanovanj na podlagi povprečne velikosti in razporeditve tipologij."
         )
         st.caption(
-            f"Izračun temelji na povprečni velikosti {compute_units(inputs, building_footprint)['avg_unit_m2']:.1f} m² "
+            f"Izračun temelji na povprečni velikosti {program['avg_unit_m2']:.1f} m² "
             "in trenutni razporeditvi tipologij."
         )
 
-        st.markdown("#### Tipologije (informativno)")
-        summary = []
-        for t in inputs["typologies"]:
-            share = float(t["share_pct"])
-            approx_units = int(round(units_auto * share / 100.0)) if units_auto else 0
-            summary.append({
-                "Tipologija": t["name"],
-                "Delež %": f"{share:.0f}",
-                "Povp. m²": f"{float(t['avg_m2']):.0f}",
-                "≈ št. enot": approx_units,
-            })
-        st.dataframe(summary, use_container_width=True, hide_index=True)
+        st.markdown("#### Tipologije (razporeditev enot)")
+        _mix_table(inputs, units_auto, program["nfa"])
     else:
-        selected_units = int(inputs.get("st_stanovanj", units_auto) or units_auto)
+        selected_units = max(1, int(inputs.get("st_stanovanj", units_auto) or units_auto))
         inputs["st_stanovanj"] = st.number_input(
             "Število stanovanj (ročno nastavljivo)",
             min_value=1,
@@ -89,6 +108,7 @@ def render_tab(inputs: dict):
                     key=f"t_m2_{i}"
                 )
 
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
+        st.markdown("#### Razporeditev enot")
+        _mix_table(inputs, int(inputs["st_stanovanj"]), program["nfa"])
+
     return inputs
@@ -1,12 +1,11 @@
 import streamlit as st
-from core import compute
-from ui_dashboard import render_dashboard
 
 def render_tab(inputs: dict):
     st.subheader("Stavbe")
+    n_label = "Število lamel" if inputs.get("layout_mode", "lamela") == "lamela" else "Število stavb"
     c1, c2, c3, c4, c5 = st.columns(5)
     with c1:
-        inputs["stevilo_lamel"] = st.number_input("Število lamel", min_value=1, step=1, value=int(inputs["stevilo_lamel"]))
+        inputs["stevilo_lamel"] = st.number_input(n_label, min_value=1, step=1, value=int(inputs["stevilo_lamel"]))
     with c2:
         inputs["dolzina_lamele_m"] = st.number_input("Dolžina lamele (m)", min_value=5, step=1, value=int(inputs["dolzina_lamele_m"]))
     with c3:
@@ -17,6 +16,4 @@ def render_tab(inputs: dict):
         inputs["net_to_gross"] = st.number_input("Neto/Bruto (NFA/BTP)", min_value=0.50, max_value=0.95, step=0.01, value=float(inputs["net_to_gross"]))
 
     st.caption("Dimenzije, etaže in neto/bruto vplivajo na NFA in računsko število stanovanj (način RAČUNSKO).")
-    r = compute(inputs)
-    render_dashboard(r, net_to_gross=inputs["net_to_gross"])
     return inputs
@@ -1,10 +1,44 @@
+import json
+
 import streamlit as st
-from pathlib import Path
+
+from geometry import LAYOUT_MODES, layout, polygon_area, uses_geometry
+from ui_cache import asset_bytes
+from ui_dashboard import area_fmt
+
+
+def _set_mode(mode: str):
+    st.session_state.inputs["layout_mode"] = mode
+
+
+def _plan(lay):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    xs = [p[0] for p in lay.polygon] + [lay.polygon[0][0]]
+    ys = [p[1] for p in lay.polygon] + [lay.polygon[0][1]]
+    fig.add_trace(go.Scatter(x=xs, y=ys, mode="lines", fill="toself", fillcolor="rgba(120, 180, 90, 0.25)",
+                             line=dict(color="#3a6b2a", width=2), name="parcela", hoverinfo="skip"))
+    for k, b in enumerate(lay.buildings, start=1):
+        fig.add_shape(type="rect", x0=b.x, y0=b.y, x1=b.x + b.w, y1=b.y + b.h,
+                      fillcolor="#b0b0b0", line=dict(color="#333333", width=1))
+        if b.courtyard_m > 0:
+            d = (b.w - b.courtyard_m) / 2.0
+            fig.add_shape(type="rect", x0=b.x + d, y0=b.y + d, x1=b.x + b.w - d, y1=b.y + b.h - d,
+                          fillcolor="rgba(120, 180, 90, 0.6)", line=dict(color="#333333", width=1))
+        fig.add_annotation(x=b.x + b.w / 2.0, y=b.y + b.h / 2.0, text=str(k), showarrow=False)
+    fig.update_layout(
+        height=460,
+        margin=dict(l=10, r=10, t=10, b=10),
+        showlegend=False,
+        xaxis=dict(title="m", constrain="domain"),
+        yaxis=dict(title="m", scaleanchor="x", scaleratio=1),
+    )
+    return fig
 
 
 def render_tab(inputs: dict) -> dict:
-    if "layout_mode" not in st.session_state:
-        st.session_state.layout_mode = "lamela"
+    mode = inputs.get("layout_mode") or "lamela"
 
     st.markdown("### Tipologije")
 
@@ -12,42 +46,102 @@ def render_tab(inputs: dict) -> dict:
 
     layout_buttons = [
         {
-            "label": "Lamelne stavbe",
-            "caption": "Aktivno – lamelna zasnova",
-            "image": Path("assets/p2.png"),
-            "on_click": lambda: st.session_state.update({"layout_mode": "lamela"}),
-            "type": "primary",
-            "disabled": False,
+            "mode": "lamela",
+            "caption": "Vzporedne lamele (dimenzije v zavihku Stavbe)",
+            "image": "assets/p2.png",
         },
         {
-            "label": "Kare / obroč (kmalu)",
-            "caption": "Placeholder za prihodnjo zasnovo",
-            "image": Path("assets/p1_g.png"),
-            "on_click": None,
-            "type": "secondary",
-            "disabled": True,
+            "mode": "kare",
+            "caption": "Kvadratni obroč s stranico = dolžina lamele, globino trakta = širina lamele",
+            "image": "assets/p1.png",
         },
         {
-            "label": "Točkovna zazidava (kmalu)",
-            "caption": "Placeholder za prihodnjo zasnovo",
-            "image": Path("assets/p3_g.png"),
-            "on_click": None,
-            "type": "secondary",
-            "disabled": True,
+            "mode": "tocka",
+            "caption": "Kvadratne točkovne stavbe",
+            "image": "assets/p3.png",
         },
     ]
 
     for col, cfg in zip(button_cols, layout_buttons):
         with col:
-            if cfg["image"].exists():
-                st.image(str(cfg["image"]), use_column_width=True)
-            if st.button(
-                cfg["label"],
-                type=cfg["type"],
+            image = asset_bytes(cfg["image"])
+            if image is not None:
+                st.image(image, use_column_width=True)
+            st.button(
+                LAYOUT_MODES[cfg["mode"]],
+                type="primary" if cfg["mode"] == mode else "secondary",
                 use_container_width=True,
-                disabled=cfg["disabled"],
-            ) and cfg["on_click"]:
-                cfg["on_click"]()
+                on_click=_set_mode,
+                args=(cfg["mode"],),
+                key=f"layout_{cfg['mode']}",
+            )
             st.caption(cfg["caption"])
 
+    st.markdown("#### Razmestitev na parceli")
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        inputs["setback_m"] = st.number_input("Odmik od meje parcele (m)", min_value=0.0, step=0.5,
+                                              value=float(inputs["setback_m"]))
+    with c2:
+        inputs["spacing_m"] = st.number_input("Razmik med stavbami (m)", min_value=0.0, step=0.5,
+                                              value=float(inputs["spacing_m"]))
+    with c3:
+        inputs["parcel_aspect"] = st.number_input("Razmerje stranic parcele (š/g)", min_value=0.1, step=0.1,
+                                                  value=float(inputs["parcel_aspect"]),
+                                                  disabled=bool(inputs["parcel_polygon"]))
+    with c4:
+        inputs["point_block_m"] = st.number_input("Stranica točkovne stavbe (m)", min_value=5.0, step=1.0,
+                                                  value=float(inputs["point_block_m"]),
+                                                  disabled=mode != "tocka")
+
+    with st.expander("Oblika parcele (poligon)"):
+        st.caption(
+            "Oglišča kot JSON seznam [[x, y], …] v metrih. Prazno: pravokotnik s površino parcele "
+            "in zgornjim razmerjem stranic."
+        )
+        text = st.text_area("Oglišča", value=json.dumps(inputs["parcel_polygon"]) if inputs["parcel_polygon"] else "")
+        try:
+            polygon = json.loads(text) if text.strip() else []
+            if polygon and (len(polygon) < 3 or any(len(p) != 2 for p in polygon)):
+                raise ValueError
+            polygon = [[float(x), float(y)] for x, y in polygon]
+        except (ValueError, TypeError):
+            st.error("Poligon mora biti seznam vsaj treh točk [x, y].")
+        else:
+            if polygon != inputs["parcel_polygon"]:
+                inputs["parcel_polygon"] = polygon
+                if polygon:
+                    inputs["parcela_m2"] = polygon_area(polygon)
+                # zavihek Parcela je že izrisan s staro površino
+                st.rerun()
+            if polygon:
+                st.caption(f"Površina parcele iz poligona: {area_fmt(inputs['parcela_m2'])}")
+
+    if mode == "lamela":
+        inputs["geometry_footprint"] = st.checkbox(
+            "Odtis iz razmestitve (le stavbe, ki gredo na parcelo)",
+            value=bool(inputs["geometry_footprint"]),
+            help="Sicer je odtis število lamel × dolžina × širina.",
+        )
+
     return inputs
+
+
+def render_layout(inputs: dict):
+    """Layout preview; called after the Stavbe tab, so it shows this rerun's building inputs."""
+    lay = layout(inputs, count_capacity=True)
+    floors = int(inputs["st_etas_nadz"])
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Postavljene stavbe", f"{lay.placed} / {lay.requested}", f"največ {lay.capacity}", delta_color="off")
+    c2.metric("Odtis", area_fmt(lay.footprint_m2))
+    c3.metric("BTP nad terenom", area_fmt(lay.btp(floors)))
+    c4.metric("Zelena površina (brez kleti)", area_fmt(lay.green_m2))
+    if lay.message:
+        st.warning(lay.message)
+    if uses_geometry(inputs):
+        st.caption("Odtis v izračunu je odtis te razmestitve.")
+    else:
+        st.caption("Izračun uporablja število lamel × dolžina × širina; razmestitev je le prikaz.")
+    st.plotly_chart(_plan(lay), use_container_width=True)
+    st.caption(f"Preizkušenih postavitev: {lay.candidates}")
+
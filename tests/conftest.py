@@ -0,0 +1,16 @@
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+# moduli projekta so v korenu repozitorija (brez paketa)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import DEFAULT_INPUTS  # noqa: E402
+
+
+@pytest.fixture
+def inputs() -> dict:
+    """A fresh copy of the default project inputs."""
+    return copy.deepcopy(DEFAULT_INPUTS)
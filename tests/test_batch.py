@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+import pytest
+
+from core import SCENARIOS, compute, compute_batch, flatten_batch, flatten_result
+
+
+def _random_project(rng: random.Random, inputs: dict) -> dict:
+    inputs.update(
+        parcela_m2=rng.uniform(500, 30000),
+        fi=rng.uniform(0.3, 3.0),
+        fz=rng.uniform(0.1, 0.6),
+        fzp_min_pct=rng.uniform(0, 60),
+        stevilo_lamel=rng.randint(0, 8),
+        dolzina_lamele_m=rng.uniform(10, 80),
+        sirina_lamele_m=rng.uniform(8, 20),
+        st_etas_nadz=rng.randint(1, 12),
+        net_to_gross=rng.uniform(0.5, 0.9),
+        pm_na_stanovanje=rng.uniform(0, 2.5),
+        visitor_share=rng.uniform(0, 0.3),
+        garage_eff_k1=rng.uniform(0.5, 1.0),
+        garage_eff_k2=rng.uniform(0.5, 1.0),
+        ramp_footprint_m2=rng.uniform(0, 400),
+        scenario=rng.choice(SCENARIOS),
+        units_mode=rng.choice(["RAČUNSKO", "AVTO", "ROČNO"]),
+        st_stanovanj=rng.randint(0, 200),
+        garage_layout=rng.random() < 0.3,
+        footprint_m2=rng.choice([None, None, 0.0, rng.uniform(100, 5000)]),
+        sales_price_eur_m2=rng.uniform(1500, 6000),
+        cost_above_eur_m2=rng.uniform(800, 2500),
+        land_price_eur_m2=rng.uniform(50, 800),
+    )
+    return inputs
+
+
+def _assert_same(expected: dict, actual: dict, i: int):
+    for key, value in flatten_result(expected).items():
+        got = actual[key][i]
+        if isinstance(value, str):
+            assert got == value, key
+        else:
+            assert got == pytest.approx(value, rel=1e-9, abs=1e-6), key
+
+
+def test_batch_matches_compute(inputs):
+    rng = random.Random(1)
+    projects = [_random_project(rng, dict(inputs)) for _ in range(400)]
+    keys = [k for k, v in projects[0].items()
+            if isinstance(v, (bool, int, float)) or v is None or k in ("scenario", "units_mode")]
+    cols = {key: np.array([np.nan if p[key] is None else p[key] for p in projects]) for key in keys}
+    flat = flatten_batch(compute_batch(cols, inputs))
+    for i, p in enumerate(projects):
+        _assert_same(compute(p), flat, i)
+
+
+def test_batch_broadcasts_scalars(inputs):
+    values = [1.0, 1.35, 2.0]
+    flat = flatten_batch(compute_batch({"fi": values}, inputs))
+    assert flat["FI_limit"].shape == (3,)
+    for i, fi in enumerate(values):
+        _assert_same(compute(dict(inputs, fi=fi)), flat, i)
+
+
+def test_batch_scenario_codes(inputs):
+    flat = flatten_batch(compute_batch({"scenario": [0, 1, 2]}, inputs))
+    for i, scenario in enumerate(SCENARIOS):
+        _assert_same(compute(dict(inputs, scenario=scenario)), flat, i)
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from core import SCENARIOS, compute
+from dataflow import MODEL_KEYS, Evaluator, downstream, sweep
+
+_FRACTIONS = ("fi", "fz", "net_to_gross", "visitor_share", "garage_eff_k1", "garage_eff_k2")
+
+
+def _mutate(rng: random.Random, inputs: dict) -> str:
+    """Set one random model input to a random valid value; returns its key."""
+    key = rng.choice(MODEL_KEYS)
+    value = inputs[key]
+    if key == "scenario":
+        inputs[key] = rng.choice(SCENARIOS)
+    elif key == "units_mode":
+        inputs[key] = rng.choice(["RAČUNSKO", "AVTO", "ROČNO"])
+    elif key == "garage_layout":
+        inputs[key] = rng.random() < 0.5
+    elif key == "footprint_m2":
+        inputs[key] = rng.choice([None, 0.0, rng.uniform(0, 3000)])
+    elif key == "typologies":
+        inputs[key] = [dict(t, share_pct=rng.uniform(0, 50)) for t in value]
+    elif key in ("stall_w_m", "stall_d_m", "aisle_w_m", "ramp_len_m"):
+        inputs[key] = rng.uniform(2, 25)
+    elif isinstance(value, int) and not isinstance(value, bool):
+        inputs[key] = rng.randint(0 if key == "st_stanovanj" else 1, 3 * max(value, 3))
+    elif key in _FRACTIONS:
+        inputs[key] = rng.uniform(0, 1)
+    else:
+        inputs[key] = rng.uniform(0, 2 * max(float(value), 10))
+    return key
+
+
+def test_fresh_evaluator_matches_compute(inputs):
+    rng = random.Random(2)
+    for _ in range(100):
+        for _ in range(rng.randint(1, 8)):
+            _mutate(rng, inputs)
+        assert Evaluator().update(inputs) == compute(inputs)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_updates_match_compute(inputs, seed):
+    rng = random.Random(seed)
+    ev = Evaluator()
+    ev.update(inputs)
+    for _ in range(500):
+        # večinoma en spremenjen vhod (kot v aplikaciji), občasno več hkrati
+        changed = [_mutate(rng, inputs) for _ in range(1 if rng.random() < 0.8 else rng.randint(2, 5))]
+        assert ev.update(inputs) == compute(inputs), changed
+        assert set(ev.last_recomputed) <= set(downstream(changed))
+
+
+def test_unchanged_inputs_recompute_nothing(inputs):
+    ev = Evaluator()
+    first = ev.update(inputs)
+    assert ev.update(dict(inputs)) is first
+    assert ev.last_recomputed == ()
+
+
+def test_sweep_matches_compute(inputs):
+    values = [0.0, 0.5, 1.0, 1.5]
+    for value, r in zip(values, sweep(inputs, "pm_na_stanovanje", values)):
+        assert r == compute(dict(inputs, pm_na_stanovanje=value))
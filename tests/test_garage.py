@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+import garage
+from garage import AISLE_W_M, MAX_ASPECT, RAMP_LEN_M, STALL_D_M, STALL_W_M, capacity, footprint, footprints, size
+
+DIMS = [
+    (STALL_W_M, STALL_D_M, AISLE_W_M, RAMP_LEN_M),
+    (2.3, 4.8, 5.5, 15.0),
+    (2.7, 5.5, 7.0, 30.0),
+]
+
+
+def _brute_force_area(pm: int, levels: int, stall_w: float, stall_d: float, aisle_w: float, ramp_len: float):
+    """Smallest area of any module count / row length that fits `pm` bays within MAX_ASPECT."""
+    double_d = 2.0 * stall_d + aisle_w
+    single_d = stall_d + aisle_w
+    best = None
+    for k in range(0, 40):
+        for s in (0, 1):
+            depth = k * double_d + s * single_d
+            if depth <= 0:
+                continue
+            for n in range(1, 2000):
+                length = aisle_w + n * stall_w
+                if max(length / depth, depth / length) > MAX_ASPECT + 1e-9:
+                    if length > depth:
+                        break
+                    continue
+                if capacity(length, depth, levels, stall_w, stall_d, aisle_w, ramp_len).stalls >= pm:
+                    # pri danem številu modulov je prva ustrezna dolžina najmanjša
+                    area = length * depth
+                    best = area if best is None else min(best, area)
+                    break
+    return best
+
+
+@pytest.mark.parametrize("dims", DIMS)
+@pytest.mark.parametrize("levels", [1, 2, 3])
+def test_size_fits_the_bays(dims, levels):
+    for pm in range(1, 400, 7):
+        lay = size(pm, levels, *dims)
+        assert lay.stalls >= pm
+        assert lay.levels == levels
+        assert max(lay.length / lay.depth, lay.depth / lay.length) <= MAX_ASPECT + 1e-9
+
+
+@pytest.mark.parametrize("dims", DIMS)
+@pytest.mark.parametrize("levels", [1, 2])
+def test_size_is_minimal(dims, levels):
+    rng = random.Random(levels)
+    for pm in [1, 2, 10, 37, 120] + [rng.randint(1, 600) for _ in range(5)]:
+        expected = _brute_force_area(pm, levels, *dims)
+        assert expected is not None
+        assert size(pm, levels, *dims).footprint_m2 == pytest.approx(expected), pm
+
+
+@pytest.mark.parametrize("pm, levels", [(0, 1), (-5, 2), (10, 0), (0, 0)])
+def test_no_bays_no_basement(pm, levels):
+    assert size(pm, levels) is garage._EMPTY
+    assert footprint(pm, levels) == 0.0
+
+
+def test_footprints_match_footprint():
+    rng = np.random.default_rng(3)
+    n = 300
+    pm = rng.integers(-2, 500, n)
+    levels = rng.integers(0, 4, n)
+    dims = [rng.choice([d[i] for d in DIMS], n) for i in range(4)]
+    got = footprints(pm, levels, *dims)
+    expected = [footprint(int(pm[i]), int(levels[i]), *(float(d[i]) for d in dims)) for i in range(n)]
+    np.testing.assert_array_equal(got, expected)
+
+    # skalarji se razširijo na obliko stolpcev
+    assert footprints(pm, 2, STALL_W_M, STALL_D_M, AISLE_W_M, RAMP_LEN_M).shape == (n,)
@@ -0,0 +1,176 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from core import compute
+from geometry import apply_layout, layout, parcel_polygon, polygon_area
+from scenarios import slot_inputs
+from siteplan import default_parcels, evaluate_site
+
+
+def _edges(polygon):
+    return list(zip(polygon, polygon[1:] + polygon[:1]))
+
+
+def _segment_distance(p, a, b):
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    t = 0.0 if not length2 else min(1.0, max(0.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+    return math.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def _inside(p, polygon):
+    px, py = p
+    inside = False
+    for (ax, ay), (bx, by) in _edges(polygon):
+        if (ay > py) != (by > py) and px < ax + (py - ay) * (bx - ax) / (by - ay):
+            inside = not inside
+    return inside
+
+
+def _rect_edges(b):
+    corners = [(b.x, b.y), (b.x + b.w, b.y), (b.x + b.w, b.y + b.h), (b.x, b.y + b.h)]
+    return corners, _edges(corners)
+
+
+def _clearance(b, polygon) -> float:
+    """Distance between the outline of building `b` and the parcel boundary (< 0 if they cross)."""
+    corners, rect = _rect_edges(b)
+    if not all(_inside(c, polygon) for c in corners):
+        return -1.0
+    if any(b.x < vx < b.x + b.w and b.y < vy < b.y + b.h for vx, vy in polygon):
+        return -1.0
+    # najmanjša razdalja med dvema daljicama, ki se ne sekata, je v enem od krajišč
+    d = min(_segment_distance(c, a, e) for c in corners for a, e in _edges(polygon))
+    return min(d, min(_segment_distance(v, a, e) for v in polygon for a, e in rect))
+
+
+def _random_inputs(rng: random.Random, inputs: dict) -> dict:
+    inputs.update(
+        layout_mode=rng.choice(["lamela", "kare", "tocka"]),
+        parcela_m2=rng.choice([2000, 5000, 20000, 200000]),
+        parcel_aspect=rng.uniform(0.3, 3.0),
+        setback_m=rng.uniform(0.0, 10.0),
+        spacing_m=rng.uniform(4.0, 20.0),
+        stevilo_lamel=rng.randint(1, 30),
+        dolzina_lamele_m=rng.uniform(15.0, 60.0),
+        sirina_lamele_m=rng.uniform(10.0, 18.0),
+    )
+    if rng.random() < 0.4:
+        # nepravilen (lahko nekonveksen) mnogokotnik približno dane površine
+        n = rng.randint(3, 9)
+        radius = math.sqrt(inputs["parcela_m2"] / math.pi)
+        inputs["parcel_polygon"] = [
+            [radius * rng.uniform(0.7, 1.3) * math.cos(2 * math.pi * k / n),
+             radius * rng.uniform(0.7, 1.3) * math.sin(2 * math.pi * k / n)]
+            for k in range(n)
+        ]
+    return inputs
+
+
+@pytest.mark.parametrize("mode", ["kare", "tocka"])
+def test_empty_layout_gives_no_floor_area(inputs, mode):
+    inputs.update(layout_mode=mode, parcela_m2=300.0)
+    lay = layout(inputs)
+    assert lay.placed == 0 and lay.message
+
+    r = compute(apply_layout(inputs))
+    assert inputs["footprint_m2"] == 0.0
+    assert r["building_footprint"] == 0.0
+    assert r["btp_above"] == 0.0
+    assert r["units"] == 0
+    assert r["status"] == "NESKLADNO (ni stavb)"
+
+
+def test_lamella_mode_keeps_rectangle_footprint(inputs):
+    apply_layout(inputs)
+    assert inputs["footprint_m2"] is None
+    r = compute(inputs)
+    expected = inputs["stevilo_lamel"] * inputs["dolzina_lamele_m"] * inputs["sirina_lamele_m"]
+    assert r["building_footprint"] == pytest.approx(expected)
+
+
+def test_layout_respects_setback_and_spacing(inputs):
+    rng = random.Random(7)
+    for _ in range(150):
+        x = _random_inputs(rng, dict(inputs))
+        lay = layout(x)
+        polygon = [tuple(p) for p in lay.polygon]
+        for b in lay.buildings:
+            assert _clearance(b, polygon) >= x["setback_m"] - 1e-6
+        for i, a in enumerate(lay.buildings):
+            for b in lay.buildings[i + 1:]:
+                gap_x = max(b.x - (a.x + a.w), a.x - (b.x + b.w))
+                gap_y = max(b.y - (a.y + a.h), a.y - (b.y + b.h))
+                assert max(gap_x, gap_y) >= x["spacing_m"] - 1e-6
+
+
+def test_large_parcel_setback(inputs):
+    # večje parcele imajo večje celice rastra; odmik mora držati tudi tam
+    inputs.update(layout_mode="tocka", parcela_m2=200_000.0, setback_m=4.0, stevilo_lamel=200)
+    lay = layout(inputs)
+    polygon = [tuple(p) for p in lay.polygon]
+    assert lay.placed > 0
+    assert min(_clearance(b, polygon) for b in lay.buildings) >= 4.0 - 1e-6
+
+
+def test_polygon_input(inputs):
+    square = [[0, 0], [100, 0], [100, 100], [0, 100]]
+    assert polygon_area(square) == pytest.approx(10_000.0)
+    assert parcel_polygon(5000.0, 1.5, square) == tuple((float(x), float(y)) for x, y in square)
+    # brez poligona: pravokotnik s površino parcele in razmerjem stranic
+    (x0, y0), (x1, _), (_, y2), _ = parcel_polygon(6000.0, 1.5)
+    assert (x1 - x0) * (y2 - y0) == pytest.approx(6000.0)
+    assert (x1 - x0) / (y2 - y0) == pytest.approx(1.5)
+
+    inputs.update(layout_mode="tocka", parcel_polygon=square, setback_m=5.0, spacing_m=10.0, point_block_m=20.0)
+    lay = layout(inputs, count_capacity=True)
+    # 90 × 90 m prostora: 3 × 3 točkovne stavbe (20 m + 10 m razmika)
+    assert lay.capacity == 9
+    assert all(5.0 - 1e-6 <= b.x and b.x + b.w <= 95.0 + 1e-6 for b in lay.buildings)
+
+    # L-oblika: v izrezanem kvadrantu ni stavb
+    ell = [[0, 0], [100, 0], [100, 50], [50, 50], [50, 100], [0, 100]]
+    lay = layout(dict(inputs, parcel_polygon=ell, stevilo_lamel=50))
+    assert lay.placed > 0
+    assert not any(b.x + b.w > 50.0 + 1e-6 and b.y + b.h > 50.0 + 1e-6 for b in lay.buildings)
+
+
+def test_polygon_sets_parcel_area(inputs):
+    inputs.update(parcela_m2=5000.0, parcel_polygon=[[0, 0], [100, 0], [100, 100], [0, 100]])
+    r = compute(apply_layout(inputs))
+    # FZ / FZP veljata za parcelo poligona, ne za prej vneseno površino
+    assert inputs["parcela_m2"] == pytest.approx(10_000.0)
+    assert r["fz_max_footprint"] == pytest.approx(10_000.0 * inputs["fz"])
+
+    slot = slot_inputs(inputs, {"parcela_m2": 8000.0})
+    assert slot["parcel_polygon"] == [] and slot["parcela_m2"] == 8000.0
+
+
+@pytest.mark.parametrize("mode", ["lamela", "kare", "tocka"])
+@pytest.mark.parametrize("garage_layout", [False, True])
+@pytest.mark.parametrize("parcela_m2", [300.0, 5000.0, 20000.0])
+def test_single_parcel_site_equals_compute(inputs, mode, garage_layout, parcela_m2):
+    for scenario in ("K-1", "K-1 + teren", "K-2"):
+        inputs.update(layout_mode=mode, garage_layout=garage_layout, parcela_m2=parcela_m2, scenario=scenario)
+        r = compute(apply_layout(inputs))
+        site = evaluate_site(default_parcels(inputs), inputs)["site"]
+        for key in ("building_footprint", "btp_above", "nfa", "units", "pm_total", "basement_footprint",
+                    "surface_parking_area", "growing_area", "fzp"):
+            assert site[key] == pytest.approx(r[key]), key
+        assert site["status"] == r["status"]
+        for key, value in r["econ"].items():
+            assert site["econ"][key] == pytest.approx(value), key
+
+
+def test_site_footprints_follow_layout(inputs):
+    inputs.update(layout_mode="kare")
+    parcels = default_parcels(inputs) + [dict(default_parcels(inputs)[0], name="Parcela 2", parcela_m2=300.0)]
+    res = evaluate_site(parcels, inputs)
+    footprint = np.asarray(res["parcel"]["building_footprint"])
+    assert footprint[0] == pytest.approx(compute(apply_layout(dict(inputs)))["building_footprint"])
+    assert footprint[1] == 0.0
+    assert res["parcel"]["units"][1] == 0
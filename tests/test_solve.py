@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from core import SOLVE_TARGETS, compute, solve
+
+INT_KEYS = ("st_etas_nadz", "stevilo_lamel")
+
+
+def _ok(r: dict, constraint: str) -> bool:
+    if constraint == "margin":
+        return r["econ"]["margin_abs"] >= -1e-8 * max(1.0, abs(r["econ"]["revenue"]))
+    return bool(r[f"{constraint}_ok"])
+
+
+def _beyond(value, free: str, direction: str):
+    """The next value past the boundary (one step for integers, a small relative step otherwise)."""
+    if free in INT_KEYS:
+        return value + 1 if direction == "max" else value - 1
+    step = max(1e-5 * abs(value), 1e-6)
+    return value + step if direction == "max" else value - step
+
+
+def _projects(inputs: dict):
+    yield inputs
+    yield dict(inputs, scenario="K-1", parcela_m2=3500.0, fzp_min_pct=30.0)
+    yield dict(inputs, scenario="K-1 + teren", st_etas_nadz=6, pm_na_stanovanje=1.5)
+    yield dict(inputs, garage_layout=True, fi=1.1, fz=0.3)
+    yield dict(inputs, sales_price_eur_m2=2500.0, fzp_min_pct=15.0)
+
+
+@pytest.mark.parametrize("constraint, free", sorted(SOLVE_TARGETS))
+def test_solve_boundary_is_tight(inputs, constraint, free):
+    direction = SOLVE_TARGETS[(constraint, free)]
+    checked = 0
+    for project in _projects(inputs):
+        value = solve(project, constraint, free)
+        if value is None or math.isinf(value):
+            continue
+        if free in INT_KEYS:
+            assert isinstance(value, int)
+        # meja izpolni omejitev ...
+        assert _ok(compute(dict(project, **{free: value})), constraint)
+        # ... korak čez njo pa ne (razen na robu dopustnega območja vrednosti)
+        past = _beyond(value, free, direction)
+        if past < 0:
+            continue
+        assert not _ok(compute(dict(project, **{free: past})), constraint)
+        checked += 1
+    assert checked
@@ -0,0 +1,64 @@
+import itertools
+import math
+import random
+
+import pytest
+
+from unitmix import _SCALE, allocate, largest_remainder, share_ranges
+
+
+def _brute_force(units, nfa, typologies, prices=None, tol_pct=5.0):
+    """Best feasible value over all count vectors (None if nothing is feasible)."""
+    ranges = share_ranges(typologies, tol_pct)
+    bounds = [(int(math.ceil(lo / 100.0 * units - 1e-9)), int(math.floor(hi / 100.0 * units + 1e-9)))
+              for lo, hi in ranges]
+    cap = int(math.floor(nfa * _SCALE + 1e-6))
+    sizes = [int(round(t["avg_m2"] * _SCALE)) for t in typologies]
+    best = None
+    for counts in itertools.product(*(range(lo, hi + 1) for lo, hi in bounds)):
+        if sum(counts) != units or sum(n * a for n, a in zip(counts, sizes)) > cap:
+            continue
+        if prices is None:
+            value = sum(n * t["avg_m2"] for n, t in zip(counts, typologies))
+        else:
+            value = sum(n * t["avg_m2"] * p for n, t, p in zip(counts, typologies, prices))
+        best = value if best is None else max(best, value)
+    return best, bounds
+
+
+def _random_case(rng: random.Random):
+    m = rng.randint(2, 4)
+    typologies = [{"avg_m2": round(rng.uniform(30, 120), 1), "share_pct": rng.uniform(5, 50)} for _ in range(m)]
+    units = rng.randint(1, 40)
+    mean = sum(t["avg_m2"] * t["share_pct"] for t in typologies) / sum(t["share_pct"] for t in typologies)
+    nfa = units * mean * rng.uniform(0.85, 1.15)
+    return units, nfa, typologies
+
+
+@pytest.mark.parametrize("with_prices", [False, True])
+def test_allocate_matches_brute_force(with_prices):
+    rng = random.Random(3 if with_prices else 2)
+    optimal = 0
+    for _ in range(300):
+        units, nfa, typologies = _random_case(rng)
+        prices = [rng.uniform(2500, 4500) for _ in typologies] if with_prices else None
+        mix = allocate(units, nfa, typologies, prices=prices)
+        best, bounds = _brute_force(units, nfa, typologies, prices)
+
+        assert sum(mix.counts) == units
+        if best is None:
+            # ni dopustne razporeditve: zaokrožitev deležev
+            assert mix.method == "ostanki"
+            assert list(mix.counts) == largest_remainder(units, [t["share_pct"] for t in typologies])
+            continue
+        assert mix.exact and mix.method == "optimum"
+        assert all(lo <= n <= hi for n, (lo, hi) in zip(mix.counts, bounds))
+        assert mix.area_m2 <= nfa + 1e-6
+        assert mix.value == pytest.approx(best, rel=1e-12)
+        optimal += 1
+    assert optimal > 100
+
+
+def test_allocate_no_units():
+    mix = allocate(0, 1000.0, [{"avg_m2": 50.0, "share_pct": 100.0}])
+    assert mix.counts == (0,) and mix.exact
@@ -0,0 +1,126 @@
+"""Caches of the Streamlit app.
+
+- Per session: ``get_results`` keeps a ``dataflow.Evaluator`` in ``st.session_state``
+  (incremental, cheaper than any shared lookup for the live dashboard).
+- Shared by all sessions (``st.cache_data``, keyed by ``core.inputs_hash`` of the
+  inputs and parameters, with a TTL and an entry limit): full results, the project
+  description, PDF bytes and the sensitivity / Pareto grids, so identical projects of
+  different users are computed once.
+- Process-wide resources (``st.cache_resource``): asset files (logo, layout images).
+  PDF fonts and styles are loaded once per process by ``pdf_resources``.
+
+Cached data functions take the key as their only hashed argument; the inputs are
+passed as ``_inputs`` (not hashed by Streamlit), so the key must cover everything the
+function reads. ``inputs_key`` keeps the hash of the current inputs in
+``st.session_state`` (next to the Evaluator), so a rerun serializes the inputs (map image
+included) once, not once per lookup; tabs nest it in the keys of their own parameters. Hits return copies (unpickled), so the tabs keep the current grid in
+``st.session_state`` as well and go to the shared cache only when its key changes.
+"""
+import copy
+from pathlib import Path
+from typing import Optional
+
+import streamlit as st
+
+from core import compute, inputs_hash
+from dataflow import Evaluator
+from optimizer import pareto_search
+from pdf_export import build_pdf, build_project_description_markdown
+from result_cache import default_cache
+from sensitivity import grid
+
+# Omejitve deljenih predpomnilnikov (čas veljavnosti v s, največ vnosov)
+RESULTS_TTL_S, RESULTS_MAX = 3600, 1000
+REPORT_TTL_S, REPORT_MAX = 3600, 200
+PDF_TTL_S, PDF_MAX = 1800, 50
+GRID_TTL_S, GRID_MAX = 1800, 50
+
+
+def get_results(inputs: dict) -> dict:
+    """Return `compute(inputs)`, recomputing only what changed since the last call.
+
+    All tabs share one `dataflow.Evaluator` (in `st.session_state`): a rerun with
+    unchanged inputs only diffs the inputs, and an edit recomputes just the nodes
+    downstream of the edited keys. The returned dict must be treated as read-only.
+    """
+    ev = st.session_state.get("_evaluator")
+    if ev is None:
+        ev = st.session_state["_evaluator"] = Evaluator()
+
+    r = ev.update(inputs)
+
+    # v načinu RAČUNSKO je št. stanovanj rezultat izračuna; UI ga hrani v inputs
+    # (prikaz v zavihku Klet, izhodišče ob preklopu na AVTO)
+    if inputs.get("units_mode", "RAČUNSKO") == "RAČUNSKO":
+        inputs["st_stanovanj"] = r["units"]
+    return r
+
+
+def inputs_key(inputs: dict) -> str:
+    """`core.inputs_hash(inputs)`, hashed again only when the inputs have changed since the last call.
+
+    The last inputs and their hash are kept in `st.session_state`; comparing with them is
+    much cheaper than serializing (unchanged values, such as the map image, compare by
+    identity).
+    """
+    memo = st.session_state.get("_inputs_key")
+    if memo is not None and memo[0] == inputs:
+        return memo[1]
+    key = inputs_hash(inputs)
+    st.session_state["_inputs_key"] = (copy.deepcopy(inputs), key)
+    return key
+
+
+# =================================================
+# DELJENI PODATKI (vse seje)
+# =================================================
+@st.cache_data(ttl=RESULTS_TTL_S, max_entries=RESULTS_MAX, show_spinner=False)
+def _compute(key: str, _inputs: dict) -> dict:
+    return compute(_inputs)
+
+
+def shared_results(inputs: dict, key: Optional[str] = None) -> dict:
+    """`compute(inputs)` from the cross-session cache (a copy; safe to modify); `key` = `inputs_key(inputs)`."""
+    return _compute(key or inputs_key(inputs), inputs)
+
+
+@st.cache_data(ttl=REPORT_TTL_S, max_entries=REPORT_MAX, show_spinner=False)
+def _description(key: str, _inputs: dict) -> str:
+    return build_project_description_markdown(_inputs, shared_results(_inputs, key))
+
+
+def project_description(inputs: dict, key: Optional[str] = None) -> str:
+    """Markdown description of the project (cross-session cache); `key` = `inputs_key(inputs)`."""
+    return _description(key or inputs_key(inputs), inputs)
+
+
+@st.cache_data(ttl=PDF_TTL_S, max_entries=PDF_MAX, show_spinner=False)
+def _pdf(key: str, _inputs: dict) -> bytes:
+    return build_pdf(_inputs, shared_results(_inputs, key))
+
+
+def pdf_report(inputs: dict, key: Optional[str] = None) -> bytes:
+    """PDF report bytes (cross-session cache; raises like `pdf_export.build_pdf`); `key` = `inputs_key(inputs)`."""
+    return _pdf(key or inputs_key(inputs), inputs)
+
+
+@st.cache_data(ttl=GRID_TTL_S, max_entries=GRID_MAX, show_spinner=False)
+def sensitivity_grid(key: str, _inputs: dict, _x_key: str, _x_vals, _y_key: str, _y_vals) -> dict:
+    """`sensitivity.grid` (cross-session cache); `key` hashes the inputs and both axes."""
+    return grid(_inputs, _x_key, _x_vals, _y_key, _y_vals)
+
+
+@st.cache_data(ttl=GRID_TTL_S, max_entries=GRID_MAX, show_spinner=False)
+def pareto(key: str, _inputs: dict, _grid: dict) -> dict:
+    """`optimizer.pareto_search` (cross-session cache, then the persistent result cache); `key` hashes inputs and grid."""
+    return pareto_search(_inputs, _grid, cache=default_cache())
+
+
+# =================================================
+# VIRI (enkrat na proces)
+# =================================================
+@st.cache_resource(max_entries=64)
+def asset_bytes(path: str) -> Optional[bytes]:
+    """Contents of an asset file (None if it does not exist), read once per process."""
+    p = Path(path)
+    return p.read_bytes() if p.is_file() else None
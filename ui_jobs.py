@@ -0,0 +1,65 @@
+from typing import Any, Callable, List, Sequence
+
+import streamlit as st
+
+from jobs import CANCELLED, DONE, FAILED, Job, JobManager, Task
+
+# st.fragment (Streamlit >= 1.37), prej st.experimental_fragment; brez njega osvežimo ročno
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+POLL_S = 1.0  # interval osveževanja napredka
+
+
+@st.cache_resource
+def job_manager() -> JobManager:
+    """Process pool and job registry shared by all sessions of this server process."""
+    return JobManager()
+
+
+def submit(key: str, label: str, tasks: Sequence[Task], combine: Callable[[List[Any]], Any]) -> Job:
+    """Start a background job (or reuse the one with the same key); `render_job(key)` shows it."""
+    return job_manager().submit(key, label, tasks, combine)
+
+
+def render_job(key: str, render: Callable[[Any, bool], None]):
+    """Show the job `key`: progress, cancel and partial results while it runs, then the result.
+
+    `render(result, final)` draws a (partial) result. While the job runs only this part of
+    the page reruns (every ``POLL_S``), the rest of the app stays responsive; when the job
+    finishes the whole app reruns once.
+    """
+    manager = job_manager()
+    job = manager.get(key)
+    if job is None:
+        return
+    polling = job.active
+
+    def body():
+        job = manager.get(key)
+        if job is None:
+            return
+        if job.active:
+            c1, c2 = st.columns([4, 1])
+            c1.progress(job.progress, text=f"{job.label}: {job.done} / {job.total} delov · {job.elapsed:.0f} s")
+            if c2.button("Prekliči", key=f"cancel_{key}"):
+                manager.cancel(key)
+                st.rerun()
+            partial = manager.partial(job)
+            if partial is not None:
+                render(partial, False)
+            if _fragment is None and st.button("Osveži", key=f"refresh_{key}"):
+                st.rerun()
+        elif polling:
+            # konec med osveževanjem dela strani: celoten rerun izriše končno stanje
+            st.rerun()
+        elif job.status == DONE:
+            render(job.result, True)
+        elif job.status == CANCELLED:
+            st.info(f"{job.label}: izračun je bil preklican.")
+        elif job.status == FAILED:
+            st.error(f"{job.label}: {job.error}")
+
+    if _fragment is not None:
+        _fragment(run_every=POLL_S if polling else None)(body)()
+    else:
+        body()
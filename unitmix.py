@@ -0,0 +1,229 @@
+"""Integer unit mix: how many units of each typology.
+
+``allocate(units, nfa, typologies)`` splits the total number of units into integer
+counts per typology that sum exactly to ``units``, keep every typology's share within
+its range (the typology share ± ``tol_pct`` percentage points) and fill the net floor
+area (NFA) as well as possible: the counts maximize the sellable area (or the revenue,
+with per-typology prices) without exceeding the NFA.
+
+The search is a depth-first branch and bound over the typologies (most valuable units
+first). Each node is bounded with a Lagrangian relaxation of the NFA constraint (a
+greedy fill of the remaining units; the multipliers are 0, the largest value per m²
+and the one that gives the tightest bound at the root) and pruned on the count and
+area ranges that the remaining typologies can still reach. For the area objective the search stops as soon
+as the NFA is filled to the granularity of the unit sizes. A node limit keeps the
+worst case bounded; when it is hit the best allocation found so far is returned
+(``exact`` is False). When no allocation satisfies the ranges and the NFA, the counts
+fall back to the largest-remainder rounding of the shares.
+"""
+import math
+from dataclasses import dataclass
+from functools import reduce
+from typing import List, Optional, Sequence, Tuple
+
+# Privzeto dovoljeno odstopanje deleža tipologije [odstotne točke]
+DEFAULT_TOL_PCT = 5.0
+
+# Največje število ocenjenih vozlišč iskanja (nato vrne najboljšo najdeno razporeditev)
+MAX_NODES = 50_000
+
+_SCALE = 100  # površine v cm² natančnosti (cela števila, brez napak zaokroževanja)
+
+
+@dataclass(frozen=True)
+class UnitMix:
+    counts: Tuple[int, ...]  # št. enot po tipologijah (v vrstnem redu vhodnih tipologij)
+    area_m2: float           # skupna prodajna površina enot
+    value: float             # vrednost cilja (površina ali prihodek)
+    exact: bool              # dokazano optimalna razporeditev
+    method: str              # "optimum", "omejitev iskanja" ali "ostanki" (zaokrožitev deležev)
+
+
+def largest_remainder(total: int, shares: Sequence[float]) -> List[int]:
+    """Integer counts proportional to `shares` that sum exactly to `total` (Hamilton method)."""
+    total = int(total)
+    weight = sum(max(0.0, float(s)) for s in shares)
+    if total <= 0 or weight <= 0:
+        return [0] * len(shares)
+    quotas = [total * max(0.0, float(s)) / weight for s in shares]
+    counts = [int(math.floor(q)) for q in quotas]
+    order = sorted(range(len(quotas)), key=lambda i: (counts[i] - quotas[i], i))
+    for i in order[: total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def share_ranges(typologies: Sequence[dict], tol_pct: float = DEFAULT_TOL_PCT) -> List[Tuple[float, float]]:
+    """Allowed share range [%] of each typology: normalized share ± `tol_pct` (0 stays 0)."""
+    total = sum(max(0.0, float(t["share_pct"])) for t in typologies)
+    ranges = []
+    for t in typologies:
+        s = max(0.0, float(t["share_pct"])) / total * 100.0 if total > 0 else 0.0
+        ranges.append((max(0.0, s - tol_pct), min(100.0, s + tol_pct)) if s > 0 else (0.0, 0.0))
+    return ranges
+
+
+def _greedy(R: int, items: List[Tuple[float, int]]) -> float:
+    """Max of sum(w * x) with sum(x) = R, 0 <= x <= cap, for (w, cap) items sorted by w desc."""
+    total = 0.0
+    for w, cap in items:
+        if R <= 0:
+            break
+        take = cap if cap < R else R
+        total += w * take
+        R -= take
+    return total
+
+
+def allocate(
+    units: int,
+    nfa: float,
+    typologies: Sequence[dict],
+    tol_pct: float = DEFAULT_TOL_PCT,
+    prices: Optional[Sequence[float]] = None,
+    ranges: Optional[Sequence[Tuple[float, float]]] = None,
+    max_nodes: int = MAX_NODES,
+) -> UnitMix:
+    """Integer unit counts per typology (see the module docstring).
+
+    `prices` (€/m² per typology) switch the objective from sellable area to revenue;
+    `ranges` ((min %, max %) per typology) replace the default share ± `tol_pct`.
+    """
+    m = len(typologies)
+    N = int(units)
+    sizes = [float(t["avg_m2"]) for t in typologies]
+    shares = [float(t["share_pct"]) for t in typologies]
+
+    def result(counts, exact, method) -> UnitMix:
+        area = sum(n * a for n, a in zip(counts, sizes))
+        value = sum(n * a * p for n, a, p in zip(counts, sizes, prices)) if prices is not None else area
+        return UnitMix(tuple(int(n) for n in counts), area, value, exact, method)
+
+    if m == 0 or N <= 0:
+        return result([0] * m, True, "optimum")
+
+    # meje števila enot po tipologijah
+    lo_hi = []
+    for lo_pct, hi_pct in (ranges if ranges is not None else share_ranges(typologies, tol_pct)):
+        lo = int(math.ceil(lo_pct / 100.0 * N - 1e-9))
+        hi = int(math.floor(hi_pct / 100.0 * N + 1e-9))
+        lo_hi.append((lo, hi))
+
+    cap = int(math.floor(nfa * _SCALE + 1e-6))
+    area_int = [int(round(a * _SCALE)) for a in sizes]
+    val = [a * p for a, p in zip(area_int, prices)] if prices is not None else [float(a) for a in area_int]
+
+    # vrstni red iskanja: najvrednejše enote najprej
+    order = sorted(range(m), key=lambda i: (-val[i], -area_int[i], i))
+    A = [area_int[i] for i in order]
+    V = [val[i] for i in order]
+    LO = [lo_hi[i][0] for i in order]
+    HI = [lo_hi[i][1] for i in order]
+    fallback = largest_remainder(N, shares)
+
+    if any(lo > hi for lo, hi in zip(LO, HI)) or sum(LO) > N or sum(HI) < N:
+        return result(fallback, False, "ostanki")
+
+    # pripone: najmanjše/največje št. enot preostalih tipologij
+    suf_lo = [0] * (m + 1)
+    suf_hi = [0] * (m + 1)
+    for i in range(m - 1, -1, -1):
+        suf_lo[i] = suf_lo[i + 1] + LO[i]
+        suf_hi[i] = suf_hi[i + 1] + HI[i]
+
+    def relaxation(i: int, lam: float):
+        # (lambda, osnova pri spodnjih mejah, (utež, prosto) urejeno padajoče) za tipologije i..m-1
+        rest = range(i, m)
+        base = sum(LO[j] * (V[j] - lam * A[j]) for j in rest)
+        items = sorted(((V[j] - lam * A[j], HI[j] - LO[j]) for j in rest), reverse=True)
+        return lam, base, items
+
+    def lagrange(lam: float, base: float, items, R: int, C: int) -> float:
+        return lam * C + base + _greedy(R, items)
+
+    # Lagrangeevi množitelji: 0, največja vrednost na m² in najboljši v korenu (lomne točke)
+    ratios = {V[i] / A[i] for i in range(m) if A[i] > 0}
+    root = [relaxation(0, lam) for lam in sorted({0.0} | ratios)]
+    lam_root = min(root, key=lambda rel: lagrange(*rel, N - suf_lo[0], cap))[0]
+    lambdas = sorted({0.0, lam_root, max(ratios, default=0.0)})
+
+    # za vsako pripono: površina pri spodnjih mejah, relaksacije, (velikost, prosto) nar./pad.
+    suffix = []
+    for i in range(m):
+        rest = range(i, m)
+        base_a = sum(LO[j] * A[j] for j in rest)
+        small = sorted((A[j], HI[j] - LO[j]) for j in rest)
+        suffix.append((base_a, [relaxation(i, lam) for lam in lambdas], small, small[::-1]))
+
+    # pri cilju površine: največja dosegljiva površina je večkratnik NSD velikosti
+    target = None
+    if prices is None:
+        g = reduce(math.gcd, [a for a in A if a > 0], 0)
+        if g:
+            base = sum(LO[j] * A[j] for j in range(m))
+            if cap >= base:
+                target = float(base + (cap - base) // g * g)
+
+    best_value = -math.inf
+    best: Optional[List[int]] = None
+    counts = [0] * m
+    nodes = 0
+    stop = False
+
+    def bound(i: int, R: int, C: int) -> float:
+        extra = R - suf_lo[i]
+        return min(lagrange(lam, base, items, extra, C) for lam, base, items in suffix[i][1])
+
+    def area_range(i: int, R: int) -> Tuple[int, int]:
+        # small je urejen naraščajoče, zato "požrešno" tu da najmanjšo površino
+        base_a, _, small, large = suffix[i]
+        extra = R - suf_lo[i]
+        lo = base_a + int(_greedy(extra, small))
+        hi = base_a + int(_greedy(extra, large))
+        return lo, hi
+
+    def search(i: int, R: int, C: int, value: float) -> None:
+        nonlocal best_value, best, nodes, stop
+        if i == m - 1:
+            n = R
+            if LO[i] <= n <= HI[i] and n * A[i] <= C:
+                v = value + n * V[i]
+                if v > best_value:
+                    counts[i] = n
+                    best_value, best = v, counts[:]
+                    if target is not None and v >= target:
+                        stop = True
+            return
+        n_lo = max(LO[i], R - suf_hi[i + 1])
+        n_hi = min(HI[i], R - suf_lo[i + 1])
+        if A[i] > 0:
+            n_hi = min(n_hi, C // A[i])
+        for n in range(n_hi, n_lo - 1, -1):
+            nodes += 1
+            if nodes > max_nodes:
+                stop = True
+                return
+            R2, C2 = R - n, C - n * A[i]
+            min_a, _ = area_range(i + 1, R2)
+            if min_a > C2:
+                continue
+            if value + n * V[i] + bound(i + 1, R2, C2) <= best_value + 1e-9:
+                continue
+            counts[i] = n
+            search(i + 1, R2, C2, value + n * V[i])
+            if stop:
+                return
+
+    # najmanjša površina celotne razporeditve mora biti v NFA
+    min_total, _ = area_range(0, N)
+    if min_total <= cap:
+        search(0, N, cap, 0.0)
+
+    if best is None:
+        return result(fallback, False, "ostanki")
+
+    out = [0] * m
+    for k, i in enumerate(order):
+        out[i] = best[k]
+    exact = not (stop and nodes > max_nodes)
+    return result(out, exact, "optimum" if exact else "omejitev iskanja")
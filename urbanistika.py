@@ -0,0 +1,462 @@
+"""Headless batch runner: ``python -m urbanistika INPUT -o OUTPUT``.
+
+Reads project input sets (CSV, JSON Lines or Parquet) with the same keys as the app's
+inputs (see ``core.DEFAULT_INPUTS``), runs ``core.compute`` on every row and streams the
+flattened results to a CSV or JSON Lines file. Missing keys take the default values;
+columns that are not inputs (e.g. an ``id``) are copied to the output unchanged.
+With ``--cache PATH`` results are kept in a persistent ``result_cache.ResultCache``, so
+rows already computed by an earlier run (or by another worker) are not evaluated again.
+
+Parquet and Feather (Arrow IPC) outputs are columnar: each chunk is evaluated with
+``core.compute_batch`` into one NumPy array per result field (``evaluate_columns``) and
+written as one Arrow record batch, without building a dict per row. These formats need
+the optional ``pyarrow`` package. Feather files are written uncompressed, so they can
+be memory-mapped (``pyarrow.ipc.open_file(pyarrow.memory_map(path))``) without a copy.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import csv
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from core import (
+    BATCH_KEYS,
+    DEFAULT_INPUTS,
+    GARAGE_KEYS,
+    SCENARIOS,
+    ProjectInputs,
+    compute,
+    compute_avg_unit_size_m2,
+    compute_batch,
+    flatten_batch,
+    flatten_result,
+    inputs_hash,
+)
+from geometry import apply_layout
+from result_cache import ResultCache
+
+INPUT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+OUTPUT_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+}
+COLUMNAR_FORMATS = ("parquet", "feather")
+
+_DEFAULT_FLAT = flatten_result(compute(copy.deepcopy(DEFAULT_INPUTS)))
+RESULT_FIELDS = list(_DEFAULT_FLAT)
+
+# Tip stolpca rezultata in vrednost za vrstice z napako (v Arrow zapisane kot null)
+RESULT_DTYPES = {
+    k: np.dtype(bool) if isinstance(v, bool)
+    else np.dtype(np.int64) if isinstance(v, int)
+    else np.dtype(np.float64) if isinstance(v, float)
+    else np.dtype(object)
+    for k, v in _DEFAULT_FLAT.items()
+}
+_FILL = {"b": False, "i": 0, "f": np.nan, "O": ""}
+
+
+# =================================================
+# BRANJE VHODOV (po kosih)
+# =================================================
+def _chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_csv(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def _read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_parquet(path: Path, batch_size: int) -> Iterator[Dict[str, Any]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Za branje Parquet je potreben paket 'pyarrow'. Namesti ga z: pip install pyarrow")
+
+    pf = pq.ParquetFile(path)
+    for batch in pf.iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def read_rows(path: Path, fmt: str, chunk_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of at most `chunk_size` raw input rows."""
+    if fmt == "csv":
+        rows = _read_csv(path)
+    elif fmt == "jsonl":
+        rows = _read_jsonl(path)
+    elif fmt == "parquet":
+        rows = _read_parquet(path, chunk_size)
+    else:
+        raise ValueError(f"Neznan vhodni format: {fmt}")
+    return _chunks(rows, chunk_size)
+
+
+# =================================================
+# IZRAČUN
+# =================================================
+def row_to_inputs(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge a raw row onto the defaults, coercing text values to the default's type.
+
+    List columns (typologies, parcel polygon) are JSON text in CSV. The footprint is then
+    laid out with `geometry.apply_layout`, as in the app.
+    """
+    # spremenljivi privzeti vrednosti sta seznama tipologij (ploski slovarji) in poligona
+    inputs = dict(DEFAULT_INPUTS)
+    inputs["typologies"] = [dict(t) for t in DEFAULT_INPUTS["typologies"]]
+    inputs["parcel_polygon"] = []
+    for key, value in row.items():
+        if key not in DEFAULT_INPUTS or value is None or value == "":
+            continue
+        default = DEFAULT_INPUTS[key]
+        if isinstance(default, list):
+            inputs[key] = json.loads(value) if isinstance(value, str) else value
+        elif isinstance(default, bool):
+            inputs[key] = str(value).strip().lower() in ("1", "true", "da", "yes")
+        elif isinstance(default, (int, float)) or default is None:
+            inputs[key] = float(value)
+        else:
+            inputs[key] = str(value)
+    return apply_layout(inputs)
+
+
+def evaluate_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute one row; returns pass-through columns plus flattened results (or an error)."""
+    out = {k: v for k, v in row.items() if k not in DEFAULT_INPUTS}
+    try:
+        out.update(flatten_result(compute(row_to_inputs(row))))
+        out["error"] = ""
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    return out
+
+
+# odprti predpomnilniki v tem procesu (pot -> ResultCache)
+_caches: Dict[str, ResultCache] = {}
+
+
+def _open_cache(path: str) -> ResultCache:
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = ResultCache(path)
+    return cache
+
+
+def _evaluate_chunk_cached(rows: List[Dict[str, Any]], cache: ResultCache) -> List[Dict[str, Any]]:
+    keys: List[Optional[str]] = []
+    inputs_list: List[Optional[Dict[str, Any]]] = []
+    errors: Dict[int, str] = {}
+    for i, row in enumerate(rows):
+        try:
+            inputs = row_to_inputs(row)
+            keys.append(inputs_hash(inputs))
+            inputs_list.append(inputs)
+        except Exception as e:
+            errors[i] = f"{type(e).__name__}: {e}"
+            keys.append(None)
+            inputs_list.append(None)
+
+    found = cache.get_many("flat", list(dict.fromkeys(k for k in keys if k)))
+    new: Dict[str, Dict[str, Any]] = {}
+    out = []
+    for i, (row, key, inputs) in enumerate(zip(rows, keys, inputs_list)):
+        res = {k: v for k, v in row.items() if k not in DEFAULT_INPUTS}
+        if key is not None:
+            flat = found.get(key) or new.get(key)
+            if flat is None:
+                try:
+                    flat = new[key] = flatten_result(compute(inputs))
+                except Exception as e:
+                    errors[i] = f"{type(e).__name__}: {e}"
+            if flat is not None:
+                res.update(flat)
+        res["error"] = errors.get(i, "")
+        out.append(res)
+    cache.put_many("flat", new)
+    return out
+
+
+def evaluate_chunk(rows: List[Dict[str, Any]], cache_path: str | None = None) -> List[Dict[str, Any]]:
+    if cache_path:
+        return _evaluate_chunk_cached(rows, _open_cache(cache_path))
+    return [evaluate_row(row) for row in rows]
+
+
+def _extra_columns(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    keys = dict.fromkeys(k for row in rows for k in row if k not in DEFAULT_INPUTS and k not in RESULT_DTYPES)
+    return {k: np.array([row.get(k) for row in rows], dtype=object) for k in keys if k != "error"}
+
+
+def rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Column arrays (pass-through columns, `RESULT_FIELDS`, ``error``) of evaluated rows."""
+    out = _extra_columns(rows)
+    for name, dtype in RESULT_DTYPES.items():
+        fill = _FILL[dtype.kind]
+        out[name] = np.array([row.get(name, fill) for row in rows], dtype=dtype)
+    out["error"] = np.array([row["error"] for row in rows], dtype=object)
+    return out
+
+
+def evaluate_columns(rows: List[Dict[str, Any]], cache_path: str | None = None) -> Dict[str, np.ndarray]:
+    """Evaluate a chunk of raw rows into column arrays, one per output field.
+
+    Rows are validated one by one (an invalid row gets an ``error`` and fill values),
+    the valid ones are computed together with `core.compute_batch`. Rows with an unknown
+    scenario label are computed with `core.compute` (the batch knows only `SCENARIOS`).
+    With a cache the rows go through `evaluate_chunk` instead (the cache stores flat rows).
+    """
+    if cache_path:
+        return rows_to_columns(evaluate_chunk(rows, cache_path))
+
+    n = len(rows)
+    errors = [""] * n
+    valid: List[int] = []
+    records: List[ProjectInputs] = []
+    singles: Dict[int, Dict[str, Any]] = {}
+    for i, row in enumerate(rows):
+        try:
+            p = ProjectInputs.from_dict(row_to_inputs(row))
+            if p.scenario in SCENARIOS:
+                records.append(p)
+                valid.append(i)
+            else:
+                singles[i] = flatten_result(compute(p.to_dict()))
+        except Exception as e:
+            errors[i] = f"{type(e).__name__}: {e}"
+
+    flat: Dict[str, np.ndarray] = {}
+    if records:
+        m = len(records)
+        cols: Dict[str, Any] = {
+            key: np.fromiter((getattr(p, key) for p in records), dtype=np.float64, count=m) for key in BATCH_KEYS
+        }
+        cols["scenario"] = np.array([p.scenario for p in records])
+        cols["units_mode"] = np.array([p.units_mode for p in records])
+        cols["st_stanovanj"] = np.fromiter((p.st_stanovanj for p in records), dtype=np.float64, count=m)
+        cols["footprint_m2"] = np.fromiter(
+            (np.nan if p.footprint_m2 is None else p.footprint_m2 for p in records), dtype=np.float64, count=m
+        )
+        cols["garage_layout"] = np.fromiter((p.garage_layout for p in records), dtype=bool, count=m)
+        for key in GARAGE_KEYS:
+            cols[key] = np.fromiter((getattr(p, key) for p in records), dtype=np.float64, count=m)
+        cols["avg_unit_m2"] = np.fromiter((compute_avg_unit_size_m2(p) for p in records), dtype=np.float64, count=m)
+        flat = flatten_batch(compute_batch(cols))
+
+    out = _extra_columns(rows)
+    for name, dtype in RESULT_DTYPES.items():
+        if len(valid) == n:
+            out[name] = np.asarray(flat[name], dtype=dtype)
+            continue
+        col = np.full(n, _FILL[dtype.kind], dtype=dtype)
+        if valid:
+            col[valid] = flat[name]
+        for i, single in singles.items():
+            col[i] = single[name]
+        out[name] = col
+    out["error"] = np.array(errors, dtype=object)
+    return out
+
+
+def run(
+    chunks: Iterator[List[Dict[str, Any]]],
+    workers: int = 1,
+    cache_path: str | None = None,
+    evaluate: Callable[[List[Dict[str, Any]], Optional[str]], Any] = evaluate_chunk,
+) -> Iterator[Any]:
+    """Evaluate chunks in order, optionally in a process pool.
+
+    At most ``2 * workers`` chunks are in flight, so memory stays bounded for any input size.
+    Each worker process opens its own connection to the cache at `cache_path`. `evaluate`
+    is `evaluate_chunk` (list of flat rows per chunk) or `evaluate_columns` (column arrays).
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield evaluate(chunk, cache_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(evaluate, chunk, cache_path))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# =================================================
+# ZAPIS REZULTATOV
+# =================================================
+class _CsvSink:
+    def __init__(self, f):
+        self.f = f
+        self.writer = None
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if self.writer is None:
+            extra = [k for k in rows[0] if k not in RESULT_FIELDS and k != "error"]
+            self.writer = csv.DictWriter(self.f, fieldnames=extra + RESULT_FIELDS + ["error"], extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+
+class _JsonlSink:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.f.write(json.dumps(row, ensure_ascii=False, default=str))
+            self.f.write("\n")
+
+
+class _ArrowSink:
+    """Writes column chunks as Arrow record batches to a Parquet or Feather (IPC) file."""
+
+    def __init__(self, path: Path, fmt: str):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit(f"Za zapis {fmt.capitalize()} je potreben paket 'pyarrow'. Namesti ga z: pip install pyarrow")
+        self.path = path
+        self.fmt = fmt
+        self.schema = None
+        self.writer = None
+
+    def _batch(self, columns: Dict[str, np.ndarray]):
+        import pyarrow as pa
+
+        n = len(columns["error"])
+        null = columns["error"] != ""
+        arrays = {}
+        for name, col in columns.items():
+            if name in RESULT_DTYPES:
+                arrays[name] = pa.array(col, mask=null if null.any() else None,
+                                        type=pa.string() if col.dtype == object else None)
+            elif name == "error":
+                arrays[name] = pa.array(col, type=pa.string())
+            else:
+                arrays[name] = pa.array(col.tolist(), from_pandas=True)
+
+        if self.schema is None:
+            extra = [k for k in arrays if k not in RESULT_DTYPES and k != "error"]
+            names = extra + RESULT_FIELDS + ["error"]
+            self.schema = pa.schema([pa.field(k, arrays[k].type) for k in names])
+        out = []
+        for field in self.schema:
+            a = arrays.get(field.name)
+            out.append(pa.nulls(n, field.type) if a is None else a.cast(field.type))
+        return pa.RecordBatch.from_arrays(out, schema=self.schema)
+
+    def write(self, columns: Dict[str, np.ndarray]) -> None:
+        batch = self._batch(columns)
+        if self.writer is None:
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                self.writer = pq.ParquetWriter(str(self.path), self.schema)
+            else:
+                import pyarrow as pa
+
+                self.writer = pa.ipc.new_file(str(self.path), self.schema)
+        if self.fmt == "parquet":
+            import pyarrow as pa
+
+            self.writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self.writer.write_batch(batch)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _detect(path: Path, formats: Dict[str, str], what: str) -> str:
+    fmt = formats.get(path.suffix.lower())
+    if not fmt:
+        raise SystemExit(f"Neznan {what} format '{path.suffix}' (podprto: {', '.join(sorted(formats))})")
+    return fmt
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m urbanistika",
+        description="Urbanistično-ekonomski kalkulator – paketni izračun projektov brez brskalnika.",
+    )
+    parser.add_argument("input", type=Path, help="vhodna datoteka (.csv, .jsonl, .parquet)")
+    parser.add_argument(
+        "-o", "--output", type=Path, required=True, help="izhodna datoteka (.csv, .jsonl, .parquet, .feather)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="število procesov (privzeto 1)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="vrstic na kos (privzeto 1000)")
+    parser.add_argument("--cache", metavar="PATH", help="trajni predpomnilnik rezultatov (SQLite datoteka)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="brez izpisa napredka")
+    args = parser.parse_args(argv)
+
+    in_fmt = _detect(args.input, INPUT_FORMATS, "vhodni")
+    out_fmt = _detect(args.output, OUTPUT_FORMATS, "izhodni")
+
+    done = 0
+    errors = 0
+    chunks = read_rows(args.input, in_fmt, max(1, args.chunk_size))
+
+    def report() -> None:
+        if not args.quiet:
+            print(f"\r{done} vrstic", end="", file=sys.stderr, flush=True)
+
+    if out_fmt in COLUMNAR_FORMATS:
+        sink = _ArrowSink(args.output, out_fmt)
+        try:
+            for columns in run(chunks, args.workers, args.cache, evaluate_columns):
+                sink.write(columns)
+                done += len(columns["error"])
+                errors += int(np.count_nonzero(columns["error"] != ""))
+                report()
+        finally:
+            sink.close()
+        if not args.quiet:
+            print(f"\r{done} vrstic, napak: {errors}", file=sys.stderr)
+        return 1 if errors else 0
+
+    newline = "" if out_fmt == "csv" else None
+    with open(args.output, "w", newline=newline, encoding="utf-8") as f:
+        sink = _CsvSink(f) if out_fmt == "csv" else _JsonlSink(f)
+        for rows in run(chunks, args.workers, args.cache):
+            sink.write(rows)
+            done += len(rows)
+            errors += sum(1 for row in rows if row["error"])
+            report()
+
+    if not args.quiet:
+        print(f"\r{done} vrstic, napak: {errors}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())